@@ -7,14 +7,41 @@ Total Electron Content (TEC) maps as xarray Datasets.
 Public API
 ----------
 read_ionex          Read an IONEX file → xr.Dataset (TEC + RMS maps).
+IonexMaps           numpy-only result of read_ionex(..., as_='numpy').
+read_mfionex        Read many files → one time-ordered Dataset (optionally dask).
+read_ionex_archive  Read every IONEX member of a .tar / .zip bundle (no extraction).
+iter_maps           Stream (epoch, tec, rms) one map at a time in constant memory.
+cached_read_ionex   read_ionex through a thread-safe LRU Dataset cache.
+DatasetCache        The cache class (memory budget, stats, invalidation).
 get_grid            Parse lat/lon/height grid from an IONEX header string.
 get_epoch           Extract the UTC epoch from a single map block.
 get_metadata        Extract version and provenance metadata from the header.
+scan_header         Parse only the header of a file (grid, epochs, map count).
+index_blocks        Offsets of every TEC / RMS map block in a file's text.
 parse_map           Parse a raw TEC map block → numpy array.
 parse_rms_map       Parse a raw RMS map block → numpy array.
 plot_tec_map        Plot a VTEC map (with optional terminator / geomag lines).
 plot_rms_map        Plot a TEC RMS map (with optional overlays).
 plot_time_series    Plot TEC or RMS time series at a lat/lon point.
+MapCanvas           Reusable base map for fast redraws (canvas= on the map plots).
+terminator_curve    Closed-form day/night terminator lines + night polygons.
+subsolar_point      Vectorised subsolar latitude / longitude over datetime64 arrays.
+add_solar_geometry  Attach sza, local_solar_time and is_day to a cube (dask-aware).
+to_local_time       Re-bin a cube onto local solar time (or an LT climatology).
+dip_latitude        Vectorised magnetic dip latitude (WMM / embedded IGRF-13).
+to_magnetic_coords  Re-grid a cube onto magnetic latitude / magnetic local time.
+regrid              Bilinear / conservative / nearest regridding, cached sparse weights.
+combine_products    RMS-weighted multi-agency combination, streamed, parallel by day.
+animate_tec         Render every epoch to an MP4 / GIF / PNG frames (parallel).
+render_maps         One PNG per epoch in a thread / process pool, no pyplot.
+to_netcdf_optimized Write a packed, compressed, chunked NetCDF-4 file.
+to_zarr_optimized   Write a packed, compressed, chunked Zarr store.
+IonexArchive        Appendable multi-year Zarr TEC/RMS cube (one per agency).
+publish_shared      Put a decoded cube in shared memory for other processes.
+attach_shared       Attach to a published cube as zero-copy read-only views.
+build_catalog       Index an archive directory into SQLite (incremental).
+Catalog             Query the catalogue by time range / agency / resolution.
+parse_ionex_filenames  Decode legacy / IGS long file names → structured array.
 
 Example
 -------
@@ -25,40 +52,133 @@ Example
 >>> plt.show()
 """
 
+import importlib
+
 from ionex_reader.ionex import (
     # --- core reader ---
     read_ionex,
+    IonexMaps,
     # --- header utilities ---
     get_grid,
     get_epoch,
     get_metadata,
+    scan_header,
     # --- low-level parsers (useful for custom pipelines) ---
+    index_blocks,
     parse_map,
     parse_rms_map,
-    # --- plotting ---
-    plot_tec_map,
-    plot_rms_map,
-    plot_time_series,
 )
 
 # Single source of truth — kept in ionex.py, re-exported here so that
 # `ionex_reader.__version__` works without importing the submodule directly.
 from ionex_reader.ionex import __version__, __author__, __email__
 
+# ---------------------------------------------------------------------------
+# Lazily imported names → defining submodule.
+# The reader above only needs numpy; everything listed here drags in heavier
+# stacks (matplotlib, cartopy, …) and is imported on first attribute access
+# via the module-level __getattr__ below (PEP 562).
+# ---------------------------------------------------------------------------
+_LAZY_IMPORTS = {
+    # multi-file reader
+    'read_mfionex':     'ionex_reader.multifile',
+    'read_ionex_archive': 'ionex_reader.bundle',
+    'iter_maps':          'ionex_reader.stream',
+    # caching
+    'cached_read_ionex': 'ionex_reader.cache',
+    'DatasetCache':      'ionex_reader.cache',
+    # plotting
+    'plot_tec_map':     'ionex_reader.plotting',
+    'plot_rms_map':     'ionex_reader.plotting',
+    'plot_time_series': 'ionex_reader.plotting',
+    'MapCanvas':        'ionex_reader.plotting',
+    # solar geometry
+    'terminator_curve': 'ionex_reader.solar',
+    'subsolar_point':   'ionex_reader.solar',
+    'add_solar_geometry': 'ionex_reader.solar',
+    'to_local_time':    'ionex_reader.solar',
+    # geomagnetic field
+    'dip_latitude':     'ionex_reader.magnetic',
+    'to_magnetic_coords': 'ionex_reader.magnetic',
+    # regridding
+    'regrid':           'ionex_reader.regridding',
+    'combine_products': 'ionex_reader.combine',
+    'animate_tec':      'ionex_reader.animation',
+    'render_maps':      'ionex_reader.animation',
+    # export
+    'to_netcdf_optimized': 'ionex_reader.export',
+    'to_zarr_optimized':   'ionex_reader.export',
+    # archive
+    'IonexArchive':        'ionex_reader.archive',
+    # shared memory
+    'publish_shared':      'ionex_reader.shared',
+    'attach_shared':       'ionex_reader.shared',
+    # catalogue
+    'build_catalog':       'ionex_reader.catalog',
+    'Catalog':             'ionex_reader.catalog',
+    # file names
+    'parse_ionex_filenames': 'ionex_reader.filenames',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value      # cache — later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 __all__ = [
     # reader
     'read_ionex',
+    'IonexMaps',
+    'read_mfionex',
+    'read_ionex_archive',
+    'iter_maps',
+    'cached_read_ionex',
+    'DatasetCache',
     # header utilities
     'get_grid',
     'get_epoch',
     'get_metadata',
+    'scan_header',
     # parsers
+    'index_blocks',
     'parse_map',
     'parse_rms_map',
     # plotting
     'plot_tec_map',
     'plot_rms_map',
     'plot_time_series',
+    'MapCanvas',
+    # solar geometry
+    'terminator_curve',
+    'subsolar_point',
+    'add_solar_geometry',
+    'to_local_time',
+    # geomagnetic field
+    'dip_latitude',
+    'to_magnetic_coords',
+    # regridding
+    'regrid',
+    'combine_products',
+    'animate_tec',
+    'render_maps',
+    # export
+    'to_netcdf_optimized',
+    'to_zarr_optimized',
+    # archive
+    'IonexArchive',
+    'publish_shared',
+    'attach_shared',
+    'build_catalog',
+    'Catalog',
+    'parse_ionex_filenames',
     # package metadata
     '__version__',
     '__author__',
@@ -0,0 +1,7 @@
+"""Allow ``python -m ionex_reader convert ...`` as an alias of ``ionex-reader``."""
+
+import sys
+
+from ionex_reader.cli import main
+
+sys.exit(main())
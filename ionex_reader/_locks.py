@@ -0,0 +1,24 @@
+"""
+_locks.py
+=========
+Advisory inter-process file locks shared by the modules that write to
+common storage (:mod:`ionex_reader.archive`, :mod:`ionex_reader.shared`).
+"""
+
+from contextlib import contextmanager
+
+
+@contextmanager
+def _exclusive_lock(path):
+    """Advisory exclusive lock on ``<path>.lock`` (no-op where fcntl is absent)."""
+    try:
+        import fcntl
+    except ImportError:          # Windows — single-writer use is the caller's job
+        yield
+        return
+    with open(f'{path}.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,275 @@
+"""
+animation.py
+============
+Batch rendering of TEC / RMS maps: animations (MP4 or GIF), numbered PNG
+frames, and one PNG per epoch.
+
+Nothing here touches pyplot.  Each worker builds one Agg-backed
+:class:`matplotlib.figure.Figure` — coastlines, borders, gridlines, colour
+bar and optional geomagnetic lines are drawn a single time — and each map
+only replaces the image data, the title and the day/night terminator (see
+:class:`ionex_reader.plotting.MapCanvas`).  Work is split into one
+contiguous chunk of epochs per worker, in a thread or process pool, and
+every worker closes its figure when its chunk is done, so long batch jobs
+do not accumulate figures.  GIFs are assembled with Pillow; MP4 needs the
+``ffmpeg`` executable.
+
+Example
+-------
+>>> from ionex_reader.animation import animate_tec, render_maps
+>>> animate_tec(read_ionex('jplg0010.24i'), 'day.mp4', workers=4)
+'day.mp4'
+>>> render_maps(ds, None, 'png/', workers=4)['maps_per_second']
+23.7
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+# Colour scaling of plot_tec_map / plot_rms_map.
+_STYLE = {
+    'tec': dict(cmap='viridis', vmin=0, vmax=100, title='VTEC map'),
+    'rms': dict(cmap='plasma',  vmin=0, vmax=10,  title='TEC RMS map'),
+}
+
+_FRAME_NAME = 'frame_{:05d}.png'
+
+# matplotlib's mathtext parser is not thread-safe.  Canvases are built and
+# drawn once under this lock, which parses (and caches) every label.
+_BUILD_LOCK = threading.Lock()
+
+
+def _render_chunk(paths, data, epochs, extent, options):
+    """
+    Render ``data[i]`` to ``paths[i]`` on one canvas, closed on return
+    (top-level so it pickles into a process pool).
+    """
+    from ionex_reader.plotting import MapCanvas
+    from ionex_reader.solar import terminator_curve
+
+    if options['add_terminator']:
+        terminator_curve(epochs)        # whole chunk in one pass; frames hit the memo
+
+    with _BUILD_LOCK:
+        canvas = MapCanvas(extent, figsize=options['figsize'], dpi=options['dpi'])
+        canvas.set_style(options['cmap'], options['vmin'], options['vmax'])
+        canvas.set_geomagnetic_lines(options['add_geomagnetic_lines'], options['geomag_kw'])
+        canvas.fig.canvas.draw()
+    try:
+        for path, frame, epoch in zip(paths, data, epochs):
+            stamp = np.datetime_as_string(epoch, unit='m')
+            dt    = epoch.astype('datetime64[us]').item() if options['add_terminator'] else None
+            canvas.update(frame, f'{options["title"]}  —  {stamp} UTC',
+                          terminator_dt=dt, terminator_kw=options['terminator_kw'])
+            canvas.savefig(path)
+    finally:
+        canvas.close()
+    return list(paths)
+
+
+def _render(paths, ds, variable, workers, executor, options):
+    """Render every epoch of *ds* to *paths*, split across *workers*."""
+    from ionex_reader.plotting import _map_extent
+
+    if variable not in _STYLE:
+        raise ValueError(f"variable must be 'tec' or 'rms', got {variable!r}.")
+    if executor not in ('thread', 'process'):
+        raise ValueError("executor must be 'thread' or 'process'.")
+    n = len(paths)
+    if n == 0:
+        raise ValueError('Dataset has no epochs to render.')
+
+    data    = np.asarray(ds[variable].values, dtype=np.float32)
+    epochs  = ds['time'].values.astype('datetime64[s]')
+    extent  = _map_extent(ds)
+    options = dict(_STYLE[variable], **options)
+
+    workers = max(1, min(int(workers), n))
+    if workers == 1:
+        return _render_chunk(paths, data, epochs, extent, options)
+
+    bounds = np.linspace(0, n, workers + 1).astype(int)
+    pool   = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    with pool(max_workers=workers) as pool:
+        futures = [pool.submit(_render_chunk, paths[a:b], data[a:b], epochs[a:b],
+                               extent, options)
+                   for a, b in zip(bounds[:-1], bounds[1:])]
+        return [p for f in futures for p in f.result()]
+
+
+def _write_gif(frames, out, fps):
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError(
+            "The 'Pillow' package is required for GIF output.\n"
+            "Install it with:  pip install Pillow"
+        )
+    images = [Image.open(p).convert('P', palette=Image.Palette.ADAPTIVE) for p in frames]
+    images[0].save(out, save_all=True, append_images=images[1:],
+                   duration=round(1000 / fps), loop=0)
+
+
+def _write_mp4(frames_dir, out, fps):
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError(
+            "The 'ffmpeg' executable is required for MP4 output and was not "
+            "found on PATH.\nWrite a GIF or a frames directory instead, or "
+            "install ffmpeg."
+        )
+    subprocess.run(
+        [ffmpeg, '-y', '-loglevel', 'error', '-framerate', str(fps),
+         '-i', os.path.join(frames_dir, 'frame_%05d.png'),
+         # yuv420p needs even dimensions
+         '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', 'libx264',
+         '-pix_fmt', 'yuv420p', os.fspath(out)],
+        check=True,
+    )
+
+
+def animate_tec(ds, out,
+                variable='tec',
+                fps=8,
+                dpi=100,
+                figsize=(12, 5),
+                workers=1,
+                add_terminator=True,
+                terminator_kw=None,
+                add_geomagnetic_lines=False,
+                geomag_kw=None):
+    """
+    Animate every epoch of *ds*.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Output of :func:`ionex_reader.ionex.read_ionex` or
+        :func:`ionex_reader.multifile.read_mfionex` (select a time range
+        with ``ds.sel(time=…)`` first).
+    out : str or path-like
+        ``*.mp4`` or ``*.gif`` file, or a directory that receives the frames
+        as ``frame_00000.png``, ``frame_00001.png``, …
+    variable : {'tec', 'rms'}
+        Map to animate, with the colour scale of :func:`plot_tec_map` /
+        :func:`plot_rms_map`.
+    fps : int
+        Frames per second of the MP4 / GIF.
+    dpi, figsize :
+        Frame size (default 1200 × 500 pixels).
+    workers : int
+        Processes rendering frames in parallel (default ``1`` — in-process).
+    add_terminator : bool
+        Draw the day/night terminator of each epoch (default ``True``).
+    terminator_kw : dict or None
+        Styling forwarded to :func:`ionex_reader.plotting._plot_terminator`.
+    add_geomagnetic_lines : bool
+        Overlay geomagnetic latitude lines (drawn once per worker).
+    geomag_kw : dict or None
+        Styling forwarded to
+        :func:`ionex_reader.plotting._plot_geomagnetic_latitude_lines`.
+
+    Returns
+    -------
+    str
+        *out*.
+
+    Raises
+    ------
+    ValueError
+        For an unknown *variable* or an empty dataset.
+    RuntimeError
+        For MP4 output without ``ffmpeg`` on PATH.
+    """
+    out    = os.fspath(out)
+    suffix = os.path.splitext(out)[1].lower()
+    n      = ds.sizes.get('time', 0)
+    options = dict(figsize=figsize, dpi=dpi,
+                   add_terminator=add_terminator, terminator_kw=terminator_kw,
+                   add_geomagnetic_lines=add_geomagnetic_lines, geomag_kw=geomag_kw)
+
+    with tempfile.TemporaryDirectory(prefix='ionex_frames_') as tmp:
+        frames_dir = tmp if suffix in ('.mp4', '.gif') else out
+        paths  = [os.path.join(frames_dir, _FRAME_NAME.format(i)) for i in range(n)]
+        if frames_dir == out:
+            os.makedirs(out, exist_ok=True)
+        frames = _render(paths, ds, variable, workers, 'process', options)
+
+        if suffix == '.gif':
+            _write_gif(frames, out, fps)
+        elif suffix == '.mp4':
+            _write_mp4(frames_dir, out, fps)
+    return out
+
+
+def render_maps(ds, times, out_dir,
+                variable='tec',
+                workers=1,
+                executor='thread',
+                dpi=100,
+                figsize=(12, 5),
+                add_terminator=False,
+                terminator_kw=None,
+                add_geomagnetic_lines=False,
+                geomag_kw=None):
+    """
+    Render one PNG per epoch, in parallel, without pyplot.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Output of :func:`ionex_reader.ionex.read_ionex` or
+        :func:`ionex_reader.multifile.read_mfionex`.
+    times : None, slice or sequence of datetime-like
+        Epochs to render (anything ``ds.sel(time=…)`` accepts); ``None``
+        renders every epoch.
+    out_dir : str or path-like
+        Directory (created if missing) receiving ``<variable>_YYYYMMDDTHHMM.png``.
+    variable : {'tec', 'rms'}
+        Map to render, with the colour scale of :func:`plot_tec_map` /
+        :func:`plot_rms_map`.
+    workers : int
+        Pool size; each worker renders a contiguous chunk of epochs on its
+        own figure, built once and closed when the chunk is done.
+    executor : {'thread', 'process'}
+        Pool type.  Threads share *ds* without copying; processes sidestep
+        the GIL and scale with cores.
+    dpi, figsize, add_terminator, terminator_kw, add_geomagnetic_lines, geomag_kw :
+        As for :func:`animate_tec` (the terminator is off by default).
+
+    Returns
+    -------
+    dict
+        ``{'paths': [...], 'n_maps': n, 'seconds': s, 'maps_per_second': r}``.
+
+    Raises
+    ------
+    ValueError
+        For an unknown *variable* or *executor*, or no epochs selected.
+    KeyError
+        If an epoch in *times* is not in *ds*.
+    """
+    if times is not None:
+        ds = ds.sel(time=times if isinstance(times, slice) else np.atleast_1d(times))
+    out_dir = os.fspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    stamps = np.datetime_as_string(ds['time'].values, unit='m')
+    paths  = [os.path.join(out_dir, f"{variable}_{s.replace('-', '').replace(':', '')}.png")
+              for s in stamps]
+    options = dict(figsize=figsize, dpi=dpi,
+                   add_terminator=add_terminator, terminator_kw=terminator_kw,
+                   add_geomagnetic_lines=add_geomagnetic_lines, geomag_kw=geomag_kw)
+
+    t0    = time.perf_counter()
+    paths = _render(paths, ds, variable, workers, executor, options)
+    seconds = time.perf_counter() - t0
+    return {'paths': paths, 'n_maps': len(paths), 'seconds': seconds,
+            'maps_per_second': len(paths) / seconds if seconds > 0 else float('inf')}
@@ -0,0 +1,304 @@
+"""
+archive.py
+==========
+:class:`IonexArchive` — one continuous, appendable TEC/RMS cube per agency,
+stored as a chunked Zarr group that grows by one day at a time.
+
+Store layout
+------------
+::
+
+    <path>/                 zarr group, attrs: n_times, scale_factor, …
+        tec        int16 (time, latitude, longitude), packed ×0.1 TECU
+        rms        int16 (time, latitude, longitude), packed ×0.1 TECU
+        time       int64 seconds since 1970-01-01 (the time index)
+        latitude   float64
+        longitude  float64
+
+Consistency model
+-----------------
+The group attribute ``n_times`` is the commit point.  An append writes the
+new map chunks and time values past the committed length first and updates
+``n_times`` last, in a single metadata write.  Readers never look beyond
+``n_times``, so an interrupted append is invisible and is overwritten by the
+next one.  Writers are serialised with an advisory lock file next to the
+store (POSIX only).
+
+Day boundaries
+--------------
+A 24 h IONEX file ends with the 24:00 map, which is also the first map of
+the next day's file.  Epochs not later than the last committed epoch are
+dropped (first writer wins), so consecutive days append without a duplicate
+and re-ingesting an already archived day is a no-op.  For file paths the
+check uses :func:`ionex_reader.ionex.scan_header` only, so the no-op does
+not decode any map.
+"""
+
+import os
+
+import numpy as np
+
+from ionex_reader._locks import _exclusive_lock
+from ionex_reader.export import INT16_FILL, INT16_SCALE, _zarr_compression
+from ionex_reader.ionex import read_ionex, scan_header
+from ionex_reader.regridding import _regrid_values
+
+_EPOCH = np.datetime64('1970-01-01T00:00:00', 's')
+
+
+def _pack(values):
+    """float TECU → int16 (×10), NaN → fill value."""
+    packed = np.round(np.asarray(values, dtype=np.float64) / INT16_SCALE)
+    packed[~np.isfinite(packed)] = INT16_FILL
+    return packed.astype(np.int16)
+
+
+def _unpack(packed):
+    values = packed.astype(np.float64) * INT16_SCALE
+    values[packed == INT16_FILL] = np.nan
+    return values
+
+
+class IonexArchive:
+    """
+    Appendable long-term Zarr store of IONEX TEC / RMS maps.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Directory of the Zarr group.  Created on the first :meth:`append`.
+    time_chunk : int
+        Maps per chunk along time (default 96 — one day of 15-min maps).
+        Each chunk holds whole maps, so a time-window read touches only the
+        chunks overlapping the window.
+    cname, clevel : str, int
+        Blosc compressor and level for new stores (default ``'zstd'``, 5).
+    on_grid_mismatch : {'raise', 'regrid'}
+        What to do when a day's grid differs from the archive's:
+        raise ``ValueError`` (default) or interpolate it onto the archive grid
+        (bilinear, with cached weights — see :func:`ionex_reader.regridding.regrid`).
+
+    Examples
+    --------
+    >>> arc = IonexArchive('/data/jpl.zarr')
+    >>> for path in sorted(glob.glob('/archive/jplg*.24i')):
+    ...     arc.append(path)
+    >>> ds = arc.read('2024-03-01', '2024-03-07')
+    """
+
+    def __init__(self, path, time_chunk=96, cname='zstd', clevel=5,
+                 on_grid_mismatch='raise'):
+        if on_grid_mismatch not in ('raise', 'regrid'):
+            raise ValueError("on_grid_mismatch must be 'raise' or 'regrid'.")
+        self.path             = os.fspath(path)
+        self.time_chunk       = int(time_chunk)
+        self.cname            = cname
+        self.clevel           = clevel
+        self.on_grid_mismatch = on_grid_mismatch
+        self._group  = None
+        self._times  = np.empty(0, dtype='datetime64[s]')
+
+    # ------------------------------------------------------------------
+    # store access
+    # ------------------------------------------------------------------
+
+    def _open(self, create=False):
+        """Open (or create) the Zarr group; returns ``None`` if absent."""
+        if self._group is not None:
+            return self._group
+        try:
+            import zarr
+        except ImportError:
+            raise ImportError(
+                "The 'zarr' package is required for IonexArchive.\n"
+                "Install it with:  pip install zarr"
+            )
+        if not os.path.exists(self.path):
+            return self._create(zarr) if create else None
+        self._group = zarr.open_group(self.path, mode='a')
+        return self._group
+
+    def _create(self, zarr):
+        group = zarr.open_group(self.path, mode='a')
+        group.attrs.update({
+            'n_times': 0,
+            'scale_factor': INT16_SCALE,
+            'fill_value': int(INT16_FILL),
+            'time_units': 'seconds since 1970-01-01',
+        })
+        self._group = group
+        return group
+
+    def _new_array(self, name, shape, chunks, dtype, fill_value, data=None):
+        """Create an array with the v3 ``create_array`` or v2 ``create_dataset`` API."""
+        group = self._group
+        codec = _zarr_compression(self.cname, self.clevel)
+        create = getattr(group, 'create_array', None) or group.create_dataset
+        arr = create(name, shape=shape, chunks=chunks, dtype=dtype,
+                     fill_value=fill_value, **codec)
+        if data is not None:
+            arr[...] = data
+        return arr
+
+    def _committed(self):
+        """Number of committed epochs (re-opened so other writers are seen)."""
+        self._group = None
+        group = self._open()
+        return 0 if group is None else int(group.attrs.get('n_times', 0))
+
+    # ------------------------------------------------------------------
+    # public API
+    # ------------------------------------------------------------------
+
+    @property
+    def times(self):
+        """Committed epochs as a ``datetime64[s]`` array (the time index)."""
+        n = self._committed()
+        if n != self._times.size:
+            seconds = self._group['time'][:n]
+            self._times = _EPOCH + seconds.astype('timedelta64[s]')
+        return self._times
+
+    @property
+    def grid(self):
+        """``(latitudes, longitudes)`` of the archive, or ``None`` if empty."""
+        group = self._open()
+        if group is None or 'latitude' not in group:
+            return None
+        return group['latitude'][:], group['longitude'][:]
+
+    def __len__(self):
+        return self._committed()
+
+    def append(self, source):
+        """
+        Append one day (or any span later than the archive's last epoch).
+
+        Parameters
+        ----------
+        source : str, path-like or xr.Dataset
+            IONEX file path (plain or compressed) or a Dataset from
+            :func:`read_ionex`.
+
+        Returns
+        -------
+        int
+            Number of epochs appended — ``0`` when everything was already
+            archived.
+
+        Raises
+        ------
+        ValueError
+            If the grid differs and ``on_grid_mismatch='raise'``, or if the
+            data overlaps the archive without being a re-ingest (back-fill
+            into the middle of the cube is not supported).
+        """
+        with _exclusive_lock(self.path):
+            times = self.times
+
+            # Cheap no-op path for files: header only, no map decoding.
+            if not hasattr(source, 'data_vars') and times.size:
+                header = scan_header(source)
+                last   = header.get('last_epoch')
+                if last is not None and np.datetime64(last, 's') <= times[-1]:
+                    first = np.datetime64(header['first_epoch'], 's')
+                    if first in times:
+                        return 0
+
+            ds = source if hasattr(source, 'data_vars') else read_ionex(source)
+            return self._append_dataset(ds, times)
+
+    def _append_dataset(self, ds, times):
+        epochs = ds['time'].values.astype('datetime64[s]')
+        lats   = ds['latitude'].values
+        lons   = ds['longitude'].values
+        tec    = ds['tec'].values
+        rms    = ds['rms'].values if 'rms' in ds else np.full_like(tec, np.nan)
+
+        if times.size:
+            keep = epochs > times[-1]
+            overlap = epochs[~keep]
+            if overlap.size and not np.isin(overlap, times).all():
+                raise ValueError(
+                    f"Epochs {overlap[0]} … {overlap[-1]} fall inside the archive "
+                    "but are not archived; back-filling is not supported."
+                )
+            epochs, tec, rms = epochs[keep], tec[keep], rms[keep]
+        if not epochs.size:
+            return 0
+
+        group = self._open(create=True)
+        if 'tec' not in group:
+            shape  = (0, lats.size, lons.size)
+            chunks = (self.time_chunk, lats.size, lons.size)
+            for name in ('tec', 'rms'):
+                self._new_array(name, shape, chunks, 'int16', int(INT16_FILL))
+            self._new_array('time', (0,), (4096,), 'int64', 0)
+            self._new_array('latitude',  lats.shape, lats.shape, 'float64', 0.0, lats)
+            self._new_array('longitude', lons.shape, lons.shape, 'float64', 0.0, lons)
+        else:
+            arc_lats, arc_lons = self.grid
+            if (arc_lats.shape != lats.shape or arc_lons.shape != lons.shape
+                    or not np.allclose(arc_lats, lats) or not np.allclose(arc_lons, lons)):
+                if self.on_grid_mismatch == 'raise':
+                    raise ValueError(
+                        f"Grid {lats.size}×{lons.size} does not match the archive "
+                        f"grid {arc_lats.size}×{arc_lons.size}. "
+                        "Use on_grid_mismatch='regrid' to interpolate."
+                    )
+                tec = _regrid_values(tec, lats, lons, arc_lats, arc_lons)
+                rms = _regrid_values(rms, lats, lons, arc_lats, arc_lons)
+
+        # Write past the committed length, then commit by bumping n_times.
+        n0 = times.size
+        n1 = n0 + epochs.size
+        for name, values in (('tec', tec), ('rms', rms)):
+            arr = group[name]
+            arr.resize((n1,) + arr.shape[1:])
+            arr[n0:n1] = _pack(values)
+        group['time'].resize((n1,))
+        group['time'][n0:n1] = (epochs - _EPOCH).astype(np.int64)
+
+        group.attrs['n_times'] = n1
+        self._times = np.concatenate([times, epochs])
+        return int(epochs.size)
+
+    def read(self, start=None, stop=None):
+        """
+        Read the maps with ``start <= time <= stop`` as an ``xr.Dataset``.
+
+        Only the Zarr chunks overlapping the window are read.
+
+        Parameters
+        ----------
+        start, stop : datetime, np.datetime64, str or None
+            Inclusive bounds; ``None`` means open-ended.
+
+        Returns
+        -------
+        xr.Dataset
+            Same layout as :func:`read_ionex` (float64 TECU).
+        """
+        import xarray as xr
+
+        times = self.times
+        i0 = 0 if start is None else int(np.searchsorted(
+            times, np.datetime64(start, 's'), side='left'))
+        i1 = times.size if stop is None else int(np.searchsorted(
+            times, np.datetime64(stop, 's'), side='right'))
+
+        group = self._group
+        if group is None:
+            raise FileNotFoundError(f"No IONEX archive at '{self.path}'.")
+        lats, lons = self.grid
+        ds = xr.Dataset(
+            {
+                'tec': (['time', 'latitude', 'longitude'], _unpack(group['tec'][i0:i1])),
+                'rms': (['time', 'latitude', 'longitude'], _unpack(group['rms'][i0:i1])),
+            },
+            coords={'time': times[i0:i1].astype('datetime64[ns]'),
+                    'latitude': lats, 'longitude': lons},
+        )
+        ds['tec'].attrs.update(units='TECU', long_name='Vertical Total Electron Content')
+        ds['rms'].attrs.update(units='TECU', long_name='RMS of Vertical TEC')
+        return ds
@@ -0,0 +1,96 @@
+"""
+bundle.py
+=========
+Read IONEX files straight out of ``.tar`` / ``.zip`` bundles (or any stream
+of archive members) without extracting them to disk.
+
+Every member whose name looks like an IONEX file (legacy ``*.YYi``, IGS
+long ``*.INX``, optionally ``.gz`` / ``.Z`` / ``.bz2`` / ``.xz``) is handed
+to :func:`ionex_reader.ionex.read_ionex` as an in-memory file object, so
+only one member is held in memory at a time.  Tar bundles are read in
+streaming mode when the source is not seekable (a pipe or HTTP body), and
+compressed tarballs (``.tar.gz``, ``.tgz``, ``.tar.bz2``, ``.tar.xz``) are
+detected automatically.
+
+Example
+-------
+>>> from ionex_reader.bundle import read_ionex_archive
+>>> for name, ds in read_ionex_archive('/incoming/2024001_gim.tar'):
+...     print(name, ds.sizes['time'])
+"""
+
+import os
+import tarfile
+import zipfile
+
+from ionex_reader.filenames import _looks_like_ionex
+from ionex_reader.ionex import read_ionex
+
+
+def _tar_members(tar):
+    for member in tar:
+        if member.isfile() and _looks_like_ionex(os.path.basename(member.name)):
+            yield member.name, tar.extractfile(member)
+
+
+def _zip_members(archive):
+    for info in archive.infolist():
+        if not info.is_dir() and _looks_like_ionex(os.path.basename(info.filename)):
+            with archive.open(info) as f:
+                yield info.filename, f
+
+
+def _members(source):
+    """Yield ``(name, binary file object)`` for the IONEX members of *source*."""
+    if isinstance(source, (str, os.PathLike)):
+        if zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as archive:
+                yield from _zip_members(archive)
+        else:
+            with tarfile.open(source, mode='r:*') as tar:
+                yield from _tar_members(tar)
+        return
+
+    seekable = getattr(source, 'seekable', lambda: False)()
+    if seekable and zipfile.is_zipfile(source):
+        source.seek(0)
+        with zipfile.ZipFile(source) as archive:
+            yield from _zip_members(archive)
+        return
+    if seekable:
+        source.seek(0)
+    with tarfile.open(fileobj=source, mode='r:*' if seekable else 'r|*') as tar:
+        yield from _tar_members(tar)
+
+
+def read_ionex_archive(source, read_metadata=False):
+    """
+    Read every IONEX member of a tar / zip bundle, one at a time.
+
+    Parameters
+    ----------
+    source : str, path-like, binary file object or iterable of members
+        A ``.tar`` (optionally compressed) or ``.zip`` file, an open binary
+        stream of one (non-seekable streams are read tar-only, in a single
+        pass), or an iterable of ``(name, payload)`` pairs whose payload is
+        anything :func:`read_ionex` accepts (``bytes``, file object, …).
+    read_metadata : bool
+        Forwarded to :func:`read_ionex`.
+
+    Yields
+    ------
+    (str, xr.Dataset)
+        Member name and its Dataset, in archive order.  Non-IONEX members
+        are skipped.
+
+    Raises
+    ------
+    ValueError
+        From :func:`read_ionex` for a member that is not a valid IONEX file.
+    """
+    if isinstance(source, (str, os.PathLike)) or hasattr(source, 'read'):
+        members = _members(source)
+    else:
+        members = iter(source)
+    for name, payload in members:
+        yield name, read_ionex(payload, read_metadata=read_metadata)
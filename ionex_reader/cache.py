@@ -0,0 +1,180 @@
+"""
+cache.py
+========
+Process-wide, thread-safe LRU cache of decoded IONEX Datasets for
+long-running services that open the same few files over and over.
+
+* Entries are keyed by ``(real path, size, mtime_ns, read options)``, so a
+  file rewritten in place is re-read automatically.
+* The cache holds at most ``max_bytes`` of array data; least-recently-used
+  entries are evicted first.
+* Concurrent misses for one key share a single parse — the first caller
+  reads the file, the others wait for its result.
+* Cached arrays are marked read-only and every caller receives a shallow
+  copy of the Dataset, so shared data cannot be modified in place.
+
+Example
+-------
+>>> from ionex_reader.cache import cached_read_ionex, default_cache
+>>> ds = cached_read_ionex('igsg0010.24i')     # miss → parse
+>>> ds = cached_read_ionex('igsg0010.24i')     # hit
+>>> default_cache.stats()
+{'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1, 'bytes': 1078688, ...}
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from ionex_reader.ionex import read_ionex
+
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+
+def _freeze(ds):
+    """Mark every numpy array of *ds* (variables and coords) read-only."""
+    for var in ds.variables.values():
+        data = var.values
+        if hasattr(data, 'flags'):
+            data.flags.writeable = False
+    return ds
+
+
+class DatasetCache:
+    """
+    Thread-safe LRU cache of Datasets with a memory budget.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Upper bound on the summed ``Dataset.nbytes`` of cached entries.  A
+        Dataset larger than the budget is returned but not cached.
+    loader : callable
+        ``loader(path, **options) -> xr.Dataset`` (default :func:`read_ionex`).
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, loader=read_ionex):
+        self.max_bytes = int(max_bytes)
+        self.loader    = loader
+        self._lock     = threading.Lock()
+        self._entries  = OrderedDict()     # key → (Dataset, nbytes)
+        self._inflight = {}                # key → Future
+        self._bytes    = 0
+        self._hits = self._misses = self._evictions = 0
+
+    @staticmethod
+    def _key(path, options):
+        real = os.path.realpath(os.fspath(path))
+        st   = os.stat(real)
+        return (real, st.st_size, st.st_mtime_ns, tuple(sorted(options.items())))
+
+    def get(self, path, **options):
+        """
+        Return the Dataset for *path*, reading it on a miss.
+
+        *options* are forwarded to the loader and are part of the key.
+        Loader exceptions propagate to every caller waiting on that key and
+        nothing is cached.
+        """
+        key = self._key(path, options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0].copy(deep=False)
+            self._misses += 1
+            future = self._inflight.get(key)
+            owner  = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return future.result().copy(deep=False)
+
+        try:
+            ds = _freeze(self.loader(path, **options))
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            self._insert(key, ds)
+        future.set_result(ds)
+        return ds.copy(deep=False)
+
+    def _insert(self, key, ds):
+        """Add *ds* and evict LRU entries over budget (caller holds the lock)."""
+        nbytes = int(ds.nbytes)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (ds, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            _, (_, freed) = self._entries.popitem(last=False)
+            self._bytes -= freed
+            self._evictions += 1
+
+    def invalidate(self, path=None):
+        """
+        Drop every entry for *path* (any size / mtime / options), or the whole
+        cache when *path* is ``None``.  Returns the number of entries dropped.
+        """
+        real = None if path is None else os.path.realpath(os.fspath(path))
+        with self._lock:
+            keys = [k for k in self._entries if real is None or k[0] == real]
+            for k in keys:
+                _, nbytes = self._entries.pop(k)
+                self._bytes -= nbytes
+            return len(keys)
+
+    def stats(self):
+        """Snapshot of hit / miss / eviction counters and current usage."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits':      self._hits,
+                'misses':    self._misses,
+                'evictions': self._evictions,
+                'entries':   len(self._entries),
+                'bytes':     self._bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate':  self._hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        real = os.path.realpath(os.fspath(path))
+        with self._lock:
+            return any(k[0] == real for k in self._entries)
+
+
+#: Process-wide cache used by :func:`cached_read_ionex`.
+default_cache = DatasetCache()
+
+
+def cached_read_ionex(filename, read_metadata=False, cache=None):
+    """
+    :func:`read_ionex` through a :class:`DatasetCache`.
+
+    Parameters
+    ----------
+    filename : str
+        IONEX file path.
+    read_metadata : bool
+        Forwarded to :func:`read_ionex` (separate cache entries per value).
+    cache : DatasetCache or None
+        Cache to use; defaults to the process-wide :data:`default_cache`.
+
+    Returns
+    -------
+    xr.Dataset
+        Read-only arrays — use ``ds.copy(deep=True)`` before modifying.
+    """
+    return (cache or default_cache).get(filename, read_metadata=read_metadata)
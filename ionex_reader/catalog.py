@@ -0,0 +1,299 @@
+"""
+catalog.py
+==========
+SQLite catalogue of an IONEX archive, so that choosing the files for a time
+range, agency or grid is a single indexed query instead of opening files.
+
+One row per file records the agency (``run_by``), IONEX version, grid,
+first / last epoch, interval, map count, whether a DCB auxiliary section
+is present, the product type decoded from the file name
+(:mod:`ionex_reader.filenames`), and the file's size and mtime.
+
+Cataloguing reads only the headers, with
+:func:`ionex_reader.ionex.scan_header`; the map count is the header's
+``# OF MAPS IN FILE`` record.  ``verify=True`` additionally streams each
+whole file once to record the SHA-256 of its raw bytes and the actual
+TEC / RMS block counts — in fixed-size chunks, never holding the file in
+memory.  Files are processed in a process pool, and re-scans only touch
+files whose size or mtime changed.
+
+Example
+-------
+>>> from ionex_reader.catalog import build_catalog
+>>> cat = build_catalog('/archive/ionex')            # incremental on re-runs
+>>> cat.select(('2024-03-01', '2024-03-07'), agency='JPL', resolution=(2.5, 5))
+['/archive/ionex/2024/061/jplg0610.24i.Z', ...]
+"""
+
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from ionex_reader.filenames import _looks_like_ionex, parse_ionex_filenames
+from ionex_reader.ionex import _open_stream, scan_header
+
+#: Default database file name, created at the archive root.
+DEFAULT_DB_NAME = '.ionex_catalog.sqlite'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    path          TEXT PRIMARY KEY,
+    size          INTEGER NOT NULL,
+    mtime_ns      INTEGER NOT NULL,
+    sha256        TEXT,             -- raw bytes; NULL unless verify=True
+    agency        TEXT,
+    solution      TEXT,             -- from the file name: 'FIN', 'RAP', …
+    ionex_version TEXT,
+    lat1 REAL, lat2 REAL, dlat REAL,
+    lon1 REAL, lon2 REAL, dlon REAL,
+    n_lat INTEGER, n_lon INTEGER, height REAL,
+    first_epoch   INTEGER,          -- unix seconds (UTC)
+    last_epoch    INTEGER,
+    interval      INTEGER,          -- seconds
+    n_maps        INTEGER,          -- '# OF MAPS IN FILE' header record
+    n_tec_maps    INTEGER,          -- counted blocks (verify=True), else n_maps
+    n_rms_maps    INTEGER,          -- NULL unless verify=True
+    has_rms       INTEGER,          -- NULL unless verify=True
+    has_dcb       INTEGER,
+    error         TEXT              -- set when the file could not be parsed
+);
+CREATE INDEX IF NOT EXISTS files_time   ON files (first_epoch, last_epoch);
+CREATE INDEX IF NOT EXISTS files_agency ON files (agency, first_epoch);
+'''
+
+_COLUMNS = (
+    'path', 'size', 'mtime_ns', 'sha256', 'agency', 'solution', 'ionex_version',
+    'lat1', 'lat2', 'dlat', 'lon1', 'lon2', 'dlon', 'n_lat', 'n_lon', 'height',
+    'first_epoch', 'last_epoch', 'interval', 'n_maps', 'n_tec_maps', 'n_rms_maps',
+    'has_rms', 'has_dcb', 'error',
+)
+
+
+def _unix(dt):
+    return None if dt is None else int(np.datetime64(dt, 's').astype(np.int64))
+
+
+_CHUNK = 1 << 20
+_BLOCK_TAGS = (b'START OF TEC MAP', b'START OF RMS MAP')
+
+
+def _hash_file(path):
+    """SHA-256 of the raw (still compressed) file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _count_blocks(path):
+    """``(n_tec, n_rms)`` map blocks, streaming the decompressed file."""
+    counts = [0, 0]
+    keep   = max(len(tag) for tag in _BLOCK_TAGS) - 1     # too short to hold a tag
+    tail   = b''
+    with _open_stream(path) as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            buf = tail + chunk
+            for k, tag in enumerate(_BLOCK_TAGS):
+                counts[k] += buf.count(tag)
+            tail = buf[-keep:]
+    return tuple(counts)
+
+
+def _describe(path, verify=False):
+    """
+    Catalogue row for one file (top-level so it pickles into the pool).
+
+    Only the header is read, unless *verify* — then the raw file is hashed
+    and the decompressed stream is searched for map blocks, both chunk by
+    chunk.  Parse failures are recorded in ``error``.
+    """
+    st  = os.stat(path)
+    row = dict.fromkeys(_COLUMNS)
+    row.update(path=path, size=st.st_size, mtime_ns=st.st_mtime_ns)
+    try:
+        info = scan_header(path)
+        lats, lons = info['latitude'], info['longitude']
+
+        row.update(
+            agency=info.get('run_by'), ionex_version=info.get('ionex_version'),
+            lat1=float(lats[0]), lat2=float(lats[-1]),
+            dlat=float(lats[1] - lats[0]) if lats.size > 1 else 0.0,
+            lon1=float(lons[0]), lon2=float(lons[-1]),
+            dlon=float(lons[1] - lons[0]) if lons.size > 1 else 0.0,
+            n_lat=int(lats.size), n_lon=int(lons.size),
+            height=float(info['height'][0]),
+            first_epoch=_unix(info['first_epoch']), last_epoch=_unix(info['last_epoch']),
+            interval=info['interval'], n_maps=info['n_maps'],
+            n_tec_maps=info['n_maps'], has_dcb=int(info['has_dcb']),
+        )
+        if verify:
+            row['sha256'] = _hash_file(path)
+            row['n_tec_maps'], row['n_rms_maps'] = _count_blocks(path)
+            row['has_rms'] = int(row['n_rms_maps'] > 0)
+    except Exception as exc:     # noqa: BLE001 — stored in the row
+        row['error'] = f'{type(exc).__name__}: {exc}'
+    return row
+
+
+class Catalog:
+    """
+    Handle on an IONEX catalogue database.
+
+    Parameters
+    ----------
+    db_path : str
+        SQLite file (created if missing).
+    """
+
+    def __init__(self, db_path):
+        self.db_path = os.fspath(db_path)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def update(self, root, workers=None, verify=False):
+        """
+        Walk *root* and bring the catalogue up to date.
+
+        Only new files and files whose size or mtime changed are read
+        (with *verify*, also files catalogued without a checksum); rows for
+        files that disappeared are deleted.
+
+        Returns
+        -------
+        dict
+            ``{'added': n, 'updated': n, 'removed': n, 'unchanged': n}``.
+        """
+        known = {p: (s, m, h) for p, s, m, h in self._conn.execute(
+            'SELECT path, size, mtime_ns, sha256 FROM files')}
+        seen, todo = set(), []
+        for dirpath, _, files in os.walk(os.fspath(root)):
+            for name in files:
+                if not _looks_like_ionex(name):
+                    continue
+                path = os.path.abspath(os.path.join(dirpath, name))
+                seen.add(path)
+                st = os.stat(path)
+                size, mtime, digest = known.get(path, (None, None, None))
+                if (size, mtime) != (st.st_size, st.st_mtime_ns) or (verify and not digest):
+                    todo.append(path)
+
+        removed = [p for p in known if p not in seen]
+        describe = partial(_describe, verify=verify)
+        if todo:
+            if workers == 1 or len(todo) == 1:
+                rows = [describe(p) for p in todo]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    rows = list(pool.map(describe, todo, chunksize=16))
+        else:
+            rows = []
+
+        # Product type comes from the name; so does the agency when the
+        # header has no usable RUN BY field.
+        names = parse_ionex_filenames(todo)
+        for row, rec in zip(rows, names):
+            row['solution'] = rec['solution'] or None
+            if not row['agency'] and rec['agency']:
+                row['agency'] = str(rec['agency'])
+
+        with self._conn:
+            self._conn.executemany('DELETE FROM files WHERE path = ?',
+                                   [(p,) for p in removed])
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO files ({", ".join(_COLUMNS)}) '
+                f'VALUES ({", ".join("?" * len(_COLUMNS))})',
+                [tuple(row[c] for c in _COLUMNS) for row in rows],
+            )
+        updated = sum(p in known for p in todo)
+        return {'added': len(todo) - updated, 'updated': updated,
+                'removed': len(removed), 'unchanged': len(seen) - len(todo)}
+
+    def select(self, time_range=None, agency=None, resolution=None, solution=None):
+        """
+        Paths of catalogued files matching every given criterion, ordered by
+        first epoch (then path).
+
+        Parameters
+        ----------
+        time_range : (start, end) or None
+            Files whose ``[first_epoch, last_epoch]`` overlaps the range.
+            Bounds accept anything ``np.datetime64`` accepts.
+        agency : str or None
+            ``run_by`` value, case-insensitive (e.g. ``'JPL'``, ``'CODE'``).
+        resolution : float, (dlat, dlon) or None
+            Grid spacing in degrees (absolute values); a single number
+            requires both spacings to equal it.
+        solution : str or None
+            Product type decoded from the file name (``'FIN'``, ``'RAP'`` …).
+
+        Returns
+        -------
+        list of str
+        """
+        where, args = ['error IS NULL'], []
+        if time_range is not None:
+            start, end = time_range
+            where.append('first_epoch <= ? AND last_epoch >= ?')
+            args += [_unix(end), _unix(start)]
+        if agency is not None:
+            where.append('agency = ? COLLATE NOCASE')
+            args.append(agency)
+        if resolution is not None:
+            dlat, dlon = (resolution, resolution) if np.isscalar(resolution) \
+                else resolution
+            where.append('ABS(ABS(dlat) - ?) < 1e-6 AND ABS(ABS(dlon) - ?) < 1e-6')
+            args += [abs(dlat), abs(dlon)]
+        if solution is not None:
+            where.append('solution = ? COLLATE NOCASE')
+            args.append(solution)
+        sql = f'SELECT path FROM files WHERE {" AND ".join(where)} ORDER BY first_epoch, path'
+        return [p for (p,) in self._conn.execute(sql, args)]
+
+    def errors(self):
+        """``{path: error}`` for files that could not be parsed."""
+        return dict(self._conn.execute(
+            'SELECT path, error FROM files WHERE error IS NOT NULL'))
+
+
+def build_catalog(root, db_path=None, workers=None, verify=False):
+    """
+    Create or incrementally refresh the catalogue of the archive at *root*.
+
+    Parameters
+    ----------
+    root : str
+        Archive directory (walked recursively).
+    db_path : str or None
+        SQLite file; defaults to ``<root>/.ionex_catalog.sqlite``.
+    workers : int or None
+        Process-pool size for reading changed files (default: all cores).
+    verify : bool
+        Also stream each file once to record its SHA-256 and the actual
+        TEC / RMS block counts (``n_rms_maps``, ``has_rms``).  Default: the
+        header only.
+
+    Returns
+    -------
+    Catalog
+        Open handle; ``catalog.last_update`` holds the update counts.
+    """
+    catalog = Catalog(db_path or os.path.join(os.fspath(root), DEFAULT_DB_NAME))
+    catalog.last_update = catalog.update(root, workers=workers, verify=verify)
+    return catalog
@@ -0,0 +1,287 @@
+"""
+cli.py
+======
+Command-line interface — installed as the ``ionex-reader`` console script.
+
+Sub-commands
+------------
+convert     Batch-convert IONEX files (plain or compressed) to NetCDF, Zarr
+            or compact ``.npz`` using a process pool.
+serve       Run the local HTTP TEC query service (:mod:`ionex_reader.serve`).
+
+Example
+-------
+    ionex-reader convert /archive/ionex/2024 -o /data/nc -f netcdf \\
+                 --access timeseries --complevel 4 -j 16
+
+NetCDF and Zarr outputs go through :mod:`ionex_reader.export`.
+
+Each converted file is reported on its own line with its throughput; the
+command exits with status 1 if any file failed and 2 on usage errors
+(including inputs that match no file).
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from ionex_reader.export import (
+    INT16_FILL, INT16_SCALE, to_netcdf_optimized, to_zarr_optimized,
+)
+from ionex_reader.filenames import _looks_like_ionex
+from ionex_reader.ionex import COMPRESSED_SUFFIXES, read_ionex
+
+# Output format → file-name suffix.
+_FORMATS = {'netcdf': '.nc', 'zarr': '.zarr', 'npz': '.npz'}
+
+
+# ===========================================================================
+# 1.  INPUT DISCOVERY
+# ===========================================================================
+
+def _expand_inputs(inputs):
+    """
+    Expand files, directories (recursively) and glob patterns into a sorted
+    list of ``(path, relative_output_stem)`` pairs, plus the inputs that
+    matched nothing (missing files and directories, empty globs).
+
+    Files found under a directory keep their sub-directory layout relative to
+    that directory, so converting a ``YYYY/DDD/`` tree does not flatten it.
+    """
+    found, missing = {}, []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in files:
+                    if _looks_like_ionex(name):
+                        path = os.path.join(root, name)
+                        found[path] = os.path.relpath(path, item)
+            continue
+        matches = glob.glob(item, recursive=True) if glob.has_magic(item) else [item]
+        files = [path for path in matches if os.path.isfile(path)]
+        if not files:
+            missing.append(item)
+        for path in files:
+            found[path] = os.path.basename(path)
+    return sorted(found.items()), missing
+
+
+def _output_path(rel, out_dir, fmt):
+    """``YYYY/igsg0010.24i.Z`` → ``<out_dir>/YYYY/igsg0010.24i.nc``."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if rel.endswith(suffix):
+            rel = rel[:-len(suffix)]
+            break
+    return os.path.join(out_dir, rel + _FORMATS[fmt])
+
+
+# ===========================================================================
+# 2.  WRITERS
+# ===========================================================================
+
+def _write_npz(ds, path, dtype, complevel):
+    """Write a compact ``.npz`` — packed arrays plus coordinates and attrs."""
+    arrays = {
+        'time':      ds['time'].values.astype('datetime64[s]'),
+        'latitude':  ds['latitude'].values,
+        'longitude': ds['longitude'].values,
+    }
+    for name in ('tec', 'rms'):
+        values = ds[name].values
+        if dtype == 'int16':
+            packed = np.round(values / INT16_SCALE)
+            packed[~np.isfinite(packed)] = INT16_FILL
+            arrays[name] = packed.astype(np.int16)
+        else:
+            arrays[name] = values.astype(dtype)
+    if dtype == 'int16':
+        arrays['scale_factor'] = np.float64(INT16_SCALE)
+        arrays['fill_value']   = np.int16(INT16_FILL)
+    for key, value in ds.attrs.items():
+        arrays[f'attr_{key}'] = np.asarray(value)
+
+    save = np.savez_compressed if complevel else np.savez
+    with open(path, 'wb') as f:       # file object → no implicit '.npz' suffix
+        save(f, **arrays)
+
+
+def _write(ds, path, fmt, options):
+    if fmt == 'npz':
+        _write_npz(ds, path, options['dtype'], options['complevel'])
+    elif fmt == 'netcdf':
+        to_netcdf_optimized(ds, path, access=options['access'],
+                            dtype=options['dtype'], complevel=options['complevel'],
+                            time_major=options['time_major'])
+    else:
+        to_zarr_optimized(ds, path, access=options['access'],
+                          dtype=options['dtype'], clevel=options['complevel'],
+                          time_major=options['time_major'])
+
+
+# ===========================================================================
+# 3.  WORKER  (top-level so it pickles into the process pool)
+# ===========================================================================
+
+def _convert_one(src, dst, fmt, options, read_metadata):
+    """
+    Convert one file.  Never raises — errors are returned as a string so one
+    bad file cannot take down the pool.
+
+    Returns ``(src, dst, n_bytes, n_maps, seconds, error_or_None)``.
+    """
+    t0 = time.perf_counter()
+    try:
+        n_bytes = os.path.getsize(src)
+        ds = read_ionex(src, read_metadata=read_metadata)
+        os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+        _write(ds, dst, fmt, options)
+        return src, dst, n_bytes, ds.sizes['time'], time.perf_counter() - t0, None
+    except Exception as exc:     # noqa: BLE001 — reported, not swallowed
+        return src, dst, 0, 0, time.perf_counter() - t0, f'{type(exc).__name__}: {exc}'
+
+
+# ===========================================================================
+# 4.  SUB-COMMANDS
+# ===========================================================================
+
+def _cmd_convert(args):
+    inputs, missing = _expand_inputs(args.inputs)
+    for item in missing:
+        print(f'error: no such file: {item}', file=sys.stderr)
+    if not inputs:
+        print('No IONEX files to convert.', file=sys.stderr)
+    if missing or not inputs:
+        return 2
+
+    # Glob matches are written under their base name, so inputs from
+    # different directories can map onto one output: refuse rather than let
+    # them overwrite each other.
+    sources = {}
+    for src, rel in inputs:
+        sources.setdefault(_output_path(rel, args.output_dir, args.format), []).append(src)
+    clashes = {dst: srcs for dst, srcs in sources.items() if len(srcs) > 1}
+    if clashes:
+        for dst, srcs in sorted(clashes.items()):
+            print(f'error: {", ".join(srcs)} would all be written to {dst}',
+                  file=sys.stderr)
+        print('Convert them in separate runs with different --output-dir, or pass '
+              'their parent directory to keep the sub-directory layout.',
+              file=sys.stderr)
+        return 2
+
+    tasks = []
+    for dst, (src,) in sources.items():
+        if os.path.exists(dst) and not args.overwrite:
+            print(f'skip  {src}  ({dst} exists)', flush=True)
+            continue
+        tasks.append((src, dst))
+
+    if not tasks:
+        print('No IONEX files to convert.', file=sys.stderr)
+        return 0
+
+    options = {'dtype': args.dtype, 'complevel': args.complevel,
+               'access': args.access, 'time_major': args.time_major}
+    workers = min(args.workers or os.cpu_count() or 1, len(tasks))
+    n_fail  = 0
+    n_bytes = 0
+    t0      = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_convert_one, src, dst, args.format, options,
+                        args.read_metadata)
+            for src, dst in tasks
+        ]
+        for fut in as_completed(futures):
+            src, dst, size, n_maps, secs, err = fut.result()
+            if err:
+                n_fail += 1
+                print(f'FAIL  {src}: {err}', file=sys.stderr, flush=True)
+                continue
+            n_bytes += size
+            rate = size / secs / 1e6 if secs > 0 else float('inf')
+            print(f'ok    {src} -> {dst}  ({n_maps} maps, {secs:.2f} s, '
+                  f'{rate:.1f} MB/s)', flush=True)
+
+    wall = time.perf_counter() - t0
+    n_ok = len(tasks) - n_fail
+    print(f'{n_ok} converted, {n_fail} failed in {wall:.1f} s '
+          f'({n_bytes / wall / 1e6:.1f} MB/s aggregate, {workers} workers)',
+          file=sys.stderr)
+    return 1 if n_fail else 0
+
+
+def _cmd_serve(args):
+    from ionex_reader.serve import serve
+    serve(args.root, host=args.host, port=args.port,
+          max_concurrency=args.max_concurrency, verbose=args.verbose)
+    return 0
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog='ionex-reader',
+        description='Tools for IONEX ionospheric TEC map files.',
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    conv = sub.add_parser(
+        'convert',
+        help='batch-convert IONEX files to NetCDF / Zarr / npz',
+        description='Convert IONEX files (plain, .gz, .Z, .bz2, .xz) in parallel.',
+    )
+    conv.add_argument('inputs', nargs='+',
+                      help='files, directories (searched recursively) or glob patterns')
+    conv.add_argument('-o', '--output-dir', default='.',
+                      help='destination directory (default: current directory)')
+    conv.add_argument('-f', '--format', choices=sorted(_FORMATS), default='netcdf',
+                      help='output format (default: netcdf)')
+    conv.add_argument('--dtype', choices=('float64', 'float32', 'int16'),
+                      default='int16',
+                      help='stored dtype; int16 packs with scale_factor=0.1 '
+                           '(default: int16)')
+    conv.add_argument('--complevel', type=int, default=4, choices=range(10),
+                      metavar='0-9',
+                      help='compression level, 0 disables (default: 4)')
+    conv.add_argument('--access', choices=('maps', 'timeseries'), default='maps',
+                      help='NetCDF/Zarr chunk layout: whole maps or point '
+                           'time series (default: maps)')
+    conv.add_argument('--time-major', action='store_true',
+                      help="also write a time-major copy (group 'time_major')")
+    conv.add_argument('-j', '--workers', type=int, default=None,
+                      help='worker processes (default: all cores)')
+    conv.add_argument('--read-metadata', action='store_true',
+                      help='attach ionex_version / run_by attributes')
+    conv.add_argument('--overwrite', action='store_true',
+                      help='replace existing outputs instead of skipping them')
+    conv.set_defaults(func=_cmd_convert)
+
+    srv = sub.add_parser(
+        'serve',
+        help='serve point / bbox / time-series TEC queries over HTTP',
+        description='Index a directory of IONEX files and answer TEC queries.',
+    )
+    srv.add_argument('root', help='directory of IONEX files (searched recursively)')
+    srv.add_argument('--host', default='127.0.0.1', help='bind address (default: 127.0.0.1)')
+    srv.add_argument('--port', type=int, default=8080, help='port (default: 8080)')
+    srv.add_argument('--max-concurrency', type=int, default=8,
+                     help='requests processed at once (default: 8)')
+    srv.add_argument('-v', '--verbose', action='store_true', help='log every request')
+    srv.set_defaults(func=_cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    """Console-script entry point.  Returns the process exit status."""
+    args = _build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
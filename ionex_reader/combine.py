@@ -0,0 +1,315 @@
+"""
+combine.py
+==========
+Combine several agencies' IONEX products into one RMS-weighted TEC map
+per epoch.
+
+Each product (a group of files, e.g. every ``codg*.24i`` of a month) is
+streamed with :func:`ionex_reader.stream.iter_maps`, regridded onto a
+common grid with cached sparse weights
+(:func:`ionex_reader.regridding.regrid_weights`), and the products are
+merged epoch by epoch::
+
+    w_i   = 1 / rms_i²                        (weights='inverse_rms')
+    tec   = Σ w_i tec_i / Σ w_i
+    rms   = √(Σ w_i² rms_i²) / Σ w_i          (= 1 / √Σ w_i for inverse-RMS)
+
+Only per-epoch accumulators are held, so memory does not depend on the
+number or size of the files.  Days are independent and are combined in
+parallel, in a bounded window so finished days are handed on in order —
+to the returned Dataset, to an :class:`ionex_reader.archive.IonexArchive`
+or to any callable writer.
+
+Example
+-------
+>>> from ionex_reader.combine import combine_products
+>>> ds = combine_products({'cod': sorted(glob('codg*.24i')),
+...                        'jpl': sorted(glob('jplg*.24i')),
+...                        'upc': sorted(glob('uqrg*.24i'))}, workers=4)
+>>> combine_products(groups, out='/data/combined.zarr', workers=4)   # → IonexArchive
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from ionex_reader.ionex import _create_xarray, scan_header
+from ionex_reader.regridding import _signature, regrid_weights
+from ionex_reader.stream import iter_maps
+
+_DAY = np.timedelta64(1, 'D')
+
+
+def _normalise_groups(path_groups):
+    """``{name: [paths]}`` from a mapping or a sequence of path groups."""
+    if hasattr(path_groups, 'items'):
+        items = path_groups.items()
+    else:
+        items = ((f'product{i}', g) for i, g in enumerate(path_groups))
+    groups = {}
+    for name, paths in items:
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        groups[str(name)] = [os.fspath(p) for p in paths]
+    if not groups or not all(groups.values()):
+        raise ValueError('path_groups must hold at least one non-empty group of files.')
+    return groups
+
+
+def _day_tasks(groups, headers):
+    """
+    ``[(day, {name: [file, …]}), …]`` for every UTC day any product covers.
+
+    Each file is ``(path, first, last, lats, lons)`` from its header, so day
+    tasks never re-read headers.
+    """
+    spans = {}
+    for name, paths in groups.items():
+        files = []
+        for path in paths:
+            header = headers[path]
+            if header['first_epoch'] is not None:
+                first = np.datetime64(header['first_epoch'], 's')
+                last  = np.datetime64(header['last_epoch'] or header['first_epoch'], 's')
+                files.append((path, first, last, header['latitude'], header['longitude']))
+        files.sort(key=lambda f: f[1])
+        starts = {f[1].astype('datetime64[D]') for f in files}
+        for file in files:
+            first, last = file[1], file[2]
+            day = first.astype('datetime64[D]')
+            while day <= last:
+                # A daily file's closing 24:00 map is the next day's 00:00,
+                # read from that day's own file when the product has one.
+                if day < last or day == first.astype('datetime64[D]') or day not in starts:
+                    spans.setdefault(day, {}).setdefault(name, []).append(file)
+                day += _DAY
+    return sorted(spans.items())
+
+
+def _file_grid(files, epoch):
+    """
+    Grid key of the file a chained map at *epoch* came from: the earliest
+    file covering it (:func:`iter_maps` keeps the first copy of an epoch).
+    """
+    fallback = files[0][3]                  # header epochs off: latest started
+    for _, first, last, key in files:
+        if first <= epoch <= last:
+            return key
+        if first <= epoch:
+            fallback = key
+    return fallback
+
+
+def _combine_day(day, files, grid, method, weights, min_products, min_rms):
+    """
+    Combine one UTC day (top-level so it pickles into a process pool).
+    Returns ``(epochs, tec, rms, n_products)``.
+    """
+    lats, lons = grid
+    shape = (lats.size, lons.size)
+    stop  = day + _DAY
+
+    streams, regridders, grids = {}, {}, {}
+    for name, entries in files.items():
+        # Keyed by grid coordinates: a product may change grid within a
+        # period, and grids of one shape can differ (0…360 vs -180…180).
+        regridders[name], grids[name] = {}, []
+        for path, first, last, src_lats, src_lons in entries:
+            key = (_signature(src_lats), _signature(src_lons))
+            if key not in regridders[name]:
+                same = (src_lats.shape == lats.shape and src_lons.shape == lons.shape
+                        and np.allclose(src_lats, lats) and np.allclose(src_lons, lons))
+                regridders[name][key] = (
+                    None if same else regrid_weights(src_lats, src_lons, lats, lons, method))
+            grids[name].append((path, first, last, key))
+        streams[name] = iter_maps([path for path, *_ in entries])
+
+    def advance(name):
+        """Next map of *name* inside the day, or ``None``."""
+        for epoch, tec, rms in streams[name]:
+            if epoch >= stop:
+                break
+            if epoch >= day:
+                return epoch, tec, rms
+        streams[name].close()
+        return None
+
+    heads = {name: advance(name) for name in streams}
+    epochs, tec_out, rms_out, counts = [], [], [], []
+    try:
+        while any(h is not None for h in heads.values()):
+            epoch = min(h[0] for h in heads.values() if h is not None)
+            members = [name for name, h in heads.items() if h is not None and h[0] == epoch]
+            if len(members) >= min_products:
+                sw, swx, sw2v = (np.zeros(shape) for _ in range(3))
+                for name in members:
+                    _, tec, rms = heads[name]
+                    W = regridders[name][_file_grid(grids[name], epoch)]
+                    if W is not None:
+                        tec = W.mean(tec.ravel()).reshape(shape)
+                        rms = np.sqrt(W.mean((rms ** 2).ravel())).reshape(shape)
+                    if weights == 'inverse_rms':
+                        w = 1.0 / np.maximum(rms, min_rms) ** 2
+                    elif weights == 'equal':
+                        w = np.ones(shape)
+                    else:
+                        w = np.full(shape, float(weights[name]))
+                    w = np.where(np.isfinite(tec) & np.isfinite(w), w, 0.0)
+                    sw   += w
+                    swx  += w * np.nan_to_num(tec)
+                    sw2v += np.where(w > 0, w ** 2 * rms ** 2, 0.0)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    tec_out.append(np.where(sw > 0, swx / sw, np.nan))
+                    rms_out.append(np.where(sw > 0, np.sqrt(sw2v) / sw, np.nan))
+                epochs.append(epoch)
+                counts.append(len(members))
+            for name in members:
+                heads[name] = advance(name)
+    finally:
+        for stream in streams.values():
+            stream.close()
+
+    if not epochs:
+        empty = np.empty((0,) + shape)
+        return np.array([], dtype='datetime64[s]'), empty, empty, np.array([], np.int16)
+    return (np.array(epochs, dtype='datetime64[s]'), np.stack(tec_out),
+            np.stack(rms_out), np.array(counts, dtype=np.int16))
+
+
+def _ordered_results(tasks, run, workers, executor):
+    """Yield ``run(*task)`` in task order, at most ``2 × workers`` in flight."""
+    if workers == 1:
+        for task in tasks:
+            yield run(*task)
+        return
+    pool = (ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor)(
+        max_workers=workers)
+    window = deque()
+    try:
+        for task in tasks:
+            window.append(pool.submit(run, *task))
+            if len(window) >= 2 * workers:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+    finally:
+        for future in window:
+            future.cancel()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _to_dataset(epochs, tec, rms, counts, grid, metadata):
+    ds = _create_xarray(tec, rms, epochs.astype('datetime64[ns]'), grid[0], grid[1], metadata)
+    ds['n_products'] = ('time', counts)
+    ds['n_products'].attrs['long_name'] = 'Number of combined products'
+    return ds
+
+
+def combine_products(path_groups,
+                     weights='inverse_rms',
+                     grid=None,
+                     method='bilinear',
+                     min_products=1,
+                     min_rms=0.1,
+                     workers=1,
+                     executor='process',
+                     out=None):
+    """
+    Combine several products into one weighted TEC / RMS cube, streaming.
+
+    Parameters
+    ----------
+    path_groups : mapping or sequence
+        ``{name: paths}`` (or a list of path lists), one entry per product —
+        e.g. one agency's daily files.  Files may be compressed and in any
+        order.
+    weights : {'inverse_rms', 'equal'} or mapping
+        ``'inverse_rms'`` (default) — inverse-variance weights ``1/rms²``
+        from each product's RMS maps (products without RMS maps then
+        contribute nothing); ``'equal'``; or fixed ``{name: weight}``.
+    grid : (lats, lons) or None
+        Common grid, e.g. from :func:`ionex_reader.ionex.get_grid`.  Default:
+        the grid of the first product.
+    method : {'bilinear', 'conservative', 'nearest'}
+        Regridding of products on other grids (see
+        :func:`ionex_reader.regridding.regrid`); RMS is regridded as variance.
+    min_products : int
+        Epochs present in fewer products are skipped (``len(path_groups)``
+        keeps only the epochs common to all).
+    min_rms : float
+        Floor (TECU) on the RMS used for weighting, so a zero RMS does not
+        take all the weight.
+    workers : int
+        Days combined in parallel (default ``1`` — in-process).
+    executor : {'process', 'thread'}
+        Pool type for ``workers > 1``.
+    out : None, str, path-like, IonexArchive or callable
+        ``None`` — return an ``xr.Dataset``.  A path or
+        :class:`ionex_reader.archive.IonexArchive` — append each day to that
+        archive as it is finished.  A callable — called with each day's
+        Dataset, in time order (e.g. a NetCDF writer).
+
+    Returns
+    -------
+    xr.Dataset, IonexArchive or None
+        For ``out=None``: ``tec`` and ``rms`` on ``(time, latitude,
+        longitude)`` plus ``n_products`` on ``time``.  Otherwise the archive,
+        or ``None`` for a callable.
+
+    Raises
+    ------
+    ValueError
+        For empty groups, unknown *weights*, *method* or *executor*, or
+        fixed weights missing a product.
+    """
+    groups = _normalise_groups(path_groups)
+    if isinstance(weights, str):
+        if weights not in ('inverse_rms', 'equal'):
+            raise ValueError("weights must be 'inverse_rms', 'equal' or {name: weight}.")
+    else:
+        weights = {str(k): float(v) for k, v in dict(weights).items()}
+        missing = set(groups) - set(weights)
+        if missing:
+            raise ValueError(f'No weight given for products {sorted(missing)}.')
+    if executor not in ('thread', 'process'):
+        raise ValueError("executor must be 'thread' or 'process'.")
+
+    headers = {p: scan_header(p) for paths in groups.values() for p in paths}
+    if grid is None:
+        first = headers[next(iter(groups.values()))[0]]
+        grid  = (first['latitude'], first['longitude'])
+    grid = tuple(np.asarray(axis, dtype=np.float64) for axis in grid)
+    regrid_weights(grid[0], grid[1], grid[0], grid[1], method)       # validates *method*
+
+    options = (grid, method, weights, int(min_products), float(min_rms))
+    tasks   = [(day, files) + options for day, files in _day_tasks(groups, headers)]
+    metadata = {'products': ', '.join(groups),
+                'combination': weights if isinstance(weights, str) else 'fixed'}
+
+    write = archive = None
+    if callable(out):
+        write = out
+    elif out is not None:
+        from ionex_reader.archive import IonexArchive
+        archive = out if isinstance(out, IonexArchive) else IonexArchive(out)
+        write = archive.append
+
+    days = []
+    for day in _ordered_results(tasks, _combine_day, max(1, int(workers)), executor):
+        if write is None:
+            days.append(day)
+        elif day[0].size:
+            write(_to_dataset(*day, grid, metadata))
+    if write is not None:
+        return archive
+
+    if days:
+        parts = [np.concatenate(p) for p in zip(*days)]
+    else:
+        parts = [np.array([], dtype='datetime64[s]'),
+                 np.empty((0, grid[0].size, grid[1].size)),
+                 np.empty((0, grid[0].size, grid[1].size)),
+                 np.array([], dtype=np.int16)]
+    return _to_dataset(*parts, grid, metadata)
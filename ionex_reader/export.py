@@ -0,0 +1,234 @@
+"""
+export.py
+=========
+Compact, chunked NetCDF / Zarr writers for Datasets returned by
+:func:`ionex_reader.ionex.read_ionex`.
+
+``ds.to_netcdf()`` on a freshly read Dataset stores uncompressed float64 with
+no chunking.  The helpers here store ``tec`` / ``rms`` as int16 packed with
+``scale_factor = 0.1`` (the native IONEX resolution, ``EXPONENT -1``), apply
+deflate (NetCDF) or Blosc (Zarr) compression, and choose a chunk layout for
+the expected read pattern:
+
+``access='maps'``
+    One chunk per epoch holding the whole map — reading a map touches a
+    single chunk.
+``access='timeseries'``
+    Every chunk spans the full time axis over a small lat/lon tile —
+    reading a point series touches a single chunk.
+
+``time_major=True`` additionally writes a transposed
+``(latitude, longitude, time)`` copy into the ``time_major`` group, so one
+store serves both patterns.  Open it with
+``xr.open_dataset(path, group='time_major')``.
+
+Typical result for a 1-day 2.5° × 5° file: ~10× smaller than
+``ds.to_netcdf()``.
+"""
+
+import numpy as np
+
+# int16 packing — 0.1 TECU steps, NaN ↔ fill value, range ±3276.7 TECU.
+INT16_SCALE = 0.1
+INT16_FILL  = np.iinfo(np.int16).min
+
+_VARIABLES    = ('tec', 'rms')
+_ACCESS_MODES = ('maps', 'timeseries')
+
+# Target uncompressed chunk size for 'timeseries' tiles.
+_TARGET_CHUNK_BYTES = 1 << 20
+
+
+# ===========================================================================
+# 1.  CHUNK LAYOUT / ENCODING
+# ===========================================================================
+
+def _chunk_layout(ds, access, itemsize):
+    """
+    Return ``{dim: chunk_length}`` for the requested *access* pattern.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+    access : {'maps', 'timeseries'}
+    itemsize : int
+        Bytes per stored value (2 for int16).
+    """
+    if access not in _ACCESS_MODES:
+        raise ValueError(f"access must be one of {_ACCESS_MODES}, got {access!r}.")
+
+    n_time = ds.sizes['time']
+    n_lat  = ds.sizes['latitude']
+    n_lon  = ds.sizes['longitude']
+
+    if access == 'maps':
+        return {'time': 1, 'latitude': n_lat, 'longitude': n_lon}
+
+    # Square lat/lon tile such that n_time × tile² × itemsize ≈ target.
+    tile = int(np.sqrt(_TARGET_CHUNK_BYTES / (max(n_time, 1) * itemsize)))
+    tile = max(tile, 1)
+    return {'time': n_time,
+            'latitude': min(tile, n_lat),
+            'longitude': min(tile, n_lon)}
+
+
+def _packing(dtype):
+    """Encoding entries for the stored *dtype* (plus CF packing for int16)."""
+    if np.dtype(dtype) == np.int16:
+        return {'dtype': 'int16', 'scale_factor': INT16_SCALE, '_FillValue': INT16_FILL}
+    if np.dtype(dtype).kind != 'f':
+        raise ValueError(f"dtype must be 'int16' or a float dtype, got {dtype!r}.")
+    return {'dtype': np.dtype(dtype).name}
+
+
+def _prepare(ds, layout, dims):
+    """
+    Select the TEC/RMS variables, order them as *dims*, and re-chunk
+    dask-backed inputs so dask chunks line up with the on-disk chunks.
+    """
+    out = ds[[v for v in _VARIABLES if v in ds]].transpose(*dims)
+    if any(out[v].chunks is not None for v in out.data_vars):
+        out = out.chunk(layout)
+    return out
+
+
+# ===========================================================================
+# 2.  NETCDF
+# ===========================================================================
+
+def to_netcdf_optimized(ds, path, access='maps', dtype='int16', complevel=4,
+                        compression='zlib', chunks=None, time_major=False):
+    """
+    Write *ds* to a packed, compressed, chunked NetCDF-4 file.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Dataset from :func:`read_ionex` (``tec`` and/or ``rms`` variables).
+    path : str or path-like
+        Output file.  Overwritten if it exists.
+    access : {'maps', 'timeseries'}
+        Read pattern the chunk layout is tuned for (see module docstring).
+    dtype : str
+        ``'int16'`` (packed, default), ``'float32'`` or ``'float64'``.
+    complevel : int
+        Compression level 0–9; ``0`` disables compression.
+    compression : str
+        ``'zlib'`` (deflate, default) or any filter name the installed
+        netCDF4 supports, e.g. ``'zstd'`` or ``'blosc_lz4'``.
+    chunks : dict or None
+        ``{dim: length}`` overriding the *access* layout; dimensions not
+        given keep the *access* chunk length.
+    time_major : bool
+        Also write a ``(latitude, longitude, time)`` copy into the
+        ``time_major`` group, chunked for point time series.
+
+    Returns
+    -------
+    path
+    """
+    packing  = _packing(dtype)
+    itemsize = np.dtype(packing['dtype']).itemsize
+    dims     = ('time', 'latitude', 'longitude')
+    layout   = {**_chunk_layout(ds, access, itemsize), **dict(chunks or {})}
+
+    def encoding(data, layout):
+        enc = {}
+        for name in data.data_vars:
+            e = dict(packing, chunksizes=tuple(layout[d] for d in data[name].dims))
+            if complevel:
+                if compression == 'zlib':
+                    e.update(zlib=True, complevel=complevel, shuffle=True)
+                else:
+                    e.update(compression=compression, complevel=complevel)
+            enc[name] = e
+        return enc
+
+    data = _prepare(ds, layout, dims)
+    data.to_netcdf(path, mode='w', encoding=encoding(data, layout))
+
+    if time_major:
+        tm_layout = _chunk_layout(ds, 'timeseries', itemsize)
+        tm = _prepare(ds, tm_layout, ('latitude', 'longitude', 'time'))
+        tm.to_netcdf(path, mode='a', group='time_major',
+                     encoding=encoding(tm, tm_layout))
+    return path
+
+
+# ===========================================================================
+# 3.  ZARR
+# ===========================================================================
+
+def _zarr_compression(cname, clevel):
+    """Blosc codec encoding for whichever zarr major version is installed."""
+    try:
+        import zarr
+    except ImportError:
+        raise ImportError(
+            "The 'zarr' package is required for Zarr export.\n"
+            "Install it with:  pip install zarr"
+        )
+    zarr_v3 = int(zarr.__version__.split('.')[0]) >= 3
+    if not clevel:
+        return {'compressors': None} if zarr_v3 else {'compressor': None}
+    if zarr_v3:
+        from zarr.codecs import BloscCodec
+        return {'compressors': (BloscCodec(cname=cname, clevel=clevel,
+                                           shuffle='shuffle'),)}
+    from numcodecs import Blosc
+    return {'compressor': Blosc(cname=cname, clevel=clevel, shuffle=Blosc.SHUFFLE)}
+
+
+def to_zarr_optimized(ds, store, access='maps', dtype='int16', cname='zstd',
+                      clevel=5, chunks=None, time_major=False):
+    """
+    Write *ds* to a packed, Blosc-compressed, chunked Zarr store.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Dataset from :func:`read_ionex` (``tec`` and/or ``rms`` variables).
+    store : str, path-like or zarr store
+        Destination.  Overwritten if it exists.
+    access : {'maps', 'timeseries'}
+        Read pattern the chunk layout is tuned for (see module docstring).
+    dtype : str
+        ``'int16'`` (packed, default), ``'float32'`` or ``'float64'``.
+    cname : str
+        Blosc compressor: ``'zstd'`` (default), ``'lz4'``, ``'zlib'``, …
+    clevel : int
+        Compression level 0–9; ``0`` disables compression.
+    chunks : dict or None
+        ``{dim: length}`` overriding the *access* layout; dimensions not
+        given keep the *access* chunk length.
+    time_major : bool
+        Also write a ``(latitude, longitude, time)`` copy into the
+        ``time_major`` group, chunked for point time series.
+
+    Returns
+    -------
+    store
+    """
+    packing   = _packing(dtype)
+    itemsize  = np.dtype(packing['dtype']).itemsize
+    codec     = _zarr_compression(cname, clevel)
+    dims      = ('time', 'latitude', 'longitude')
+    layout    = {**_chunk_layout(ds, access, itemsize), **dict(chunks or {})}
+
+    def encoding(data, layout):
+        return {
+            name: dict(packing, chunks=tuple(layout[d] for d in data[name].dims),
+                       **codec)
+            for name in data.data_vars
+        }
+
+    data = _prepare(ds, layout, dims)
+    data.to_zarr(store, mode='w', encoding=encoding(data, layout),
+                 consolidated=False)
+
+    if time_major:
+        tm_layout = _chunk_layout(ds, 'timeseries', itemsize)
+        tm = _prepare(ds, tm_layout, ('latitude', 'longitude', 'time'))
+        tm.to_zarr(store, mode='w', group='time_major',
+                   encoding=encoding(tm, tm_layout), consolidated=False)
+    return store
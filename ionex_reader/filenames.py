@@ -0,0 +1,170 @@
+"""
+filenames.py
+============
+Decode IONEX file names without opening the files.
+
+Two conventions are recognised (case-insensitive, any directory prefix,
+optionally followed by a compression suffix):
+
+Legacy (IGS, pre-2023)  ``cccgDDDs.YYi``
+    e.g. ``igsg0010.24i``, ``jplg0610.24i.Z``.  ``ccc`` is the analysis
+    centre, ``DDD`` the day of year, ``s`` the session (``0`` = daily,
+    ``a``–``x`` = hourly) and ``YY`` the two-digit year (80–99 → 19YY).
+    Rapid / predicted products are told apart by the centre code
+    (``igrg``, ``corg``, ``c1pg`` …); sampling is not part of the name.
+
+IGS long names (2023+)  ``AAAVPPPTTT_YYYYDDDHHMM_LEN_SMP_GIM.INX``
+    e.g. ``IGS0OPSFIN_20240010000_01D_02H_GIM.INX.gz`` — agency, version,
+    project, solution type, start, span and sampling.
+
+:func:`parse_ionex_filenames` decodes thousands of names in one pass (one
+regex scan over the joined names, then numpy date arithmetic) and returns a
+structured array, so archive tools can filter by agency, product and date
+before reading anything.
+"""
+
+import os
+import re
+
+import numpy as np
+
+from ionex_reader.ionex import COMPRESSED_SUFFIXES
+
+#: dtype of the array returned by :func:`parse_ionex_filenames`.
+FILENAME_DTYPE = np.dtype([
+    ('agency',      'U3'),               # upper case, e.g. 'JPL', 'IGS'
+    ('solution',    'U3'),               # 'FIN', 'RAP', 'PRD', 'ULT', 'NRT' …
+    ('start',       'datetime64[s]'),    # NaT if the name is not recognised
+    ('span',        'timedelta64[s]'),
+    ('sampling',    'timedelta64[s]'),   # NaT for legacy names
+    ('compression', 'U4'),               # '', 'gz', 'Z', 'bz2', 'xz'
+    ('convention',  'U6'),               # 'legacy', 'long' or ''
+])
+
+# Legacy centre codes of non-final products; everything else is 'FIN'.
+_LEGACY_SOLUTION = {
+    'igr': 'RAP', 'cor': 'RAP', 'jpr': 'RAP', 'upr': 'RAP', 'esr': 'RAP',
+    'emr': 'RAP', 'ehr': 'RAP', 'uqr': 'RAP',
+    'c1p': 'PRD', 'c2p': 'PRD', 'i1p': 'PRD', 'i2p': 'PRD',
+    'e1p': 'PRD', 'e2p': 'PRD', 'u2p': 'PRD',
+}
+
+_UNIT_SECONDS = {'S': 1, 'M': 60, 'H': 3600, 'D': 86400, 'W': 604800, 'Y': 31536000}
+
+_COMPRESSION = '|'.join(re.escape(s) for s in COMPRESSED_SUFFIXES)
+
+# One pattern with a catch-all branch, so every line yields exactly one match.
+_PATTERN = re.compile(
+    rf'''^(?:
+        (?P<l_cen>[a-z0-9]{{3}})[a-z](?P<l_doy>\d{{3}})(?P<l_ses>[0a-x])
+            \.(?P<l_yy>\d{{2}})i(?P<l_cmp>{_COMPRESSION})?
+      | (?P<g_cen>[a-z0-9]{{3}})\d[a-z0-9]{{3}}(?P<g_sol>[a-z]{{3}})
+            _(?P<g_year>\d{{4}})(?P<g_doy>\d{{3}})(?P<g_hh>\d{{2}})(?P<g_mm>\d{{2}})
+            _(?P<g_len>\d{{2}})(?P<g_lu>[smhdwy])
+            _(?P<g_smp>\d{{2}})(?P<g_su>[smhdwy])
+            _[a-z0-9]{{3}}\.inx(?P<g_cmp>{_COMPRESSION})?
+      | .*
+    )$''',
+    re.IGNORECASE | re.MULTILINE | re.VERBOSE,
+)
+
+
+def _looks_like_ionex(name):
+    """True for legacy ``*.YYi`` names and IGS long ``*.INX`` names,
+    with or without a compression suffix."""
+    base = name
+    for suffix in COMPRESSED_SUFFIXES:
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+            break
+    ext = os.path.splitext(base)[1].lower()
+    return ext == '.inx' or (len(ext) == 4 and ext[1:3].isdigit() and ext[3] == 'i')
+
+
+def _duration(count, unit):
+    return int(count) * _UNIT_SECONDS[unit.upper()]
+
+
+def parse_ionex_filenames(paths):
+    """
+    Decode legacy and IGS long IONEX file names.
+
+    Parameters
+    ----------
+    paths : str, path-like or iterable of them
+        File names or paths; only the base name is used.
+
+    Returns
+    -------
+    np.ndarray
+        Structured array of :data:`FILENAME_DTYPE`, one record per input in
+        input order (a 0-d record for a single path).  Unrecognised names
+        have ``convention == ''`` and ``NaT`` times.
+
+    Examples
+    --------
+    >>> rec = parse_ionex_filenames(['igsg0010.24i', 'IGS0OPSFIN_20240010000_01D_02H_GIM.INX.gz'])
+    >>> rec['agency'], rec['start'], rec['sampling']
+    (array(['IGS', 'IGS'], dtype='<U3'),
+     array(['2024-01-01T00:00:00', '2024-01-01T00:00:00'], dtype='datetime64[s]'),
+     array(['NaT', 7200], dtype='timedelta64[s]'))
+    """
+    scalar = isinstance(paths, (str, bytes, os.PathLike))
+    names  = [os.path.basename(os.fsdecode(p)).replace('\n', ' ')
+              for p in ([paths] if scalar else paths)]
+    n   = len(names)
+    out = np.zeros(n, dtype=FILENAME_DTYPE)
+    for field in ('start', 'span', 'sampling'):
+        out[field] = np.datetime64('NaT') if field == 'start' else np.timedelta64('NaT')
+
+    year = np.zeros(n, dtype=np.int64)
+    doy  = np.ones(n, dtype=np.int64)
+    sec  = np.zeros(n, dtype=np.int64)          # offset within the day
+
+    for i, m in enumerate(_PATTERN.finditer('\n'.join(names))):
+        if m['l_cen']:
+            centre = m['l_cen'].lower()
+            yy, ses = int(m['l_yy']), m['l_ses'].lower()
+            hourly  = ses != '0'
+            year[i] = yy + (1900 if yy >= 80 else 2000)
+            doy[i]  = int(m['l_doy'])
+            sec[i]  = (ord(ses) - ord('a')) * 3600 if hourly else 0
+            out[i]  = (centre.upper(), _LEGACY_SOLUTION.get(centre, 'FIN'),
+                       'NaT', 3600 if hourly else 86400, 'NaT',
+                       (m['l_cmp'] or '.')[1:], 'legacy')
+        elif m['g_cen']:
+            year[i] = int(m['g_year'])
+            doy[i]  = int(m['g_doy'])
+            sec[i]  = int(m['g_hh']) * 3600 + int(m['g_mm']) * 60
+            out[i]  = (m['g_cen'].upper(), m['g_sol'].upper(), 'NaT',
+                       _duration(m['g_len'], m['g_lu']),
+                       _duration(m['g_smp'], m['g_su']),
+                       (m['g_cmp'] or '.')[1:], 'long')
+
+    # Start epochs for every recognised record in one vectorised expression.
+    ok = out['convention'] != ''
+    out['start'][ok] = (
+        (year[ok] - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+        + (doy[ok] - 1).astype('timedelta64[D]')
+        + sec[ok].astype('timedelta64[s]')
+    )
+    return out[0] if scalar else out
+
+
+def filename_time_mask(records, start=None, stop=None):
+    """
+    Boolean mask of records whose ``[start, start + span]`` overlaps
+    ``[start, stop]``.
+
+    The span end is inclusive because a daily file also carries the 24:00
+    map, which is the next day's midnight.  Records with an unknown start or
+    span are kept (``True``) — the name alone cannot rule them out.
+    """
+    begin = records['start']
+    end   = begin + records['span']
+    keep  = np.ones(records.shape, dtype=bool)
+    if start is not None:
+        keep &= ~(end < np.datetime64(start, 's'))
+    if stop is not None:
+        keep &= ~(begin > np.datetime64(stop, 's'))
+    return keep | np.isnat(begin) | np.isnat(records['span'])
@@ -1,13 +1,67 @@
 """
 ionex.py  —  v0.3.0
 ====================
-Read and visualise IONEX ionospheric TEC maps as xarray Datasets.
+Read IONEX ionospheric TEC maps as xarray Datasets.
+
+Plotting lives in :mod:`ionex_reader.plotting`.
 
 Author : Bhuvnesh Brawar  <bbrawar@gmail.com>
          IIT Indore, Space Technology & Radio Cosmology Group
 
 Changelog
 ---------
+v0.4.0  (unreleased)
+  * PERF     — plotting moved to ionex_reader.plotting and xarray imported
+               on first Dataset build, so ``import ionex_reader`` no longer
+               loads matplotlib / cartopy / mpl_toolkits / xarray.
+  * FEATURE  — read_ionex() reads .gz / .Z / .bz2 / .xz files directly.
+  * FEATURE  — ``ionex-reader convert`` batch converter (ionex_reader.cli).
+  * FEATURE  — scan_header(): header-only parse (grid, first/last epoch,
+               interval, map count) without decoding any map.
+  * FEATURE  — index_blocks(): (start, end) offsets of every map block, so
+               ranges of maps can be decoded independently.
+  * FEATURE  — scan_header() reports ``has_dcb`` (DCB auxiliary section).
+  * FEATURE  — ionex_reader.filenames: legacy / IGS long file-name decoder.
+  * PERF     — the reader works on bytes end to end: plain files are
+               memory-mapped, only the header is decoded to str, and map
+               rows are split with bytes.split instead of a backtracking
+               regex (~6× faster, peak memory ≈ file size).
+  * FEATURE  — read_ionex() accepts bytes, memoryview, binary file objects
+               and iterables of byte chunks; ionex_reader.bundle reads every
+               member of a .tar / .zip bundle without extracting it.
+  * FEATURE  — ionex_reader.stream.iter_maps(): constant-memory, per-epoch
+               streaming across many (compressed) files.
+  * FEATURE  — read_ionex(..., as_='numpy') returns a slotted IonexMaps
+               record (no xarray import); IonexMaps.to_xarray() is zero-copy.
+  * FEATURE  — ionex_reader.shared: publish a cube to shared memory (or a
+               memmapped file) once; workers attach read-only, zero-copy.
+  * PERF     — ``prefetch=K`` on iter_maps() and read_mfionex(): bounded
+               background reads overlap I/O + decompression with parsing.
+  * FEATURE  — ionex_reader.animation.animate_tec(): MP4 / GIF / frames from
+               a figure built once per worker; frames update only the image,
+               title and terminator, and can render in a process pool.
+  * FEATURE  — animation.render_maps(): pyplot-free batch PNG rendering in a
+               thread or process pool, reporting maps/s.
+  * PERF     — plotting.MapCanvas: the base map is built once and reused via
+               ``canvas=`` on plot_tec_map() / plot_rms_map().
+  * PERF     — solar.terminator_curve(): closed-form terminator polylines and
+               night polygons, vectorised over epochs and memoised; replaces
+               the 721×361 contourf / contour per plot.
+  * FEATURE  — solar.subsolar_point() over datetime64 arrays and
+               solar.add_solar_geometry(): sza, local_solar_time and is_day
+               broadcast in float32, lazy for dask-backed cubes.
+  * FEATURE  — solar.to_local_time(): (time, lat, local_time) cubes or LT
+               climatologies from precomputed shift / weight tables.
+  * PERF     — ionex_reader.magnetic: vectorised main-field model and
+               memoised dip-latitude grid; the geomagnetic overlay no longer
+               loops over GeoMag and geomag is only a coefficient source.
+  * FEATURE  — magnetic.to_magnetic_coords(): (time, mlat, mlt) cubes via
+               a cached sparse weight matrix per grid and year.
+  * FEATURE  — regridding.regrid(): bilinear / conservative / nearest
+               regridding with cached CSR weights and ±180° wrap.
+  * FEATURE  — combine.combine_products(): RMS-weighted combination of
+               several products, streamed and parallel across days.
+
 v0.3.0
   * BUG FIX  — latitude / longitude grids are now parsed directly from the
                IONEX header (LAT1/LAT2/DLAT, LON1/LON2/DLON/HGT) instead of
@@ -37,25 +91,26 @@ v0.2.x  (intermediate fixes, see git log)
 v0.1.0  Initial release
 """
 
+import mmap
+import os
 import warnings
 import re
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patheffects as pe
-import xarray as xr
-import cartopy.crs as ccrs
-from mpl_toolkits.axes_grid1 import make_axes_locatable
 
 __version__ = '0.3.0'
 __author__  = 'Bhuvnesh Brawar'
 __email__   = 'bbrawar@gmail.com'
 
-# ---------------------------------------------------------------------------
-# CBAR label — defined once, used in multiple plot functions
-# ---------------------------------------------------------------------------
-_CBAR_LABEL = r'TECU  ($10^{16}\ \mathrm{el}\ \mathrm{m}^{-2}$)'
+# Plotting lives in ionex_reader.plotting so that importing the reader does
+# not load matplotlib / cartopy.  The names stay importable from here for
+# code written against v0.3.0 (``from ionex_reader.ionex import plot_tec_map``).
+_PLOTTING_NAMES = frozenset({
+    'plot_tec_map', 'plot_rms_map', 'plot_time_series',
+})
 
 
 # ===========================================================================
@@ -152,21 +207,29 @@ def get_epoch(block):
 
     Parameters
     ----------
-    block : str
+    block : str or bytes
         Raw text of a map block (everything after ``START OF TEC MAP``).
 
     Returns
     -------
     datetime
     """
+    return _parse_epoch(block, 'EPOCH OF CURRENT MAP')
+
+
+@lru_cache(maxsize=None)
+def _epoch_pattern(label, binary):
     # Target exactly the six integers on the epoch line, ignore surrounding text
-    m = re.search(
-        r'^\s*(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})'
-        r'\s+EPOCH OF CURRENT MAP',
-        block, re.MULTILINE,
-    )
+    pattern = (r'^\s*(\d{4})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})\s+(\d{1,2})'
+               r'\s+' + label)
+    return re.compile(pattern.encode() if binary else pattern, re.MULTILINE)
+
+
+def _parse_epoch(text, label):
+    """Parse the six-integer epoch record tagged *label* (24:00 → next day)."""
+    m = _epoch_pattern(label, not isinstance(text, str)).search(text)
     if not m:
-        raise ValueError("Could not parse EPOCH OF CURRENT MAP from map block.")
+        raise ValueError(f"Could not parse {label} from map block.")
 
     year, month, day, hour, minute, second = (int(m.group(i)) for i in range(1, 7))
 
@@ -181,7 +244,7 @@ def parse_map(block, exponent=-1):
 
     Parameters
     ----------
-    block : str
+    block : str or bytes
         Raw text after ``START OF TEC MAP``.
     exponent : int
         Scaling exponent for raw integer values (default ``-1`` → ×0.1 TECU).
@@ -195,15 +258,7 @@ def parse_map(block, exponent=-1):
     ValueError
         If no latitude rows are found, or if rows have inconsistent lengths.
     """
-    body = re.split(r'.*END OF TEC MAP', block)[0]
-    rows = re.split(r'.*LAT/LON1/LON2/DLON/H\n', body)[1:]
-
-    if not rows:
-        raise ValueError("No latitude rows found in TEC map block.")
-
-    arrays = [np.fromstring(r, sep=' ') for r in rows if r.strip()]
-    _check_row_shapes(arrays, 'TEC')
-    return np.stack(arrays) * 10**exponent
+    return _parse_values(block, 'TEC', exponent)
 
 
 def parse_rms_map(block, exponent=-1):
@@ -212,7 +267,7 @@ def parse_rms_map(block, exponent=-1):
 
     Parameters
     ----------
-    block : str
+    block : str or bytes
         Raw text after ``START OF RMS MAP``.
     exponent : int
         Scaling exponent (default ``-1`` → ×0.1 TECU).
@@ -221,15 +276,41 @@ def parse_rms_map(block, exponent=-1):
     -------
     np.ndarray, shape (n_lat, n_lon)
     """
-    body = re.split(r'.*END OF RMS MAP', block)[0]
-    rows = re.split(r'.*LAT/LON1/LON2/DLON/H\n', body)[1:]
+    return _parse_values(block, 'RMS', exponent)
 
-    if not rows:
-        raise ValueError("No latitude rows found in RMS map block.")
 
-    arrays = [np.fromstring(r, sep=' ') for r in rows if r.strip()]
-    _check_row_shapes(arrays, 'RMS')
-    return np.stack(arrays) * 10**exponent
+_ROW_TAG = b'LAT/LON1/LON2/DLON/H'
+
+
+def _parse_values(block, kind, exponent):
+    """
+    Decode the latitude rows of one map block (bytes; str is encoded first).
+
+    Rows are cut with ``bytes.split`` on the row-header label.  Each piece
+    ends with the numeric part of the next row header, dropped by cutting at
+    its last newline.  The label is matched without its line ending, so
+    CRLF files parse the same way (``\r`` is whitespace to ``fromstring``).
+    All values are then converted in a single ``np.fromstring`` call.
+    """
+    if isinstance(block, str):
+        block = block.encode('ascii', errors='replace')
+    end = block.find(b'END OF %s MAP' % kind.encode())
+    if end != -1:
+        block = block[:block.rfind(b'\n', 0, end) + 1]
+
+    pieces = block.split(_ROW_TAG)
+    if len(pieces) < 2:
+        raise ValueError(f"No latitude rows found in {kind} map block.")
+    rows = [p[:p.rfind(b'\n') + 1] for p in pieces[1:-1]] + [pieces[-1]]
+
+    values = np.fromstring(b' '.join(rows), sep=' ')
+    n_lon  = np.fromstring(rows[0], sep=' ').size
+    if n_lon == 0 or values.size != n_lon * len(rows):
+        # Slow path: blank rows are dropped, ragged rows get a clear error.
+        arrays = [np.fromstring(r, sep=' ') for r in rows if r.strip()]
+        _check_row_shapes(arrays, kind)
+        return np.stack(arrays) * 10**exponent
+    return values.reshape(len(rows), n_lon) * 10**exponent
 
 
 def _check_row_shapes(arrays, label):
@@ -253,8 +334,9 @@ def _extract_header(ionex_str):
 
     Parameters
     ----------
-    ionex_str : str
-        Full IONEX file contents.
+    ionex_str : str or bytes-like
+        Full IONEX file contents.  Bytes (including ``mmap``) are searched
+        as bytes and only the header slice is decoded.
 
     Returns
     -------
@@ -262,18 +344,20 @@ def _extract_header(ionex_str):
         Header text only.  If the sentinel is absent (malformed file) the
         full string is returned as a fallback so callers still work.
     """
-    sentinel = 'END OF HEADER'
-    idx = ionex_str.find(sentinel)
+    binary = not isinstance(ionex_str, str)
+    idx = ionex_str.find(b'END OF HEADER' if binary else 'END OF HEADER')
     if idx == -1:
         warnings.warn(
             "'END OF HEADER' not found — file may be malformed. "
             "Falling back to scanning the full file for header records.",
             UserWarning,
         )
-        return ionex_str
-    # Include the sentinel line itself
-    end = ionex_str.index('\n', idx) + 1
-    return ionex_str[:end]
+        end = len(ionex_str)
+    else:
+        # Include the sentinel line itself
+        end = ionex_str.find(b'\n' if binary else '\n', idx) + 1 or len(ionex_str)
+    header = ionex_str[:end]
+    return bytes(header).decode('ascii', errors='replace') if binary else header
 
 
 def get_metadata(header):
@@ -316,623 +400,428 @@ def get_metadata(header):
 # 3.  CORE READER
 # ===========================================================================
 
-def read_ionex(filename, read_metadata=False):
-    """
-    Read an IONEX file and return an xarray Dataset.
-
-    The dataset contains:
-
-    * ``tec`` — Vertical TEC in TECU, dims (time, latitude, longitude).
-    * ``rms`` — RMS of VTEC in TECU, dims (time, latitude, longitude).
-      If the file contains no RMS maps a NaN-filled array is returned and a
-      ``UserWarning`` is issued.
+# Leading magic bytes → stdlib module providing ``decompress``.  IONEX
+# archives (CDDIS, BKG, IGS) ship .Z (legacy names) and .gz (long names).
+_COMPRESSION_MAGIC = (
+    (b'\x1f\x8b',         'gzip'),
+    (b'BZh',              'bz2'),
+    (b'\xfd7zXZ\x00',     'lzma'),
+    (b'\x1f\x9d',         'unlzw3'),     # unix compress (.Z) — not in stdlib
+)
 
-    Latitude and longitude coordinates are read directly from the file header
-    (LAT1/LAT2/DLAT and LON1/LON2/DLON) so the Dataset is correct for any
-    IONEX-producing agency (JPL 5°, CODE 2.5°, ESA 2.5°, …).
+# Filename suffixes stripped when deriving output names for compressed inputs.
+COMPRESSED_SUFFIXES = ('.gz', '.Z', '.bz2', '.xz')
 
-    Parameters
-    ----------
-    filename : str
-        Path to the IONEX file (plain text, not compressed).
-    read_metadata : bool, optional
-        If ``True``, parse and attach ``ionex_version`` and ``run_by`` as
-        Dataset attributes.  Defaults to ``False`` for faster reads.
 
-    Returns
-    -------
-    xr.Dataset
+def _decompress(raw, filename=''):
     """
-    with open(filename, encoding='utf-8', errors='replace') as f:
-        ionex_str = f.read()
+    Return *raw* decompressed if it starts with a known compression magic
+    number, otherwise return it unchanged.
 
-    # Extract header once — all header-only parsing uses this small slice.
-    # get_grid and get_metadata never see the map data blocks.
-    header = _extract_header(ionex_str)
-
-    # --- grid (v0.3.0: read from header, not hardcoded) ---
-    latitudes, longitudes, _ = get_grid(header)
-
-    # --- TEC maps (required) ---
-    tec_blocks = ionex_str.split('START OF TEC MAP')[1:]
-    if not tec_blocks:
-        raise ValueError(f"No TEC maps found in '{filename}'.")
+    ``.Z`` (LZW) needs the optional ``unlzw3`` package; the other formats use
+    the standard library.
+    """
+    for magic, module in _COMPRESSION_MAGIC:
+        if raw.startswith(magic):
+            break
+    else:
+        return raw
 
-    tecmaps = []
-    epochs  = []
-    for block in tec_blocks:
+    if module == 'unlzw3':
         try:
-            tecmaps.append(parse_map(block))
-            epochs.append(get_epoch(block))
-        except (ValueError, IndexError) as exc:
-            warnings.warn(f"Skipping malformed TEC block: {exc}", UserWarning)
+            from unlzw3 import unlzw
+        except ImportError:
+            raise ImportError(
+                f"'{filename}' is unix-compressed (.Z); the 'unlzw3' package "
+                "is required to read it.\n"
+                "Install it with:  pip install unlzw3"
+            )
+        return unlzw(raw)
 
-    # --- RMS maps (optional) ---
-    rms_blocks = ionex_str.split('START OF RMS MAP')[1:]
-    if rms_blocks:
-        rmsmaps = []
-        for block in rms_blocks:
-            try:
-                rmsmaps.append(parse_rms_map(block))
-            except (ValueError, IndexError) as exc:
-                warnings.warn(f"Skipping malformed RMS block: {exc}", UserWarning)
-    else:
-        warnings.warn(
-            f"'{filename}' contains no RMS maps. "
-            "The 'rms' variable will be all-NaN.",
-            UserWarning,
-        )
-        shape = (len(tecmaps), len(latitudes), len(longitudes))
-        rmsmaps = [np.full((len(latitudes), len(longitudes)), np.nan)] * len(tecmaps)
+    import importlib
+    return importlib.import_module(module).decompress(raw)
 
-    # Align lengths (guard against partially malformed files)
-    n = min(len(tecmaps), len(rmsmaps), len(epochs))
-    tecmaps, rmsmaps, epochs = tecmaps[:n], rmsmaps[:n], epochs[:n]
 
-    metadata = get_metadata(header)    if read_metadata else {}
-    return _create_xarray(tecmaps, rmsmaps, epochs, latitudes, longitudes, metadata)
+def _source_name(source):
+    """Name of a :func:`read_ionex` source for messages."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    name = getattr(source, 'name', None)
+    return name if isinstance(name, str) else f'<{type(source).__name__}>'
 
 
-# ===========================================================================
-# 4.  XARRAY BUILDER  (private)
-# ===========================================================================
+@contextmanager
+def _read_buffer(source):
+    """
+    Yield the contents of an IONEX source as a bytes-like object.
 
-def _create_xarray(tecmaps, rmsmaps, epochs, latitudes, longitudes, metadata):
-    """Assemble parsed maps into an xr.Dataset."""
-    ds = xr.Dataset(
-        {
-            'tec': (['time', 'latitude', 'longitude'], np.stack(tecmaps)),
-            'rms': (['time', 'latitude', 'longitude'], np.stack(rmsmaps)),
-        },
-        coords={
-            'time':      epochs,
-            'latitude':  latitudes,
-            'longitude': longitudes,
-        },
-    )
-    ds['tec'].attrs.update(units='TECU', long_name='Vertical Total Electron Content')
-    ds['rms'].attrs.update(units='TECU', long_name='RMS of Vertical TEC')
-    ds.attrs['ionex_reader_version'] = __version__
+    Plain files are memory-mapped read-only, so nothing is copied up front
+    and the pages are shared with the OS cache; compressed files are
+    decompressed into one ``bytes`` object.  Either way no ``str`` copy of
+    the file is ever made.
 
-    if metadata:
-        ds.attrs.update(metadata)
+    *source* may also be ``bytes`` / ``bytearray`` / ``memoryview``, a
+    binary file object (anything with ``read()``), or an iterable of bytes
+    chunks — see :func:`read_ionex`.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        yield _decompress(_source_bytes(source), _source_name(source))
+        return
 
-    return ds
+    filename = source
+    with open(filename, 'rb') as f:
+        magic = f.read(6)
+        if any(magic.startswith(prefix) for prefix, _ in _COMPRESSION_MAGIC):
+            f.seek(0)
+            yield _decompress(f.read(), filename)
+            return
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):      # empty file, or not mappable (pipe)
+            f.seek(0)
+            yield f.read()
+            return
+        with mapped:
+            yield mapped
+
+
+def _source_bytes(source):
+    """Raw bytes of an in-memory, file-object or chunk-iterator source."""
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        raw = source.read()
+    else:
+        try:
+            raw = b''.join(iter(source))
+        except TypeError:
+            raise TypeError(
+                "read_ionex() expects a path, bytes, a binary file object or "
+                f"an iterable of bytes chunks, not {type(source).__name__}."
+            ) from None
+    if isinstance(raw, str):
+        raise TypeError("IONEX file objects must be opened in binary mode ('rb').")
+    return raw
+
+
+def _open_stream(filename):
+    """
+    Open *filename* as a binary stream of decompressed bytes.
 
+    gzip / bzip2 / xz are decompressed incrementally, so reading only the
+    header does not inflate the whole file.  ``.Z`` has no streaming
+    decoder and is decompressed in full.
+    """
+    import io
+
+    f = open(filename, 'rb')
+    magic = f.read(6)
+    f.seek(0)
+    for prefix, module in _COMPRESSION_MAGIC:
+        if magic.startswith(prefix):
+            break
+    else:
+        return f
+    if module == 'unlzw3':
+        with f:
+            return io.BytesIO(_decompress(f.read(), filename))
+    import importlib
+    return importlib.import_module(module).open(f, 'rb')
 
-# ===========================================================================
-# 5.  DAY / NIGHT TERMINATOR  (pure numpy — no extra dependencies)
-# ===========================================================================
 
-def _subsolar_point(dt):
+def scan_header(filename):
     """
-    Compute subsolar latitude and longitude for a UTC datetime.
+    Parse only the header of an IONEX file — no map block is read or decoded.
 
-    Uses the Astronomical Almanac low-precision solar coordinate model
-    (~0.5° accuracy over a few decades around J2000), which is well within
-    the resolution of any global TEC map.
+    Reads the file until ``END OF HEADER`` (decompressing on the fly), which
+    is typically a few kB regardless of file size.  Used for cheap file
+    selection, cataloguing and idempotent archive ingestion.
 
     Parameters
     ----------
-    dt : datetime (UTC)
+    filename : str
+        Path to an IONEX file (plain or compressed, see :func:`read_ionex`).
 
     Returns
     -------
-    lat_sun, lon_sun : float, float  (degrees)
-    """
-    jd = (
-        367 * dt.year
-        - int(7 * (dt.year + int((dt.month + 9) / 12)) / 4)
-        + int(275 * dt.month / 9)
-        + dt.day + 1721013.5
-        + (dt.hour + dt.minute / 60 + dt.second / 3600) / 24
-    )
-    T  = (jd - 2451545.0) / 36525.0
-    L0 = (280.46646 + 36000.76983 * T) % 360
-    M  = np.radians((357.52911 + 35999.05029 * T - 0.0001537 * T**2) % 360)
-    C  = ((1.914602 - 0.004817 * T - 0.000014 * T**2) * np.sin(M)
-          + (0.019993 - 0.000101 * T) * np.sin(2 * M)
-          + 0.000289 * np.sin(3 * M))
-
-    omega   = np.radians(125.04 - 1934.136 * T)
-    lam     = np.radians(L0 + C - 0.00569 - 0.00478 * np.sin(omega))
-    eps     = np.radians(23.439291 - 0.013004 * T + 0.00256 * np.cos(omega))
-    lat_sun = np.degrees(np.arcsin(np.sin(eps) * np.sin(lam)))
-
-    gmst    = (280.46061837
-               + 360.98564736629 * (jd - 2451545.0)
-               + 0.000387933 * T**2
-               - T**3 / 38710000) % 360
-    ra_sun  = np.degrees(np.arctan2(np.cos(eps) * np.sin(lam), np.cos(lam))) % 360
-    lon_sun = (ra_sun - gmst + 180) % 360 - 180
-
-    return lat_sun, lon_sun
-
-
-def _plot_terminator(ax, dt,
-                     line_color='white', line_width=1.5,
-                     night_color='navy', night_alpha=0.25,
-                     show_night_shade=True):
+    dict
+        ``latitude``, ``longitude``, ``height`` (from :func:`get_grid`);
+        ``first_epoch``, ``last_epoch`` (datetime or ``None``);
+        ``interval`` (seconds or ``None``); ``n_maps`` (int or ``None``);
+        ``exponent`` (int, default ``-1``); ``has_dcb`` (header carries a
+        DCB auxiliary section); plus the :func:`get_metadata` keys when
+        present.
     """
-    Draw the day/night terminator on a Cartopy PlateCarree axes.
+    buf = bytearray()
+    with _open_stream(filename) as f:
+        while True:
+            chunk = f.read(8192)
+            if not chunk:
+                break
+            buf += chunk
+            # search only the new bytes (plus overlap for a split sentinel)
+            if b'END OF HEADER' in buf[-(len(chunk) + 16):]:
+                break
+    return _header_info(_extract_header(bytes(buf)))
+
+
+def _header_info(header):
+    """The :func:`scan_header` dictionary for an already extracted header."""
+    latitudes, longitudes, heights = get_grid(header)
+    info = {'latitude': latitudes, 'longitude': longitudes, 'height': heights}
+
+    for key, label in (('first_epoch', 'EPOCH OF FIRST MAP'),
+                       ('last_epoch',  'EPOCH OF LAST MAP')):
+        try:
+            info[key] = _parse_epoch(header, label)
+        except ValueError:
+            info[key] = None
 
-    The terminator is the locus where the solar zenith angle equals 90°,
-    computed as::
+    for key, label in (('interval', 'INTERVAL'),
+                       ('n_maps',   '# OF MAPS IN FILE'),
+                       ('exponent', 'EXPONENT')):
+        m = re.search(r'^\s*([-\d.]+)\s+' + re.escape(label) + r'\s*$',
+                      header, re.MULTILINE)
+        info[key] = int(float(m.group(1))) if m else None
+    if info['exponent'] is None:
+        info['exponent'] = -1
 
-        cos Z = sin φ sin δ  +  cos φ cos δ cos H
+    info['has_dcb'] = 'DIFFERENTIAL CODE BIASES' in header
+    info.update(get_metadata(header))
+    return info
 
-    where φ is geographic latitude, δ is solar declination, and H is the
-    solar hour angle (longitude − subsolar longitude).
 
-    Parameters
-    ----------
-    ax : cartopy GeoAxes  (PlateCarree projection)
-    dt : datetime (UTC)
-        Epoch for solar position.  Pass ``None`` to skip silently.
-    line_color : str     Terminator line colour  (default ``'white'``).
-    line_width : float   Line width              (default ``1.5``).
-    night_color : str    Night-side fill colour  (default ``'navy'``).
-    night_alpha : float  Night-side opacity      (default ``0.25``).
-    show_night_shade : bool
-        Shade the night hemisphere (default ``True``).
+def index_blocks(ionex_str, kind='TEC'):
     """
-    if dt is None:
-        return
-
-    lat_sun, lon_sun = _subsolar_point(dt)
-
-    lons = np.linspace(-180, 180, 721)
-    lats = np.linspace(-90,   90, 361)
-    LON, LAT = np.meshgrid(lons, lats)
+    Locate every map block of one kind without parsing it.
 
-    cos_sza = (np.sin(np.radians(LAT)) * np.sin(np.radians(lat_sun))
-               + np.cos(np.radians(LAT)) * np.cos(np.radians(lat_sun))
-               * np.cos(np.radians(LON - lon_sun)))
+    The index is a list of ``(start, end)`` offsets into *ionex_str*: each
+    block starts on the line after ``START OF <kind> MAP`` (the epoch line)
+    and ends at the start of its ``END OF <kind> MAP`` line.  Scanning is a
+    handful of ``find`` calls per block, so a file can be indexed once and
+    any range of maps decoded later — see :func:`_decode_blocks`.
 
-    proj = ccrs.PlateCarree()
-
-    if show_night_shade:
-        ax.contourf(lons, lats, cos_sza, levels=[-1, 0],
-                    colors=[night_color], alpha=night_alpha, transform=proj)
+    Parameters
+    ----------
+    ionex_str : str or bytes-like
+        Full IONEX file contents (``str``, ``bytes`` or ``mmap``).
+    kind : {'TEC', 'RMS', 'HGT'}
+        Map type.
 
-    ax.contour(lons, lats, cos_sza, levels=[0],
-               colors=[line_color], linewidths=line_width, transform=proj)
+    Returns
+    -------
+    list of (int, int)
+    """
+    start_tag = f'START OF {kind} MAP'
+    end_tag   = f'END OF {kind} MAP'
+    newline   = '\n'
+    if not isinstance(ionex_str, str):
+        start_tag, end_tag, newline = start_tag.encode(), end_tag.encode(), b'\n'
+    index = []
+    pos = ionex_str.find(start_tag)
+    while pos != -1:
+        start = ionex_str.find(newline, pos) + 1
+        nxt   = ionex_str.find(start_tag, start)
+        end   = ionex_str.find(end_tag, start)
+        if end == -1 or (nxt != -1 and end > nxt):
+            # truncated block — stop at the next block (or EOF)
+            end = nxt if nxt != -1 else len(ionex_str)
+        else:
+            end = ionex_str.rfind(newline, start, end) + 1 or start
+        index.append((start, end))
+        pos = nxt
+    return index
 
 
-def _epoch_to_datetime(data):
+def _decode_blocks(ionex_str, index, kind, with_epochs=False):
     """
-    Extract a Python datetime from an xr.DataArray ``time`` coordinate.
+    Decode the blocks listed in *index* (from :func:`index_blocks`).
 
-    Returns ``None`` on failure so callers can emit a clean warning.
+    Malformed blocks are skipped with a ``UserWarning``.  Returns the list of
+    maps and, if *with_epochs*, the matching list of epochs (else ``[]``).
     """
-    try:
-        import pandas as pd
-        return pd.Timestamp(data.time.values).to_pydatetime().replace(tzinfo=None)
-    except Exception:
-        return None
+    parser = parse_rms_map if kind == 'RMS' else parse_map
+    maps, epochs = [], []
+    for start, end in index:
+        block = ionex_str[start:end]
+        try:
+            values = parser(block)
+            epoch  = get_epoch(block) if with_epochs else None
+        except (ValueError, IndexError) as exc:
+            warnings.warn(f"Skipping malformed {kind} block: {exc}", UserWarning)
+            continue
+        maps.append(values)
+        if with_epochs:
+            epochs.append(epoch)
+    return maps, epochs
 
 
-# ===========================================================================
-# 6.  GEOMAGNETIC LATITUDE LINES  (deferred import)
-# ===========================================================================
-
-def _plot_geomagnetic_latitude_lines(ax,
-                                     step_deg=10,
-                                     highlight_lats=(-30, 0, 30),
-                                     label_lats=(-60, -30, 0, 30, 60),
-                                     line_color='red',
-                                     line_alpha=0.65,
-                                     line_width=0.8,
-                                     highlight_width=1.6):
+def read_ionex(filename, read_metadata=False, as_='xarray'):
     """
-    Overlay geomagnetic (dip) latitude lines on an existing Cartopy axes.
-
-    Geomagnetic latitude is derived from the magnetic dip (inclination) angle
-    returned by the World Magnetic Model via the ``geomag`` package::
-
-        mag_lat = arctan(0.5 × tan(dip))
+    Read an IONEX file and return an xarray Dataset.
 
-    Strategy (vectorised, ~2 s total):
+    The dataset contains:
 
-    1. Build a dense geographic lat × lon grid of magnetic latitudes in one
-       pass (``geomag.geomag.GeoMag`` instantiated **once**).
-    2. Pass the full grid to ``ax.contour()`` which extracts all desired
-       magnetic-latitude isolines simultaneously — no per-contour loop.
-    3. Add styled labels for lines listed in *label_lats*.
+    * ``tec`` — Vertical TEC in TECU, dims (time, latitude, longitude).
+    * ``rms`` — RMS of VTEC in TECU, dims (time, latitude, longitude).
+      If the file contains no RMS maps a NaN-filled array is returned and a
+      ``UserWarning`` is issued.
 
-    Import note
-    -----------
-    ``GeoMag`` lives at ``geomag.geomag.GeoMag``, not ``geomag.GeoMag``.
-    The package is imported lazily so it does not slow down imports when this
-    feature is unused.
+    Latitude and longitude coordinates are read directly from the file header
+    (LAT1/LAT2/DLAT and LON1/LON2/DLON) so the Dataset is correct for any
+    IONEX-producing agency (JPL 5°, CODE 2.5°, ESA 2.5°, …).
 
     Parameters
     ----------
-    ax : cartopy GeoAxes  (PlateCarree projection)
-    step_deg : int
-        Spacing between geomagnetic latitude contours in degrees (default 10).
-    highlight_lats : tuple of float
-        Magnetic latitudes drawn thicker and fully opaque
-        (default: −30°, magnetic equator 0°, +30°  — i.e. the EIA boundaries).
-    label_lats : tuple of float
-        Magnetic latitudes annotated with a text label (default: ±60, ±30, 0°).
-    line_color : str
-        Colour for all geomagnetic lines (default ``'red'``).
-    line_alpha : float
-        Opacity for regular (non-highlighted) lines (default 0.65).
-    line_width : float
-        Line width for regular lines (default 0.8).
-    highlight_width : float
-        Line width for highlighted lines (default 1.6).
+    filename : str, path-like, bytes-like, binary file object or iterable
+        The IONEX file — plain text, or compressed with gzip, bzip2, xz or
+        unix ``compress`` (``.Z``, needs ``unlzw3``).  The format is detected
+        from the contents, not the extension.  Besides a path this may be
+        the file's contents (``bytes`` / ``bytearray`` / ``memoryview``, e.g.
+        a message-queue payload), a binary file object such as
+        ``tarfile.extractfile(member)``, or an iterable of ``bytes`` chunks.
+        No temporary file is written.  For whole ``.tar`` / ``.zip`` bundles
+        see :func:`ionex_reader.bundle.read_ionex_archive`.
+    read_metadata : bool, optional
+        If ``True``, parse and attach ``ionex_version`` and ``run_by`` as
+        Dataset attributes.  Defaults to ``False`` for faster reads.
+    as_ : {'xarray', 'numpy'}, optional
+        ``'numpy'`` returns an :class:`IonexMaps` record instead of a
+        Dataset and never imports xarray.
 
-    Raises
-    ------
-    ImportError
-        If the ``geomag`` package is not installed
-        (``pip install geomag``).
+    Returns
+    -------
+    xr.Dataset or IonexMaps
     """
-    try:
-        from geomag.geomag import GeoMag          # correct import path
-    except ImportError:
-        raise ImportError(
-            "The 'geomag' package is required for geomagnetic latitude lines.\n"
-            "Install it with:  pip install geomag"
-        )
+    if as_ not in ('xarray', 'numpy'):
+        raise ValueError(f"as_ must be 'xarray' or 'numpy', got {as_!r}.")
+    with _read_buffer(filename) as data:
+        maps = _read_ionex_buffer(data, _source_name(filename), read_metadata)
+    return maps if as_ == 'numpy' else maps.to_xarray()
 
-    proj = ccrs.PlateCarree()
-
-    # ------------------------------------------------------------------
-    # Step 1 — build a (geo_lat × lon) grid of magnetic dip-latitudes.
-    # GeoMag is instantiated ONCE here (loads WMM file from disk once).
-    # Grid resolution: 2.5° lat × 5° lon → 73 × 72 = 5 256 points, ~0.7 s.
-    # ------------------------------------------------------------------
-    gm       = GeoMag()
-    lons     = np.arange(-180, 180,  5.0)
-    geo_lats = np.arange( -90,  91,  2.5)
-
-    mag_lat_grid = np.empty((len(geo_lats), len(lons)), dtype=np.float32)
-    for i, glat in enumerate(geo_lats):
-        for j, lon in enumerate(lons):
-            dip = gm.GeoMag(glat, lon).dip
-            mag_lat_grid[i, j] = np.degrees(np.arctan(0.5 * np.tan(np.radians(dip))))
-
-    # ------------------------------------------------------------------
-    # Step 2 — define contour levels covering the requested range
-    # ------------------------------------------------------------------
-    lat_min = int(np.floor(geo_lats[0]  / step_deg) * step_deg)
-    lat_max = int(np.ceil (geo_lats[-1] / step_deg) * step_deg)
-    all_levels    = np.arange(lat_min, lat_max + 1, step_deg).tolist()
-    hi_set        = set(highlight_lats)
-    label_set     = set(label_lats)
-
-    # ------------------------------------------------------------------
-    # Step 3 — draw regular lines via contour (one matplotlib call)
-    # ------------------------------------------------------------------
-    regular_levels = [lv for lv in all_levels if lv not in hi_set]
-    if regular_levels:
-        ax.contour(
-            lons, geo_lats, mag_lat_grid,
-            levels=regular_levels,
-            colors=[line_color],
-            linewidths=line_width,
-            linestyles='--',
-            alpha=line_alpha,
-            transform=proj,
-            zorder=4,
-        )
 
-    # ------------------------------------------------------------------
-    # Step 4 — draw highlighted lines (thicker, solid, fully opaque)
-    # ------------------------------------------------------------------
-    hi_levels = [lv for lv in all_levels if lv in hi_set]
-    if hi_levels:
-        ax.contour(
-            lons, geo_lats, mag_lat_grid,
-            levels=hi_levels,
-            colors=[line_color],
-            linewidths=highlight_width,
-            linestyles='-',
-            alpha=1.0,
-            transform=proj,
-            zorder=4,
-        )
-
-    # ------------------------------------------------------------------
-    # Step 5 — add text labels at ~150 °E for selected latitudes
-    # ------------------------------------------------------------------
-    label_lon  = 150.0
-    lon_idx    = np.argmin(np.abs(lons - label_lon))
-
-    for target in label_set:
-        # Find the geographic latitude whose magnetic latitude is closest
-        # to the target at the label longitude
-        col     = mag_lat_grid[:, lon_idx]
-        geo_idx = int(np.argmin(np.abs(col - target)))
-        geo_lat_at_label = float(geo_lats[geo_idx])
-
-        sign = '+' if target > 0 else ('' if target == 0 else '')
-        is_hi = target in hi_set
-        ax.text(
-            label_lon,
-            geo_lat_at_label,
-            f'{sign}{int(target)}°',
-            transform=proj,
-            color=line_color,
-            fontsize=7,
-            fontweight='bold' if is_hi else 'normal',
-            va='bottom',
-            ha='center',
-            path_effects=[pe.withStroke(linewidth=2, foreground='white')],
-            zorder=5,
-        )
-
-
-# ===========================================================================
-# 7.  MAP PLOTTING HELPERS
-# ===========================================================================
+def _read_ionex_buffer(data, filename, read_metadata):
+    """Body of :func:`read_ionex` for an already opened bytes-like buffer."""
+    # Extract header once — all header-only parsing uses this small slice.
+    # get_grid and get_metadata never see the map data blocks.
+    header = _extract_header(data)
 
-def _map_extent(ds):
-    """Return the imshow/map extent (lon_min, lon_max, lat_min, lat_max)
-    from the Dataset coordinates so the extent always matches the actual grid."""
-    lon = ds.longitude.values if hasattr(ds, 'longitude') else np.array([-180, 180])
-    lat = ds.latitude.values  if hasattr(ds, 'latitude')  else np.array([-90,   90])
-    # Half-cell padding so pixels are centred on their coordinate
-    dlon = abs(float(lon[1] - lon[0])) / 2 if lon.size > 1 else 0
-    dlat = abs(float(lat[1] - lat[0])) / 2 if lat.size > 1 else 0
-    return (float(lon[0]) - dlon, float(lon[-1]) + dlon,
-            float(min(lat[0], lat[-1])) - dlat,
-            float(max(lat[0], lat[-1])) + dlat)
-
-
-def _base_map_fig(data, cmap, vmin, vmax, title, cbar_label, extent):
-    """Shared map-setup logic for TEC and RMS maps."""
-    proj = ccrs.PlateCarree()
-    fig, ax = plt.subplots(1, 1, subplot_kw=dict(projection=proj), figsize=(12, 5))
-    ax.coastlines(resolution='110m', linewidth=0.8)
-    ax.add_feature(__import__('cartopy.feature', fromlist=['BORDERS']).BORDERS,
-                   linewidth=0.4, alpha=0.6)
-
-    h = ax.imshow(data, cmap=cmap, vmin=vmin, vmax=vmax,
-                  extent=extent, transform=proj, origin='upper')
-
-    gl = ax.gridlines(draw_labels=True, linewidth=0.8, color='gray',
-                      alpha=0.5, linestyle='--')
-    gl.top_labels   = False
-    gl.right_labels = False
-
-    ax.set_xlabel('Longitude')
-    ax.set_ylabel('Latitude')
-    ax.set_title(title, pad=8)
-
-    divider = make_axes_locatable(ax)
-    ax_cb   = divider.new_horizontal(size='3%', pad=0.08, axes_class=plt.Axes)
-    fig.add_axes(ax_cb)
-    plt.colorbar(h, cax=ax_cb, label=cbar_label)
-
-    fig.tight_layout()
-    return fig, ax
-
-
-def plot_tec_map(tecmap,
-                 add_geomagnetic_lines=False,
-                 geomag_kw=None,
-                 add_terminator=False,
-                 terminator_dt=None,
-                 terminator_kw=None):
-    """
-    Plot a Vertical TEC map.
+    # --- grid (v0.3.0: read from header, not hardcoded) ---
+    latitudes, longitudes, heights = get_grid(header)
 
-    Parameters
-    ----------
-    tecmap : xr.DataArray or np.ndarray
-        2-D TEC map, shape (n_lat, n_lon).  Passing an xr.DataArray is
-        recommended so the epoch and grid are inferred automatically.
-    add_geomagnetic_lines : bool
-        Overlay geomagnetic latitude lines.  Requires the ``geomag`` package
-        (``pip install geomag``).  See *geomag_kw* for styling options.
-    geomag_kw : dict or None
-        Keyword arguments forwarded to :func:`_plot_geomagnetic_latitude_lines`.
-        Examples::
-
-            geomag_kw=dict(step_deg=10, highlight_lats=(0,), line_color='orange')
-
-    add_terminator : bool
-        Overlay the day/night terminator.  The epoch is inferred from
-        ``tecmap.time`` when available; supply *terminator_dt* for plain
-        numpy arrays.
-    terminator_dt : datetime or None
-        Override the UTC epoch for the terminator.
-    terminator_kw : dict or None
-        Keyword arguments forwarded to :func:`_plot_terminator`.  Examples::
-
-            terminator_kw=dict(night_alpha=0.35, line_color='yellow')
-            terminator_kw=dict(show_night_shade=False, line_color='red')
+    # --- TEC maps (required) ---
+    tec_index = index_blocks(data, 'TEC')
+    if not tec_index:
+        raise ValueError(f"No TEC maps found in '{filename}'.")
+    tecmaps, epochs = _decode_blocks(data, tec_index, 'TEC', with_epochs=True)
 
-    Returns
-    -------
-    fig, ax : matplotlib Figure and Axes
-    """
-    try:
-        title = f'VTEC map  —  {np.datetime_as_string(tecmap.time.values, unit="m")} UTC'
-    except Exception:
-        title = 'VTEC map'
-
-    # Derive extent from DataArray coords if possible
-    try:
-        lons = tecmap.longitude.values
-        lats = tecmap.latitude.values
-        dlon = abs(lons[1] - lons[0]) / 2
-        dlat = abs(lats[1] - lats[0]) / 2
-        extent = (lons[0] - dlon, lons[-1] + dlon,
-                  min(lats[-1], lats[0]) - dlat,
-                  max(lats[-1], lats[0]) + dlat)
-    except Exception:
-        extent = (-182.5, 182.5, -90, 90)
-
-    fig, ax = _base_map_fig(
-        tecmap, cmap='viridis', vmin=0, vmax=100,
-        title=title, cbar_label=_CBAR_LABEL, extent=extent,
-    )
+    # --- RMS maps (optional) ---
+    rms_index = index_blocks(data, 'RMS')
+    if rms_index:
+        rmsmaps, _ = _decode_blocks(data, rms_index, 'RMS')
+    else:
+        warnings.warn(
+            f"'{filename}' contains no RMS maps. "
+            "The 'rms' variable will be all-NaN.",
+            UserWarning,
+        )
+        rmsmaps = [np.full((len(latitudes), len(longitudes)), np.nan)] * len(tecmaps)
 
-    if add_geomagnetic_lines:
-        _plot_geomagnetic_latitude_lines(ax, **(geomag_kw or {}))
+    # Align lengths (guard against partially malformed files)
+    n = min(len(tecmaps), len(rmsmaps), len(epochs))
+    tecmaps, rmsmaps, epochs = tecmaps[:n], rmsmaps[:n], epochs[:n]
 
-    if add_terminator:
-        dt = terminator_dt or _epoch_to_datetime(tecmap)
-        if dt is None:
-            warnings.warn(
-                "add_terminator=True but no epoch found. "
-                "Pass terminator_dt=<datetime>.", UserWarning
-            )
-        else:
-            _plot_terminator(ax, dt, **(terminator_kw or {}))
+    metadata = get_metadata(header)    if read_metadata else {}
+    return IonexMaps(np.stack(tecmaps), np.stack(rmsmaps),
+                     np.array(epochs, dtype='datetime64[ns]'),
+                     latitudes, longitudes, heights, metadata)
 
-    return fig, ax
 
+# ===========================================================================
+# 4.  RESULT CONTAINERS
+# ===========================================================================
 
-def plot_rms_map(rmsmap,
-                 add_geomagnetic_lines=False,
-                 geomag_kw=None,
-                 add_terminator=False,
-                 terminator_dt=None,
-                 terminator_kw=None):
+class IonexMaps:
     """
-    Plot a TEC RMS map.
+    Plain-numpy result of ``read_ionex(..., as_='numpy')``.
 
-    Parameters
-    ----------
-    rmsmap : xr.DataArray or np.ndarray
-        2-D RMS map, shape (n_lat, n_lon).
-    add_geomagnetic_lines : bool
-        Overlay geomagnetic latitude lines (requires ``geomag`` package).
-    geomag_kw : dict or None
-        Styling options for geomagnetic lines (see :func:`plot_tec_map`).
-    add_terminator : bool
-        Overlay the day/night terminator.
-    terminator_dt : datetime or None
-        Override UTC epoch for the terminator.
-    terminator_kw : dict or None
-        Styling options for the terminator (see :func:`plot_tec_map`).
+    A slotted record, so building one costs a handful of attribute stores.
+    Use it for small lookups and latency-sensitive services that never need
+    xarray (which is then not even imported).
 
-    Returns
-    -------
-    fig, ax : matplotlib Figure and Axes
+    Attributes
+    ----------
+    tec, rms : np.ndarray, shape (time, lat, lon)
+        Vertical TEC and its RMS in TECU (RMS all-NaN if the file has none).
+    epochs : np.ndarray of datetime64[ns]
+    lat, lon, height : np.ndarray
+        Grid from the header (degrees, degrees, km).
+    metadata : dict
+        ``ionex_version`` / ``run_by`` when read with ``read_metadata=True``.
     """
-    try:
-        title = f'TEC RMS map  —  {np.datetime_as_string(rmsmap.time.values, unit="m")} UTC'
-    except Exception:
-        title = 'TEC RMS map'
-
-    try:
-        lons = rmsmap.longitude.values
-        lats = rmsmap.latitude.values
-        dlon = abs(lons[1] - lons[0]) / 2
-        dlat = abs(lats[1] - lats[0]) / 2
-        extent = (lons[0] - dlon, lons[-1] + dlon,
-                  min(lats[-1], lats[0]) - dlat,
-                  max(lats[-1], lats[0]) + dlat)
-    except Exception:
-        extent = (-182.5, 182.5, -90, 90)
-
-    fig, ax = _base_map_fig(
-        rmsmap, cmap='plasma', vmin=0, vmax=10,
-        title=title, cbar_label=_CBAR_LABEL, extent=extent,
-    )
-
-    if add_geomagnetic_lines:
-        _plot_geomagnetic_latitude_lines(ax, **(geomag_kw or {}))
 
-    if add_terminator:
-        dt = terminator_dt or _epoch_to_datetime(rmsmap)
-        if dt is None:
-            warnings.warn(
-                "add_terminator=True but no epoch found. "
-                "Pass terminator_dt=<datetime>.", UserWarning
-            )
-        else:
-            _plot_terminator(ax, dt, **(terminator_kw or {}))
+    __slots__ = ('tec', 'rms', 'epochs', 'lat', 'lon', 'height', 'metadata')
 
-    return fig, ax
+    def __init__(self, tec, rms, epochs, lat, lon, height, metadata=None):
+        self.tec      = tec
+        self.rms      = rms
+        self.epochs   = epochs
+        self.lat      = lat
+        self.lon      = lon
+        self.height   = height
+        self.metadata = metadata or {}
 
+    def __repr__(self):
+        n_time, n_lat, n_lon = self.tec.shape
+        span = f'{self.epochs[0]} … {self.epochs[-1]}' if n_time else 'empty'
+        return f'<IonexMaps {n_time} × {n_lat} × {n_lon}, {span}>'
 
-# ===========================================================================
-# 8.  TIME-SERIES PLOT
-# ===========================================================================
+    def __len__(self):
+        return self.epochs.size
 
-def plot_time_series(ds, lat, lon, variable='tec'):
-    """
-    Plot the time series of TEC or RMS at the nearest grid point to (lat, lon).
+    def to_xarray(self):
+        """The equivalent :func:`read_ionex` Dataset; arrays are shared, not copied."""
+        return _create_xarray(self.tec, self.rms, self.epochs,
+                              self.lat, self.lon, self.metadata)
 
-    Parameters
-    ----------
-    ds : xr.Dataset
-        Dataset returned by :func:`read_ionex`.
-    lat : float
-        Target latitude (degrees).  Snapped to nearest grid point.
-    lon : float
-        Target longitude (degrees).  Snapped to nearest grid point.
-    variable : {'tec', 'rms'}
-        Which variable to plot.
 
-    Returns
-    -------
-    fig, ax : matplotlib Figure and Axes
-    """
-    if variable not in ds:
-        raise ValueError(f"Variable '{variable}' not in dataset. Choose 'tec' or 'rms'.")
+def _create_xarray(tec, rms, epochs, latitudes, longitudes, metadata):
+    """Assemble stacked ``(time, lat, lon)`` cubes into an xr.Dataset."""
+    import xarray as xr    # deferred — numpy-only callers never pay for it
 
-    lat_idx = int(np.abs(ds.latitude  - lat).argmin())
-    lon_idx = int(np.abs(ds.longitude - lon).argmin())
+    ds = xr.Dataset(
+        {
+            'tec': (['time', 'latitude', 'longitude'], tec),
+            'rms': (['time', 'latitude', 'longitude'], rms),
+        },
+        coords={
+            'time':      epochs,
+            'latitude':  latitudes,
+            'longitude': longitudes,
+        },
+    )
+    ds['tec'].attrs.update(units='TECU', long_name='Vertical Total Electron Content')
+    ds['rms'].attrs.update(units='TECU', long_name='RMS of Vertical TEC')
+    ds.attrs['ionex_reader_version'] = __version__
 
-    actual_lat = float(ds.latitude[lat_idx])
-    actual_lon = float(ds.longitude[lon_idx])
+    if metadata:
+        ds.attrs.update(metadata)
 
-    if actual_lat != lat or actual_lon != lon:
-        warnings.warn(
-            f"Requested ({lat}°, {lon}°) snapped to nearest grid point "
-            f"({actual_lat}°, {actual_lon}°).",
-            UserWarning,
-        )
+    return ds
 
-    ts = ds[variable].isel(latitude=lat_idx, longitude=lon_idx)
 
-    fig, ax = plt.subplots(figsize=(11, 4))
-    ax.plot(ds.time.values, ts.values, marker='o', markersize=3, linewidth=1.4,
-            label=f'{variable.upper()} at ({actual_lat}°, {actual_lon}°)')
-    ax.set_xlabel('Time (UTC)')
-    ax.set_ylabel(r'TECU  ($10^{16}\ \mathrm{el}\ \mathrm{m}^{-2}$)')
-    ax.set_title(
-        f'Time Series of {variable.upper()}  —  ({actual_lat}°N, {actual_lon}°E)'
-    )
-    ax.legend(fontsize=9)
-    ax.grid(True, alpha=0.4)
-    fig.autofmt_xdate()
-    fig.tight_layout()
-    return fig, ax
+def __getattr__(name):
+    # PEP 562 — resolve the plotting functions on first access only.
+    if name in _PLOTTING_NAMES:
+        from ionex_reader import plotting
+        return getattr(plotting, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ===========================================================================
-# 9.  EXAMPLE USAGE
+# 5.  EXAMPLE USAGE
 # ===========================================================================
 #
 # ---------- Read ------------------------------------------------------------
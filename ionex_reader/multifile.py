@@ -0,0 +1,231 @@
+"""
+multifile.py
+============
+Read many IONEX files as one continuous ``(time, latitude, longitude)``
+Dataset, optionally as a lazy dask array for out-of-core processing.
+
+With ``dask=True`` nothing is decoded up front.  The Dataset is assembled
+from per-file header scans (:func:`ionex_reader.ionex.scan_header`): each
+file, or each range of ``maps_per_chunk`` map blocks within a file, becomes
+one dask task that reads the file, locates the blocks with
+:func:`ionex_reader.ionex.index_blocks` and decodes only its range.  Ten
+years of 15-min maps then reduce (climatologies, anomalies, regional means)
+on any dask scheduler without ever being resident in RAM.
+
+Consecutive daily files share the midnight epoch (24:00 of day D is 00:00
+of day D+1); duplicates are dropped, keeping the earlier file's map.
+
+dask is optional and only imported when ``dask=True``.
+"""
+
+import os
+from datetime import timedelta
+
+import numpy as np
+
+from ionex_reader.filenames import filename_time_mask, parse_ionex_filenames
+from ionex_reader.stream import _load_bytes, _prefetch
+from ionex_reader.ionex import (
+    __version__, _decode_blocks, _read_buffer, _read_ionex_buffer, get_epoch,
+    index_blocks, read_ionex, scan_header,
+)
+
+
+# ===========================================================================
+# 1.  FILE LAYOUT  (header only — no map decoding)
+# ===========================================================================
+
+def _file_layout(path):
+    """
+    Return ``(epochs, latitudes, longitudes)`` for *path* without decoding maps.
+
+    Epochs come from the header (``EPOCH OF FIRST MAP`` + k × ``INTERVAL``).
+    If the header is incomplete or inconsistent with ``EPOCH OF LAST MAP``,
+    the epoch lines of the map blocks are scanned instead.
+    """
+    info = scan_header(path)
+    first, last = info['first_epoch'], info['last_epoch']
+    n, step = info['n_maps'], info['interval']
+
+    if first and last and n and step and \
+            first + timedelta(seconds=step * (n - 1)) == last:
+        epochs = [first + timedelta(seconds=step * k) for k in range(n)]
+    else:
+        with _read_buffer(path) as data:
+            epochs = [get_epoch(data[s:e]) for s, e in index_blocks(data, 'TEC')]
+
+    return (np.array(epochs, dtype='datetime64[ns]'),
+            info['latitude'], info['longitude'])
+
+
+def _read_range(path, start, stop, n_lat, n_lon):
+    """
+    Decode TEC and RMS maps ``start:stop`` of *path*.
+
+    Returns a ``(2, stop - start, n_lat, n_lon)`` float64 array
+    (``[0]`` = TEC, ``[1]`` = RMS; RMS is NaN if the file has none).
+    Each task reads (and decompresses) the whole file but decodes only its
+    range.  Blocks are decoded one by one into their own slot, so a
+    malformed block (skipped with a warning) leaves a NaN map instead of
+    shifting later maps onto the wrong epochs.  Top-level so it pickles to
+    distributed workers.
+    """
+    out = np.full((2, stop - start, n_lat, n_lon), np.nan)
+    with _read_buffer(path) as data:
+        for k, kind in enumerate(('TEC', 'RMS')):
+            for i, block in enumerate(index_blocks(data, kind)[start:stop]):
+                maps, _ = _decode_blocks(data, [block], kind)
+                if maps:
+                    out[k, i] = maps[0]
+    return out
+
+
+# ===========================================================================
+# 2.  MULTI-FILE READER
+# ===========================================================================
+
+def _first_occurrence(times):
+    """Indices that keep the first copy of each epoch, in time order."""
+    _, idx = np.unique(times, return_index=True)
+    return np.sort(idx)
+
+
+def read_mfionex(paths, dask=False, maps_per_chunk=None, read_metadata=False,
+                 time_range=None, prefetch=0):
+    """
+    Read several IONEX files into one time-ordered Dataset.
+
+    Parameters
+    ----------
+    paths : iterable of str
+        IONEX files (plain or compressed).  Order does not matter; files are
+        sorted by their first epoch.
+    dask : bool
+        ``False`` (default) — decode everything eagerly with
+        :func:`read_ionex`.  ``True`` — return dask-backed variables whose
+        graph has one task per file (or per block range, see below).
+    maps_per_chunk : int or None
+        With ``dask=True``, split each file into tasks of this many maps
+        (one dask chunk each).  ``None`` — one task per file.
+    read_metadata : bool
+        Attach the first file's ``ionex_version`` / ``run_by`` attributes.
+    time_range : (start, stop) or None
+        Keep only maps with ``start <= time <= stop``.  Files whose name
+        (see :func:`ionex_reader.filenames.parse_ionex_filenames`) shows they
+        lie outside the range are dropped without being opened; files with
+        unrecognised names are always read.
+    prefetch : int
+        With ``dask=False``, read and decompress up to this many upcoming
+        files in background threads while the current one is decoded
+        (default ``0`` — off).  Overlaps I/O with parsing on slow disks and
+        network file systems.
+
+    Returns
+    -------
+    xr.Dataset
+        Same variables and coordinates as :func:`read_ionex`.
+
+    Raises
+    ------
+    ValueError
+        If *paths* is empty, no file falls in *time_range*, or the files are
+        on different grids.
+    """
+    import xarray as xr
+
+    paths = [os.fspath(p) for p in paths]
+    if not paths:
+        raise ValueError("read_mfionex() needs at least one file.")
+    if time_range is not None:
+        start, stop = time_range
+        keep  = filename_time_mask(parse_ionex_filenames(paths), start, stop)
+        paths = [p for p, k in zip(paths, keep) if k]
+        if not paths:
+            raise ValueError(f"No file name overlaps the time range {start} … {stop}.")
+
+    if dask and prefetch:
+        raise ValueError("prefetch applies to dask=False; dask schedules its own reads.")
+
+    if not dask:
+        if prefetch:
+            buffers = _prefetch(paths, _load_bytes, prefetch)
+            try:
+                # Already decompressed; decoded under the file's own name so
+                # warnings and errors still say which file they are about.
+                datasets = [_read_ionex_buffer(data, path, False).to_xarray()
+                            for path, data in zip(paths, buffers)]
+            finally:
+                buffers.close()
+        else:
+            datasets = [read_ionex(path) for path in paths]
+        loaded = sorted(zip(datasets, paths), key=lambda item: item[0]['time'].values[0])
+        _check_grids([(d['latitude'].values, d['longitude'].values) for d, _ in loaded],
+                     [p for _, p in loaded])
+        ds = xr.concat([d for d, _ in loaded], dim='time')
+        ds = ds.isel(time=_first_occurrence(ds['time'].values))
+    else:
+        ds = _lazy_dataset(paths, maps_per_chunk)
+    if time_range is not None:
+        ds = ds.sel(time=slice(np.datetime64(start, 'ns'), np.datetime64(stop, 'ns')))
+
+    if read_metadata:
+        info = scan_header(paths[0])
+        ds.attrs.update({k: info[k] for k in ('ionex_version', 'run_by') if k in info})
+    return ds
+
+
+def _check_grids(grids, paths):
+    lat0, lon0 = grids[0]
+    for (lat, lon), path in zip(grids[1:], paths[1:]):
+        if lat.shape != lat0.shape or lon.shape != lon0.shape or \
+                not (np.allclose(lat, lat0) and np.allclose(lon, lon0)):
+            raise ValueError(
+                f"'{path}' is on a {lat.size}×{lon.size} grid, the first file on "
+                f"{lat0.size}×{lon0.size}; regrid before combining (ionex_reader.regrid)."
+            )
+
+
+def _lazy_dataset(paths, maps_per_chunk):
+    """Build the dask-backed Dataset from header scans only."""
+    try:
+        import dask
+        import dask.array as da
+    except ImportError:
+        raise ImportError(
+            "The 'dask' package is required for read_mfionex(dask=True).\n"
+            "Install it with:  pip install dask"
+        )
+    import xarray as xr
+
+    layouts = sorted(((p,) + _file_layout(p) for p in paths), key=lambda x: x[1][0])
+    _check_grids([(lat, lon) for _, _, lat, lon in layouts], [p for p, *_ in layouts])
+    _, _, lats, lons = layouts[0]
+    n_lat, n_lon = lats.size, lons.size
+
+    pieces, times = [], []
+    for path, epochs, _, _ in layouts:
+        step = maps_per_chunk or epochs.size
+        for start in range(0, epochs.size, step):
+            stop = min(start + step, epochs.size)
+            task = dask.delayed(_read_range, pure=True)(path, start, stop, n_lat, n_lon)
+            pieces.append(da.from_delayed(task, shape=(2, stop - start, n_lat, n_lon),
+                                          dtype=np.float64))
+        times.append(epochs)
+
+    cube  = da.concatenate(pieces, axis=1)
+    times = np.concatenate(times)
+    keep  = _first_occurrence(times)
+    if keep.size != times.size:
+        cube = cube[:, keep]
+
+    ds = xr.Dataset(
+        {
+            'tec': (['time', 'latitude', 'longitude'], cube[0]),
+            'rms': (['time', 'latitude', 'longitude'], cube[1]),
+        },
+        coords={'time': times[keep], 'latitude': lats, 'longitude': lons},
+    )
+    ds['tec'].attrs.update(units='TECU', long_name='Vertical Total Electron Content')
+    ds['rms'].attrs.update(units='TECU', long_name='RMS of Vertical TEC')
+    ds.attrs['ionex_reader_version'] = __version__
+    return ds
@@ -0,0 +1,596 @@
+"""
+plotting.py
+===========
+Map and time-series plotting for Datasets returned by
+:func:`ionex_reader.ionex.read_ionex`.
+
+Kept separate from the reader so that ``import ionex_reader`` does not pull
+in matplotlib, cartopy and mpl_toolkits.  The package ``__init__`` loads this
+module on first access to one of the plotting functions.
+"""
+
+import threading
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.patheffects as pe
+from matplotlib.axes import Axes
+import cartopy.crs as ccrs
+from mpl_toolkits.axes_grid1 import make_axes_locatable
+
+from ionex_reader.solar import _subsolar_point, terminator_curve  # noqa: F401
+
+# ---------------------------------------------------------------------------
+# CBAR label — defined once, used in multiple plot functions
+# ---------------------------------------------------------------------------
+_CBAR_LABEL = r'TECU  ($10^{16}\ \mathrm{el}\ \mathrm{m}^{-2}$)'
+
+
+# ===========================================================================
+# 1.  DAY / NIGHT TERMINATOR  (pure numpy — no extra dependencies)
+# ===========================================================================
+
+def _plot_terminator(ax, dt,
+                     line_color='white', line_width=1.5,
+                     night_color='navy', night_alpha=0.25,
+                     show_night_shade=True):
+    """
+    Draw the day/night terminator on a Cartopy PlateCarree axes.
+
+    The terminator is the locus where the solar zenith angle equals 90°::
+
+        cos Z = sin φ sin δ  +  cos φ cos δ cos H
+
+    where φ is geographic latitude, δ is solar declination, and H is the
+    solar hour angle (longitude − subsolar longitude).  The curve and the
+    night polygon come from :func:`ionex_reader.solar.terminator_curve`
+    (closed form, memoised per epoch) — no grid is contoured.
+
+    Parameters
+    ----------
+    ax : cartopy GeoAxes  (PlateCarree projection)
+    dt : datetime (UTC)
+        Epoch for solar position.  Pass ``None`` to skip silently.
+    line_color : str     Terminator line colour  (default ``'white'``).
+    line_width : float   Line width              (default ``1.5``).
+    night_color : str    Night-side fill colour  (default ``'navy'``).
+    night_alpha : float  Night-side opacity      (default ``0.25``).
+    show_night_shade : bool
+        Shade the night hemisphere (default ``True``).
+
+    Returns
+    -------
+    list
+        The artists added (empty if *dt* is ``None``), so an animation can
+        remove them before drawing the next epoch.
+    """
+    if dt is None:
+        return []
+
+    lon, lat, night = terminator_curve(dt)
+
+    proj = ccrs.PlateCarree()
+    artists = []
+
+    if show_night_shade:
+        artists += ax.fill(night[0, :, 0], night[0, :, 1], color=night_color,
+                           alpha=night_alpha, linewidth=0, transform=proj)
+
+    artists += ax.plot(lon, lat[0], color=line_color, linewidth=line_width,
+                       transform=proj)
+    return artists
+
+
+def _epoch_to_datetime(data):
+    """
+    Extract a Python datetime from an xr.DataArray ``time`` coordinate.
+
+    Returns ``None`` on failure so callers can emit a clean warning.
+    """
+    try:
+        import pandas as pd
+        return pd.Timestamp(data.time.values).to_pydatetime().replace(tzinfo=None)
+    except Exception:
+        return None
+
+
+# ===========================================================================
+# 2.  GEOMAGNETIC LATITUDE LINES
+# ===========================================================================
+
+def _plot_geomagnetic_latitude_lines(ax,
+                                     step_deg=10,
+                                     highlight_lats=(-30, 0, 30),
+                                     label_lats=(-60, -30, 0, 30, 60),
+                                     line_color='red',
+                                     line_alpha=0.65,
+                                     line_width=0.8,
+                                     highlight_width=1.6,
+                                     model='auto'):
+    """
+    Overlay geomagnetic (dip) latitude lines on an existing Cartopy axes.
+
+    Geomagnetic latitude is derived from the magnetic dip (inclination)
+    angle of the main-field model::
+
+        mag_lat = arctan(0.5 × tan(dip))
+
+    Strategy (vectorised, a few ms once cached):
+
+    1. Take the geographic lat × lon grid of magnetic latitudes from
+       :func:`ionex_reader.magnetic.dip_latitude_grid` — evaluated in one
+       numpy pass and memoised in memory and on disk.
+    2. Pass the full grid to ``ax.contour()`` which extracts all desired
+       magnetic-latitude isolines simultaneously — no per-contour loop.
+    3. Add styled labels for lines listed in *label_lats*.
+
+    The World Magnetic Model of the ``geomag`` package is used when it is
+    installed (only its coefficient file is read); otherwise an embedded
+    IGRF-13 model.
+
+    Parameters
+    ----------
+    ax : cartopy GeoAxes  (PlateCarree projection)
+    step_deg : int
+        Spacing between geomagnetic latitude contours in degrees (default 10).
+    highlight_lats : tuple of float
+        Magnetic latitudes drawn thicker and fully opaque
+        (default: −30°, magnetic equator 0°, +30°  — i.e. the EIA boundaries).
+    label_lats : tuple of float
+        Magnetic latitudes annotated with a text label (default: ±60, ±30, 0°).
+    line_color : str
+        Colour for all geomagnetic lines (default ``'red'``).
+    line_alpha : float
+        Opacity for regular (non-highlighted) lines (default 0.65).
+    line_width : float
+        Line width for regular lines (default 0.8).
+    highlight_width : float
+        Line width for highlighted lines (default 1.6).
+    model : str
+        Field model, see :func:`ionex_reader.magnetic.load_coefficients`
+        (default ``'auto'``).
+
+    Returns
+    -------
+    list
+        The contour and text artists added, so a reused
+        :class:`MapCanvas` can remove them again.
+    """
+    from ionex_reader.magnetic import dip_latitude_grid
+
+    proj = ccrs.PlateCarree()
+
+    # ------------------------------------------------------------------
+    # Step 1 — (geo_lat × lon) grid of magnetic dip-latitudes, 2.5° × 5°.
+    # ------------------------------------------------------------------
+    geo_lats, lons, mag_lat_grid = dip_latitude_grid((2.5, 5.0), model=model)
+
+    # ------------------------------------------------------------------
+    # Step 2 — define contour levels covering the requested range
+    # ------------------------------------------------------------------
+    lat_min = int(np.floor(geo_lats[0]  / step_deg) * step_deg)
+    lat_max = int(np.ceil (geo_lats[-1] / step_deg) * step_deg)
+    all_levels    = np.arange(lat_min, lat_max + 1, step_deg).tolist()
+    hi_set        = set(highlight_lats)
+    label_set     = set(label_lats)
+
+    # ------------------------------------------------------------------
+    # Step 3 — draw regular lines via contour (one matplotlib call)
+    # ------------------------------------------------------------------
+    artists = []
+    regular_levels = [lv for lv in all_levels if lv not in hi_set]
+    if regular_levels:
+        artists.append(ax.contour(
+            lons, geo_lats, mag_lat_grid,
+            levels=regular_levels,
+            colors=[line_color],
+            linewidths=line_width,
+            linestyles='--',
+            alpha=line_alpha,
+            transform=proj,
+            zorder=4,
+        ))
+
+    # ------------------------------------------------------------------
+    # Step 4 — draw highlighted lines (thicker, solid, fully opaque)
+    # ------------------------------------------------------------------
+    hi_levels = [lv for lv in all_levels if lv in hi_set]
+    if hi_levels:
+        artists.append(ax.contour(
+            lons, geo_lats, mag_lat_grid,
+            levels=hi_levels,
+            colors=[line_color],
+            linewidths=highlight_width,
+            linestyles='-',
+            alpha=1.0,
+            transform=proj,
+            zorder=4,
+        ))
+
+    # ------------------------------------------------------------------
+    # Step 5 — add text labels at ~150 °E for selected latitudes
+    # ------------------------------------------------------------------
+    label_lon  = 150.0
+    lon_idx    = np.argmin(np.abs(lons - label_lon))
+
+    for target in label_set:
+        # Find the geographic latitude whose magnetic latitude is closest
+        # to the target at the label longitude
+        col     = mag_lat_grid[:, lon_idx]
+        geo_idx = int(np.argmin(np.abs(col - target)))
+        geo_lat_at_label = float(geo_lats[geo_idx])
+
+        sign = '+' if target > 0 else ('' if target == 0 else '')
+        is_hi = target in hi_set
+        artists.append(ax.text(
+            label_lon,
+            geo_lat_at_label,
+            f'{sign}{int(target)}°',
+            transform=proj,
+            color=line_color,
+            fontsize=7,
+            fontweight='bold' if is_hi else 'normal',
+            va='bottom',
+            ha='center',
+            path_effects=[pe.withStroke(linewidth=2, foreground='white')],
+            zorder=5,
+        ))
+    return artists
+
+
+# ===========================================================================
+# 3.  MAP PLOTTING HELPERS
+# ===========================================================================
+
+def _map_extent(ds):
+    """Return the imshow/map extent (lon_min, lon_max, lat_min, lat_max)
+    from the Dataset coordinates so the extent always matches the actual grid."""
+    lon = ds.longitude.values if hasattr(ds, 'longitude') else np.array([-180, 180])
+    lat = ds.latitude.values  if hasattr(ds, 'latitude')  else np.array([-90,   90])
+    # Half-cell padding so pixels are centred on their coordinate
+    dlon = abs(float(lon[1] - lon[0])) / 2 if lon.size > 1 else 0
+    dlat = abs(float(lat[1] - lat[0])) / 2 if lat.size > 1 else 0
+    return (float(lon[0]) - dlon, float(lon[-1]) + dlon,
+            float(min(lat[0], lat[-1])) - dlat,
+            float(max(lat[0], lat[-1])) + dlat)
+
+
+def _data_extent(data):
+    """Extent of a map DataArray from its coordinates (global default for arrays)."""
+    try:
+        lons = data.longitude.values
+        lats = data.latitude.values
+        dlon = abs(lons[1] - lons[0]) / 2
+        dlat = abs(lats[1] - lats[0]) / 2
+        return (float(lons[0] - dlon), float(lons[-1] + dlon),
+                float(min(lats[-1], lats[0]) - dlat),
+                float(max(lats[-1], lats[0]) + dlat))
+    except Exception:
+        return (-182.5, 182.5, -90.0, 90.0)
+
+
+class MapCanvas:
+    """
+    A map figure built once and redrawn map after map.
+
+    Coastlines, borders, gridlines and the colour-bar layout are set up in
+    the constructor; :meth:`update` only swaps the image data, the title and
+    the terminator overlay.  Cartopy caches the projected coastline and
+    border paths on their artists, so a reused canvas also skips the
+    re-projection.  Pass one to :func:`plot_tec_map` / :func:`plot_rms_map`
+    with ``canvas=`` for cheap notebook or dashboard redraws, or take the
+    per-thread cached instance from :meth:`cached`.
+
+    By default the figure is a plain Agg-backed
+    :class:`matplotlib.figure.Figure`, not registered with pyplot: it is
+    never shown by ``plt.show()`` and is safe to use from worker threads
+    (one canvas per thread).
+
+    Parameters
+    ----------
+    extent : (lon_min, lon_max, lat_min, lat_max) or None
+        Image extent in degrees (default: global 2.5° × 5° grid).
+    projection : cartopy CRS or None
+        Map projection (default ``PlateCarree``).  Data are always given on
+        a regular lat/lon grid.
+    figsize : (float, float)
+        Figure size in inches.
+    dpi : float or None
+        Figure resolution (default: ``rcParams['figure.dpi']``).
+    pyplot : bool
+        Create the figure through pyplot, so ``plt.show()`` displays it.
+
+    Examples
+    --------
+    >>> canvas = MapCanvas.cached(_data_extent(ds['tec']))
+    >>> for t in ds.time[:4]:
+    ...     fig, ax = plot_tec_map(ds['tec'].sel(time=t), canvas=canvas)
+    ...     fig.savefig(f'{t.dt.strftime("%H%M").item()}.png')
+    """
+
+    _CACHE_SIZE = 4
+    _local      = threading.local()
+
+    def __init__(self, extent=None, projection=None, figsize=(12, 5), dpi=None,
+                 pyplot=False):
+        import cartopy.feature as cfeature
+
+        self.extent     = tuple(extent) if extent is not None else (-182.5, 182.5, -90.0, 90.0)
+        self.projection = projection if projection is not None else ccrs.PlateCarree()
+
+        if pyplot:
+            fig = plt.figure(figsize=figsize, dpi=dpi)
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1, projection=self.projection)
+        ax.coastlines(resolution='110m', linewidth=0.8)
+        ax.add_feature(cfeature.BORDERS, linewidth=0.4, alpha=0.6)
+
+        self.image = ax.imshow(np.full((2, 2), np.nan), extent=self.extent,
+                               transform=ccrs.PlateCarree(), origin='upper')
+
+        gl = ax.gridlines(draw_labels=True, linewidth=0.8, color='gray',
+                          alpha=0.5, linestyle='--')
+        gl.top_labels   = False
+        gl.right_labels = False
+
+        ax.set_xlabel('Longitude')
+        ax.set_ylabel('Latitude')
+        # Placeholder text so tight_layout reserves room for the title.
+        self.title = ax.set_title('VTEC map', pad=8)
+
+        divider = make_axes_locatable(ax)
+        ax_cb   = divider.new_horizontal(size='3%', pad=0.08, axes_class=Axes)
+        fig.add_axes(ax_cb)
+        self.colorbar = fig.colorbar(self.image, cax=ax_cb, label=_CBAR_LABEL)
+
+        # Lay out once, then freeze: a layout engine would force an extra
+        # draw on every savefig.
+        fig.tight_layout()
+        fig.set_layout_engine(None)
+        self.title.set_text('')
+        self.fig, self.ax = fig, ax
+        self._terminator = []
+        self._geomag     = []
+        self._geomag_kw  = None
+
+    @classmethod
+    def cached(cls, extent=None, projection=None, figsize=(12, 5), dpi=None):
+        """
+        Canvas for ``(extent, projection, figsize, dpi)``, built on first use.
+
+        The cache is per thread (figures must not be shared across threads)
+        and keeps the few most recently used canvases; evicted ones are
+        closed.
+        """
+        cache = getattr(cls._local, 'canvases', None)
+        if cache is None:
+            cache = cls._local.canvases = OrderedDict()
+        projection = projection if projection is not None else ccrs.PlateCarree()
+        key = (tuple(extent) if extent is not None else None, projection,
+               tuple(figsize), dpi)
+        canvas = cache.get(key)
+        if canvas is None or canvas.fig is None:
+            canvas = cache[key] = cls(extent, projection, figsize, dpi)
+            while len(cache) > cls._CACHE_SIZE:
+                cache.popitem(last=False)[1].close()
+        cache.move_to_end(key)
+        return canvas
+
+    def set_style(self, cmap='viridis', vmin=0, vmax=100, cbar_label=_CBAR_LABEL):
+        """Colour map, colour limits and colour-bar label (the bar follows)."""
+        self.image.set_cmap(cmap)
+        self.image.set_clim(vmin, vmax)
+        self.colorbar.set_label(cbar_label)
+
+    def set_geomagnetic_lines(self, enabled=True, geomag_kw=None):
+        """Draw, restyle or remove the geomagnetic latitude overlay."""
+        if enabled and self._geomag and geomag_kw == self._geomag_kw:
+            return
+        for artist in self._geomag:
+            artist.remove()
+        self._geomag = []
+        if enabled:
+            self._geomag    = _plot_geomagnetic_latitude_lines(self.ax, **(geomag_kw or {}))
+            self._geomag_kw = geomag_kw
+
+    def update(self, data, title='', terminator_dt=None, terminator_kw=None, extent=None):
+        """
+        Show *data* with *title*, and the terminator at *terminator_dt* (or none).
+
+        *extent* moves the image if the grid differs from the canvas extent.
+        """
+        self.image.set_data(np.asarray(data))
+        if extent is not None and tuple(extent) != tuple(self.image.get_extent()):
+            self.image.set_extent(extent)
+        self.title.set_text(title)
+        for artist in self._terminator:
+            artist.remove()
+        self._terminator = _plot_terminator(self.ax, terminator_dt, **(terminator_kw or {}))
+
+    def savefig(self, path, **kwargs):
+        kwargs.setdefault('dpi', self.fig.dpi)
+        self.fig.savefig(path, **kwargs)
+
+    def close(self):
+        """Release the figure (the canvas is unusable afterwards)."""
+        if self.fig is not None:
+            if self.fig.canvas.manager is not None:
+                plt.close(self.fig)
+            self.fig.clear()
+        self.fig = self.ax = self.image = self.title = self.colorbar = None
+        self._terminator, self._geomag = [], []
+
+
+def _plot_map(data, canvas, style, default_title, add_geomagnetic_lines, geomag_kw,
+              add_terminator, terminator_dt, terminator_kw):
+    """Shared body of :func:`plot_tec_map` and :func:`plot_rms_map`."""
+    try:
+        title = f'{default_title}  —  {np.datetime_as_string(data.time.values, unit="m")} UTC'
+    except Exception:
+        title = default_title
+
+    extent = _data_extent(data)
+    if canvas is None:
+        canvas = MapCanvas(extent, pyplot=True)
+
+    dt = None
+    if add_terminator:
+        dt = terminator_dt or _epoch_to_datetime(data)
+        if dt is None:
+            warnings.warn(
+                "add_terminator=True but no epoch found. "
+                "Pass terminator_dt=<datetime>.", UserWarning
+            )
+
+    canvas.set_style(**style)
+    canvas.set_geomagnetic_lines(add_geomagnetic_lines, geomag_kw)
+    canvas.update(data, title, terminator_dt=dt, terminator_kw=terminator_kw,
+                  extent=extent)
+    return canvas.fig, canvas.ax
+
+
+def plot_tec_map(tecmap,
+                 add_geomagnetic_lines=False,
+                 geomag_kw=None,
+                 add_terminator=False,
+                 terminator_dt=None,
+                 terminator_kw=None,
+                 canvas=None):
+    """
+    Plot a Vertical TEC map.
+
+    Parameters
+    ----------
+    tecmap : xr.DataArray or np.ndarray
+        2-D TEC map, shape (n_lat, n_lon).  Passing an xr.DataArray is
+        recommended so the epoch and grid are inferred automatically.
+    add_geomagnetic_lines : bool
+        Overlay geomagnetic latitude lines (WMM from the optional ``geomag``
+        package, else embedded IGRF-13).  See *geomag_kw* for styling options.
+    geomag_kw : dict or None
+        Keyword arguments forwarded to :func:`_plot_geomagnetic_latitude_lines`.
+        Examples::
+
+            geomag_kw=dict(step_deg=10, highlight_lats=(0,), line_color='orange')
+
+    add_terminator : bool
+        Overlay the day/night terminator.  The epoch is inferred from
+        ``tecmap.time`` when available; supply *terminator_dt* for plain
+        numpy arrays.
+    terminator_dt : datetime or None
+        Override the UTC epoch for the terminator.
+    terminator_kw : dict or None
+        Keyword arguments forwarded to :func:`_plot_terminator`.  Examples::
+
+            terminator_kw=dict(night_alpha=0.35, line_color='yellow')
+            terminator_kw=dict(show_night_shade=False, line_color='red')
+
+    canvas : MapCanvas or None
+        Draw into this canvas instead of a new pyplot figure; only the
+        image, title and overlays are updated.  See :meth:`MapCanvas.cached`.
+
+    Returns
+    -------
+    fig, ax : matplotlib Figure and Axes
+    """
+    return _plot_map(tecmap, canvas, dict(cmap='viridis', vmin=0, vmax=100),
+                     'VTEC map', add_geomagnetic_lines, geomag_kw,
+                     add_terminator, terminator_dt, terminator_kw)
+
+
+def plot_rms_map(rmsmap,
+                 add_geomagnetic_lines=False,
+                 geomag_kw=None,
+                 add_terminator=False,
+                 terminator_dt=None,
+                 terminator_kw=None,
+                 canvas=None):
+    """
+    Plot a TEC RMS map.
+
+    Parameters
+    ----------
+    rmsmap : xr.DataArray or np.ndarray
+        2-D RMS map, shape (n_lat, n_lon).
+    add_geomagnetic_lines : bool
+        Overlay geomagnetic latitude lines.
+    geomag_kw : dict or None
+        Styling options for geomagnetic lines (see :func:`plot_tec_map`).
+    add_terminator : bool
+        Overlay the day/night terminator.
+    terminator_dt : datetime or None
+        Override UTC epoch for the terminator.
+    terminator_kw : dict or None
+        Styling options for the terminator (see :func:`plot_tec_map`).
+    canvas : MapCanvas or None
+        Reuse a canvas (see :func:`plot_tec_map`).
+
+    Returns
+    -------
+    fig, ax : matplotlib Figure and Axes
+    """
+    return _plot_map(rmsmap, canvas, dict(cmap='plasma', vmin=0, vmax=10),
+                     'TEC RMS map', add_geomagnetic_lines, geomag_kw,
+                     add_terminator, terminator_dt, terminator_kw)
+
+
+# ===========================================================================
+# 4.  TIME-SERIES PLOT
+# ===========================================================================
+
+def plot_time_series(ds, lat, lon, variable='tec'):
+    """
+    Plot the time series of TEC or RMS at the nearest grid point to (lat, lon).
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Dataset returned by :func:`read_ionex`.
+    lat : float
+        Target latitude (degrees).  Snapped to nearest grid point.
+    lon : float
+        Target longitude (degrees).  Snapped to nearest grid point.
+    variable : {'tec', 'rms'}
+        Which variable to plot.
+
+    Returns
+    -------
+    fig, ax : matplotlib Figure and Axes
+    """
+    if variable not in ds:
+        raise ValueError(f"Variable '{variable}' not in dataset. Choose 'tec' or 'rms'.")
+
+    lat_idx = int(np.abs(ds.latitude  - lat).argmin())
+    lon_idx = int(np.abs(ds.longitude - lon).argmin())
+
+    actual_lat = float(ds.latitude[lat_idx])
+    actual_lon = float(ds.longitude[lon_idx])
+
+    if actual_lat != lat or actual_lon != lon:
+        warnings.warn(
+            f"Requested ({lat}°, {lon}°) snapped to nearest grid point "
+            f"({actual_lat}°, {actual_lon}°).",
+            UserWarning,
+        )
+
+    ts = ds[variable].isel(latitude=lat_idx, longitude=lon_idx)
+
+    fig, ax = plt.subplots(figsize=(11, 4))
+    ax.plot(ds.time.values, ts.values, marker='o', markersize=3, linewidth=1.4,
+            label=f'{variable.upper()} at ({actual_lat}°, {actual_lon}°)')
+    ax.set_xlabel('Time (UTC)')
+    ax.set_ylabel(r'TECU  ($10^{16}\ \mathrm{el}\ \mathrm{m}^{-2}$)')
+    ax.set_title(
+        f'Time Series of {variable.upper()}  —  ({actual_lat}°N, {actual_lon}°E)'
+    )
+    ax.legend(fontsize=9)
+    ax.grid(True, alpha=0.4)
+    fig.autofmt_xdate()
+    fig.tight_layout()
+    return fig, ax
@@ -0,0 +1,334 @@
+"""
+regridding.py
+=============
+Regrid TEC / RMS cubes between agency grids with cached sparse weights.
+
+CODE / IGS products use 2.5° × 5°, UPC's UQRG 1° × 1°, and regional
+products their own grids.  :func:`regrid_weights` builds the weights from
+one grid to another once — bilinear, nearest-neighbour or first-order
+conservative (area-weighted), honouring the ±180° wrap of global grids —
+as a plain-numpy CSR matrix cached by the pair of grid signatures.
+:func:`regrid` applies it to whole chunks of maps with one sparse product
+each, lazily for dask-backed cubes.
+
+Missing (NaN) source values are left out and the remaining weights
+renormalised; target points the source grid does not cover are NaN.
+
+Example
+-------
+>>> from ionex_reader.regridding import regrid
+>>> code = read_ionex('codg0010.24i')                    # 2.5° × 5°
+>>> uqrg = read_ionex('uqrg0010.24i')                    # 1° × 1°
+>>> fine = regrid(code, uqrg.latitude, uqrg.longitude, method='conservative')
+>>> (fine['tec'] - uqrg['tec']).mean('time').plot()
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+_METHODS = ('bilinear', 'conservative', 'nearest')
+
+
+class _SparseWeights:
+    """
+    Row-compressed (CSR) weight matrix in plain numpy.
+
+    ``dot(x)`` is ``x @ W.T`` over the last axis of *x*, for any number of
+    maps at once: one gather of the non-zero columns and one
+    ``np.add.reduceat`` over the rows.  When scipy is installed the same
+    arrays are wrapped in a ``scipy.sparse.csr_matrix`` (no copy), whose
+    compiled product is about 10× faster; scipy is not required.
+    """
+
+    __slots__ = ('data', 'indices', 'indptr', 'shape', 'row_sums', '_scipy')
+
+    # Rows of x per pass, bounding the (rows × nnz) product buffer.
+    _BLOCK_ELEMENTS = 1 << 22
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data, self.indices, self.indptr = data, indices, indptr
+        self.shape = tuple(shape)
+        self.row_sums = np.zeros(self.shape[0])
+        starts = np.flatnonzero(np.diff(indptr))
+        if starts.size:
+            self.row_sums[starts] = np.add.reduceat(data, indptr[starts])
+        for a in (data, indices, indptr, self.row_sums):
+            a.flags.writeable = False
+        self._scipy = None
+
+    @classmethod
+    def from_coo(cls, rows, cols, values, shape):
+        """Sum duplicate ``(row, col)`` entries into a CSR matrix."""
+        n_rows, n_cols = shape
+        key = np.asarray(rows, dtype=np.int64) * n_cols + np.asarray(cols, dtype=np.int64)
+        key, inverse = np.unique(key, return_inverse=True)
+        data   = np.bincount(inverse.ravel(), weights=np.ravel(values)).astype(np.float64)
+        counts = np.bincount(key // n_cols, minlength=n_rows)
+        indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(data, (key % n_cols).astype(np.intp), indptr, shape)
+
+    @property
+    def nnz(self):
+        return self.data.size
+
+    def dot(self, x):
+        """``x @ W.T``: ``(..., n_cols)`` → ``(..., n_rows)`` (float64)."""
+        x = np.asarray(x)
+        lead = x.shape[:-1]
+        x = x.reshape(-1, self.shape[1])
+        matrix = self._scipy_matrix()
+        if matrix is not None:
+            return np.ascontiguousarray((matrix @ x.T).T).reshape(lead + (self.shape[0],))
+
+        out = np.zeros((x.shape[0], self.shape[0]))
+        starts = np.flatnonzero(np.diff(self.indptr))
+        if starts.size:
+            step = max(1, self._BLOCK_ELEMENTS // max(self.nnz, 1))
+            for a in range(0, x.shape[0], step):
+                prod = x[a:a + step, self.indices] * self.data
+                out[a:a + step, starts] = np.add.reduceat(prod, self.indptr[starts], axis=1)
+        return out.reshape(lead + (self.shape[0],))
+
+    def _scipy_matrix(self):
+        if self._scipy is None:
+            try:
+                from scipy.sparse import csr_matrix
+            except ImportError:
+                self._scipy = False
+            else:
+                self._scipy = csr_matrix((self.data, self.indices, self.indptr),
+                                         shape=self.shape, copy=False)
+        return None if self._scipy is False else self._scipy
+
+    def mean(self, x):
+        """
+        Weighted mean of the finite values of *x* per row: ``dot(x) /
+        dot(1)`` with NaN inputs left out, NaN where a row has none.
+        """
+        x = np.asarray(x)
+        finite = np.isfinite(x)
+        if finite.all():
+            num, den = self.dot(x), self.row_sums
+        else:
+            num = self.dot(np.where(finite, x, 0.0))
+            den = self.dot(finite.astype(np.float64))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(den > 0, num / den, np.nan)
+
+
+def _signature(values):
+    """Hashable, float-noise-free key of a coordinate axis."""
+    return tuple(np.round(np.asarray(values, dtype=np.float64).ravel(), 6).tolist())
+
+
+def _period(lons):
+    """
+    ``(columns, 360.0)`` for a regular global longitude axis — the columns
+    that tile the circle, without a duplicated 180° — else ``(all, None)``.
+    """
+    n = lons.size
+    if n > 1:
+        step = np.diff(lons)
+        if np.allclose(step, step[0]) and step[0] > 0:
+            if abs(n * step[0] - 360) < 1e-6:
+                return np.arange(n), 360.0
+            if abs((n - 1) * step[0] - 360) < 1e-6:
+                return np.arange(n - 1), 360.0
+    return np.arange(n), None
+
+
+def _linear_1d(src, dst, period):
+    """``(dst index, src index, weight)`` triplets of 1-D linear interpolation."""
+    order = np.argsort(src)
+    s = src[order]
+    if period:
+        dst = np.where((dst >= s[0]) & (dst <= s[-1]), dst, (dst - s[0]) % period + s[0])
+        if s[-1] < s[0] + period - 1e-6:        # close the circle
+            s = np.append(s, s[0] + period)
+            order = np.append(order, order[0])
+    k = np.clip(np.searchsorted(s, dst, side='right') - 1, 0, s.size - 2)
+    w = (dst - s[k]) / (s[k + 1] - s[k])
+    inside = (w >= -1e-9) & (w <= 1 + 1e-9)
+    w = np.clip(w, 0, 1)
+    rows = np.flatnonzero(inside)
+    return (np.concatenate([rows, rows]),
+            np.concatenate([order[k[rows]], order[k[rows] + 1]]),
+            np.concatenate([1 - w[rows], w[rows]]))
+
+
+def _edges(centres, lo, hi):
+    """Cell edges of ascending *centres*: midpoints, outer edges half a cell out."""
+    if centres.size == 1:
+        return np.array([max(centres[0] - 0.5, lo), min(centres[0] + 0.5, hi)])
+    mid = (centres[1:] + centres[:-1]) / 2
+    return np.clip(np.concatenate([[2 * centres[0] - mid[0]], mid,
+                                   [2 * centres[-1] - mid[-1]]]), lo, hi)
+
+
+def _overlap_1d(src, dst, period, measure):
+    """
+    ``(dst index, src index, overlap)`` triplets of overlapping cells, with
+    lengths taken after *measure* (``np.sin`` of latitude gives area).
+    """
+    so, do = np.argsort(src), np.argsort(dst)
+    lo, hi = (-90.0, 90.0) if period is None else (-np.inf, np.inf)
+    se, de = _edges(src[so], lo, hi), _edges(dst[do], lo, hi)
+    shifts = (0.0,) if period is None else (-period, 0.0, period)
+    rows, cols, vals = [], [], []
+    for shift in shifts:
+        a = np.maximum(de[:-1, np.newaxis], se[np.newaxis, :-1] + shift)
+        b = np.minimum(de[1:, np.newaxis],  se[np.newaxis, 1:] + shift)
+        length = np.where(b > a, measure(b) - measure(a), 0.0)
+        i, j = np.nonzero(length > 1e-12)
+        rows.append(do[i]), cols.append(so[j]), vals.append(length[i, j])
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+
+
+def _nearest_1d(src, dst, period):
+    """``(dst index, src index, 1)`` for the nearest source point within reach."""
+    order = np.argsort(src)
+    s = src[order]
+    if period:
+        d = (dst[:, np.newaxis] - s[np.newaxis, :] + period / 2) % period - period / 2
+        rows = np.arange(dst.size)
+    else:
+        e = _edges(s, -np.inf, np.inf)
+        rows = np.flatnonzero((dst >= e[0] - 1e-9) & (dst <= e[-1] + 1e-9))
+        d = dst[rows, np.newaxis] - s[np.newaxis, :]
+    k = np.argmin(np.abs(d), axis=1)
+    return rows, order[k], np.ones(rows.size)
+
+
+@lru_cache(maxsize=32)
+def _cached_weights(src_lats, src_lons, dst_lats, dst_lons, method):
+    src_lats, src_lons, dst_lats, dst_lons = (
+        np.array(a, dtype=np.float64) for a in (src_lats, src_lons, dst_lats, dst_lons))
+    cols_used, period = _period(src_lons)
+    lons_used = src_lons[cols_used]
+
+    if method == 'bilinear':                    # the 180° column, if any, is kept
+        cols_used = np.arange(src_lons.size)
+        lat = _linear_1d(src_lats, dst_lats, None)
+        lon = _linear_1d(src_lons, dst_lons, period)
+    elif method == 'nearest':
+        lat = _nearest_1d(src_lats, dst_lats, None)
+        lon = _nearest_1d(lons_used, dst_lons, period)
+    else:
+        lat = _overlap_1d(src_lats, dst_lats, None, lambda x: np.sin(np.radians(x)))
+        lon = _overlap_1d(lons_used, dst_lons, period, lambda x: x)
+    lon = (lon[0], cols_used[lon[1]], lon[2])
+
+    # Separable: every (lat, lon) pair of 1-D entries is one 2-D entry.
+    rows = lat[0][:, np.newaxis] * dst_lons.size + lon[0][np.newaxis, :]
+    cols = lat[1][:, np.newaxis] * src_lons.size + lon[1][np.newaxis, :]
+    vals = lat[2][:, np.newaxis] * lon[2][np.newaxis, :]
+    keep = vals > 0
+    return _SparseWeights.from_coo(rows[keep], cols[keep], vals[keep],
+                                   (dst_lats.size * dst_lons.size,
+                                    src_lats.size * src_lons.size))
+
+
+def regrid_weights(src_lats, src_lons, dst_lats, dst_lons, method='bilinear'):
+    """
+    Sparse weights from one lat/lon grid to another (cached).
+
+    Parameters
+    ----------
+    src_lats, src_lons, dst_lats, dst_lons : array-like
+        1-D grid axes in degrees, e.g. from :func:`ionex_reader.ionex.get_grid`
+        or a Dataset's coordinates.  Any order (IONEX latitudes descend) and
+        either longitude convention; a regular source axis spanning 360°
+        (with or without the duplicated 180° column) wraps around.
+    method : {'bilinear', 'conservative', 'nearest'}
+        ``'bilinear'`` — separable linear interpolation.
+        ``'conservative'`` — area-weighted mean of the overlapping source
+        cells (preserves the area integral; for coarsening).
+        ``'nearest'`` — nearest source point.
+
+    Returns
+    -------
+    _SparseWeights
+        CSR matrix of shape ``(n_dst_lat·n_dst_lon, n_src_lat·n_src_lon)``;
+        ``.mean(maps)`` regrids ``(…, n_src_lat·n_src_lon)`` maps.
+    """
+    if method not in _METHODS:
+        raise ValueError(f"method must be one of {_METHODS}, got {method!r}.")
+    return _cached_weights(_signature(src_lats), _signature(src_lons),
+                           _signature(dst_lats), _signature(dst_lons), method)
+
+
+def _regrid_values(values, src_lats, src_lons, dst_lats, dst_lons, method='bilinear'):
+    """Regrid ``(…, lat, lon)`` numpy maps; returns ``(…, dst_lat, dst_lon)``."""
+    weights = regrid_weights(src_lats, src_lons, dst_lats, dst_lons, method)
+    return _apply(values, weights, (np.size(dst_lats), np.size(dst_lons)))
+
+
+def _apply(values, weights, shape):
+    lead = values.shape[:-2]
+    out = weights.mean(values.reshape(lead + (-1,)))
+    return out.reshape(lead + shape).astype(values.dtype, copy=False)
+
+
+def regrid(ds, target_lats, target_lons, method='bilinear', variables=None):
+    """
+    Regrid every ``(…, latitude, longitude)`` variable of *ds* onto a new grid.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Output of :func:`read_ionex`, :func:`read_mfionex` (optionally
+        dask-backed, chunked along time only) or an archive read.
+    target_lats, target_lons : array-like
+        Target grid axes in degrees — e.g. another product's
+        ``ds.latitude`` / ``ds.longitude`` or :func:`get_grid` output.
+    method : {'bilinear', 'conservative', 'nearest'}
+        See :func:`regrid_weights`.
+    variables : sequence of str or None
+        Variables to regrid (default: every variable whose last two dims
+        are ``('latitude', 'longitude')``).  Other variables are dropped.
+
+    Returns
+    -------
+    xr.Dataset
+        Same variables and attributes on the target grid.
+
+    Notes
+    -----
+    The weights are built once per (source grid, target grid, method) and
+    cached, so regridding every day of a multi-year archive costs one
+    sparse product per chunk of maps.  NaN source values are left out of
+    each target point's weights; target points outside a regional source
+    grid are NaN.
+    """
+    import xarray as xr
+
+    if variables is None:
+        variables = [name for name, da in ds.data_vars.items()
+                     if da.dims[-2:] == ('latitude', 'longitude')]
+    lats = np.asarray(target_lats, dtype=np.float64)
+    lons = np.asarray(target_lons, dtype=np.float64)
+    weights = regrid_weights(ds['latitude'].values, ds['longitude'].values,
+                             lats, lons, method)
+
+    out = {}
+    for name in variables:
+        da = ds[name]
+        res = xr.apply_ufunc(
+            _apply, da,
+            kwargs={'weights': weights, 'shape': (lats.size, lons.size)},
+            input_core_dims=[['latitude', 'longitude']],
+            output_core_dims=[['latitude', 'longitude']],
+            exclude_dims={'latitude', 'longitude'},
+            dask='parallelized', output_dtypes=[da.dtype],
+            dask_gufunc_kwargs={'output_sizes': {'latitude': lats.size,
+                                                 'longitude': lons.size}},
+        )
+        res.attrs = dict(da.attrs)
+        out[name] = res
+
+    result = xr.Dataset(out, coords={'latitude': lats, 'longitude': lons},
+                        attrs=dict(ds.attrs))
+    for axis in ('latitude', 'longitude'):
+        result[axis].attrs = dict(ds[axis].attrs)
+    return result
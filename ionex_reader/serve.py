@@ -0,0 +1,470 @@
+"""
+serve.py
+========
+Local, offline TEC query service over a directory of IONEX files — standard
+library ``http.server`` only, no web framework.
+
+Start it from the command line::
+
+    ionex-reader serve /archive/ionex --port 8080 --max-concurrency 8
+
+or from Python with :func:`make_server` / :func:`serve`.
+
+Endpoints (all ``GET``; times are ISO-8601 UTC)
+------------------------------------------------
+``/point?lat=22.5,28.6&lon=75.9,77.2&time=2024-01-01T06:30``
+    TEC / RMS at one or more points, bilinear in space and linear in time.
+``/series?lat=22.5&lon=75.9&start=2024-01-01&end=2024-01-03``
+    Point time series (bilinear in space) at every epoch in the window.
+``/bbox?lat_min=0&lat_max=40&lon_min=60&lon_max=100&start=…&end=…``
+    Gridded TEC / RMS sub-cube for a box and time window.
+``/files``
+    The directory index (path, agency, solution, first / last epoch, grid size).
+``/metrics``
+    Request counts, errors, latency percentiles and cache statistics.
+
+Each data query reads one product.  When files of several agencies or
+solution types (or one product on several grids) cover the window, add
+``agency=COD`` and / or ``solution=RAP`` (the analysis-centre code and
+product type of the file name, see
+:func:`ionex_reader.filenames.parse_ionex_filenames`); an ambiguous
+request gets ``400`` listing the candidates.
+
+Add ``format=npz`` to any data endpoint for a binary NumPy ``.npz``
+response (``np.load(io.BytesIO(body))``) instead of JSON.
+
+How a request is served
+-----------------------
+1. The directory is indexed once at start-up (and on ``/reindex``) with
+   :func:`ionex_reader.ionex.scan_header` — header only, no map decoding.
+2. The files covering the requested window are located by binary search on
+   the index and decoded through a :class:`ionex_reader.cache.DatasetCache`.
+3. Point queries are answered by vectorised bilinear interpolation over all
+   points and epochs at once.
+
+At most ``max_concurrency`` requests are processed at a time; requests that
+cannot start within ``queue_timeout`` seconds get ``503``.
+"""
+
+import bisect
+import io
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from ionex_reader.cache import DatasetCache
+from ionex_reader.filenames import _looks_like_ionex, parse_ionex_filenames
+from ionex_reader.ionex import scan_header
+
+
+class QueryError(ValueError):
+    """Bad request parameters — reported to the client as HTTP 400."""
+
+
+# ===========================================================================
+# 1.  INTERPOLATION  (vectorised over points and epochs)
+# ===========================================================================
+
+def _bilinear(cube, lats, lons, qlat, qlon):
+    """
+    Bilinearly interpolate ``cube[..., lat, lon]`` at points ``(qlat, qlon)``.
+
+    Longitudes wrap at ±180°; latitudes may be ascending or descending.
+    Points outside the grid (beyond the last latitude row, or outside a
+    regional grid's longitudes) are NaN rather than edge values.
+    Returns an array of shape ``cube.shape[:-2] + qlat.shape``.
+    """
+    if lats[0] > lats[-1]:
+        lats, cube = lats[::-1], cube[..., ::-1, :]
+
+    i = np.clip(np.searchsorted(lats, qlat) - 1, 0, lats.size - 2)
+    wy = (qlat - lats[i]) / (lats[i + 1] - lats[i])
+    outside = (qlat < lats[0]) | (qlat > lats[-1])
+
+    # Longitude: global grids wrap modulo 360 (the 180° column repeats -180°);
+    # regional grids return NaN outside their span.
+    dlon   = lons[1] - lons[0]
+    wraps  = np.isclose(lons[-1] - lons[0] + dlon, 360.0) or \
+        np.isclose(lons[-1] - lons[0], 360.0)
+    if wraps:
+        n_lon = int(round(360.0 / dlon))
+        x  = np.mod(qlon - lons[0], 360.0) / dlon
+        j  = np.floor(x).astype(int)
+        j0, j1 = np.mod(j, n_lon), np.mod(j + 1, n_lon)
+    else:
+        x  = (qlon - lons[0]) / dlon
+        j  = np.floor(x).astype(int)
+        j0, j1 = np.clip(j, 0, lons.size - 1), np.clip(j + 1, 0, lons.size - 1)
+    wx = x - j
+
+    top = cube[..., i, j0] * (1 - wx) + cube[..., i, j1] * wx
+    bot = cube[..., i + 1, j0] * (1 - wx) + cube[..., i + 1, j1] * wx
+    out = top * (1 - wy) + bot * wy
+    if not wraps:
+        outside = outside | (x < 0) | (x > lons.size - 1)
+    return np.where(outside, np.nan, out)
+
+
+# ===========================================================================
+# 2.  QUERY ENGINE  (no HTTP — usable and testable on its own)
+# ===========================================================================
+
+class TecService:
+    """
+    Directory index + cached decoding + query logic behind the HTTP server.
+
+    Parameters
+    ----------
+    root : str
+        Directory searched recursively for IONEX files.
+    cache : DatasetCache or None
+        Decoded-Dataset cache (default: a private 1 GiB cache).
+    """
+
+    def __init__(self, root, cache=None):
+        self.root  = os.fspath(root)
+        self.cache = cache or DatasetCache(max_bytes=2**30)
+        self._index_lock = threading.Lock()
+        self.reindex()
+
+    # ---------------- index ----------------
+
+    def reindex(self):
+        """Scan the directory headers; returns the number of indexed files."""
+        entries = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if not _looks_like_ionex(name):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    info = scan_header(path)
+                except (OSError, ValueError, ImportError):
+                    continue
+                if info['first_epoch'] is None or info['last_epoch'] is None:
+                    continue
+                lats, lons = info['latitude'], info['longitude']
+                rec    = parse_ionex_filenames(name)
+                agency = str(rec['agency']) or info.get('run_by', '')[:3].upper()
+                grid = (round(float(lats[0]), 6), round(float(lats[-1]), 6), lats.size,
+                        round(float(lons[0]), 6), round(float(lons[-1]), 6), lons.size)
+                entries.append((np.datetime64(info['first_epoch'], 's'),
+                                np.datetime64(info['last_epoch'], 's'),
+                                path, agency, str(rec['solution']), grid))
+        entries.sort()
+        with self._index_lock:
+            self._entries = entries
+            self._firsts  = [e[0] for e in entries]
+        return len(entries)
+
+    def files(self):
+        return [{'path': p, 'agency': a, 'solution': sol, 'first_epoch': str(f),
+                 'last_epoch': str(l), 'n_lat': grid[2], 'n_lon': grid[5]}
+                for f, l, p, a, sol, grid in self._entries]
+
+    def _covering(self, start, end, agency=None, solution=None):
+        """
+        Index entries overlapping ``[start, end]``, all of one product.
+
+        Raises :class:`QueryError` when files of several agencies or
+        solution types, or of one product on several grids, cover the window
+        and *agency* / *solution* do not settle it — their maps cannot be
+        merged into one cube.
+        """
+        with self._index_lock:
+            entries, firsts = self._entries, self._firsts
+        hi = bisect.bisect_right(firsts, end)
+        covering = [e for e in entries[:hi] if e[1] >= start]
+        if agency is not None:
+            covering = [e for e in covering if e[3] == agency.upper()]
+        if solution is not None:
+            covering = [e for e in covering if e[4] == solution.upper()]
+        products = sorted({(e[3], e[4], e[5]) for e in covering})
+        if len(products) > 1:
+            names = ', '.join(f'{a or "?"} {sol or "?"} {g[2]}x{g[5]}'
+                              for a, sol, g in products)
+            hint = ("narrow the time range" if len({p[:2] for p in products}) == 1
+                    else "choose one with 'agency' and / or 'solution'")
+            raise QueryError(f'Several products cover {start} … {end} ({names}); {hint}.')
+        return covering
+
+    def window(self, start, end, agency=None, solution=None):
+        """
+        ``(times, lats, lons, tec, rms)`` for every epoch in ``[start, end]``,
+        time-ordered with duplicated day-boundary epochs removed.  *agency*
+        and *solution* pick the product when several cover the window.
+        """
+        parts = []
+        for _, _, path, *_ in self._covering(start, end, agency, solution):
+            ds = self.cache.get(path)
+            t  = ds['time'].values.astype('datetime64[s]')
+            m  = (t >= start) & (t <= end)
+            if m.any():
+                parts.append((t[m], ds['latitude'].values, ds['longitude'].values,
+                               ds['tec'].values[m], ds['rms'].values[m]))
+        if not parts:
+            raise QueryError(f'No maps between {start} and {end}.')
+
+        lats, lons = parts[0][1], parts[0][2]
+        times = np.concatenate([p[0] for p in parts])
+        _, keep = np.unique(times, return_index=True)
+        return (times[keep], lats, lons,
+                np.concatenate([p[3] for p in parts])[keep],
+                np.concatenate([p[4] for p in parts])[keep])
+
+    # ---------------- queries ----------------
+
+    def point(self, lat, lon, when, agency=None, solution=None):
+        """Values at points *lat*, *lon* (arrays) at a single epoch *when*."""
+        # Bracketing maps: widen the window by one day on each side.
+        day = np.timedelta64(1, 'D')
+        times, lats, lons, tec, rms = self.window(when - day, when + day, agency, solution)
+        if when < times[0] or when > times[-1]:
+            raise QueryError(f'{when} is outside the indexed time range.')
+        k1 = int(np.searchsorted(times, when))          # first epoch >= when
+        if times[k1] == when:
+            k0, w = k1, 0.0
+        else:
+            k0 = k1 - 1
+            w  = (when - times[k0]) / (times[k1] - times[k0])
+        out = {}
+        for name, cube in (('tec', tec), ('rms', rms)):
+            pair = _bilinear(cube[[k0, k1]], lats, lons, lat, lon)
+            out[name] = pair[0] * (1 - w) + pair[1] * w
+        out.update(lat=lat, lon=lon, time=np.array([when]))
+        return out
+
+    def series(self, lat, lon, start, end, agency=None, solution=None):
+        times, lats, lons, tec, rms = self.window(start, end, agency, solution)
+        return {'time': times, 'lat': lat, 'lon': lon,
+                'tec': _bilinear(tec, lats, lons, lat, lon),
+                'rms': _bilinear(rms, lats, lons, lat, lon)}
+
+    def bbox(self, lat_min, lat_max, lon_min, lon_max, start, end, agency=None,
+             solution=None):
+        times, lats, lons, tec, rms = self.window(start, end, agency, solution)
+        li = (lats >= lat_min) & (lats <= lat_max)
+        lj = (lons >= lon_min) & (lons <= lon_max)
+        if not li.any() or not lj.any():
+            raise QueryError('Bounding box contains no grid points.')
+        sub = np.ix_(np.arange(times.size), np.flatnonzero(li), np.flatnonzero(lj))
+        return {'time': times, 'latitude': lats[li], 'longitude': lons[lj],
+                'tec': tec[sub], 'rms': rms[sub]}
+
+
+# ===========================================================================
+# 3.  METRICS
+# ===========================================================================
+
+_ROUTES = frozenset({'/point', '/series', '/bbox', '/files', '/metrics', '/reindex'})
+
+
+class _Metrics:
+    """
+    Per-endpoint request counters and a window of recent latencies.
+
+    Keys are route names only — any unknown path is counted as ``'other'``,
+    so arbitrary request paths cannot grow the tables.
+    """
+
+    def __init__(self, window=1024):
+        self._lock    = threading.Lock()
+        self._count   = defaultdict(int)
+        self._errors  = defaultdict(int)
+        self._latency = defaultdict(lambda: deque(maxlen=window))
+        self.rejected = 0
+
+    def record(self, endpoint, seconds, ok):
+        endpoint = endpoint if endpoint in _ROUTES else 'other'
+        with self._lock:
+            self._count[endpoint] += 1
+            if not ok:
+                self._errors[endpoint] += 1
+            self._latency[endpoint].append(seconds)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self):
+        with self._lock:
+            out = {'rejected': self.rejected, 'endpoints': {}}
+            for ep, n in self._count.items():
+                lat = np.array(self._latency[ep]) * 1e3
+                out['endpoints'][ep] = {
+                    'requests': n, 'errors': self._errors[ep],
+                    'latency_ms_p50': float(np.percentile(lat, 50)),
+                    'latency_ms_p95': float(np.percentile(lat, 95)),
+                    'latency_ms_max': float(lat.max()),
+                }
+            return out
+
+
+# ===========================================================================
+# 4.  HTTP LAYER
+# ===========================================================================
+
+def _parse_time(params, key, default=None):
+    value = params.get(key, [default])[0]
+    if value is None:
+        raise QueryError(f"Missing required parameter '{key}'.")
+    try:
+        return np.datetime64(value, 's')
+    except ValueError:
+        raise QueryError(f"Bad time for '{key}': {value!r}.")
+
+
+def _parse_floats(params, key):
+    if key not in params:
+        raise QueryError(f"Missing required parameter '{key}'.")
+    try:
+        return np.array([float(v) for v in params[key][0].split(',')])
+    except ValueError:
+        raise QueryError(f"Bad number list for '{key}'.")
+
+
+def _jsonable(result):
+    out = {}
+    for key, value in result.items():
+        arr = np.asarray(value)
+        if arr.dtype.kind == 'M':
+            out[key] = [str(t) for t in arr.ravel()]
+        else:
+            out[key] = np.where(np.isfinite(arr), arr, None).tolist() \
+                if arr.dtype.kind == 'f' else arr.tolist()
+    return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'ionex-reader'
+
+    def log_message(self, fmt, *args):           # quiet by default
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, obj):
+        self._send(status, json.dumps(obj).encode(), 'application/json')
+
+    def do_GET(self):                            # noqa: N802 — http.server API
+        url      = urlparse(self.path)
+        endpoint = url.path.rstrip('/') or '/'
+        server   = self.server
+
+        if not server.slots.acquire(timeout=server.queue_timeout):
+            server.metrics.reject()
+            self._send_json(503, {'error': 'server busy'})
+            return
+
+        t0, ok = time.perf_counter(), True
+        try:
+            status, body, ctype = self._dispatch(endpoint, parse_qs(url.query))
+        except QueryError as exc:
+            ok, (status, body, ctype) = False, (400, json.dumps(
+                {'error': str(exc)}).encode(), 'application/json')
+        except Exception as exc:                 # noqa: BLE001 — surfaced as 500
+            ok, (status, body, ctype) = False, (500, json.dumps(
+                {'error': f'{type(exc).__name__}: {exc}'}).encode(), 'application/json')
+        finally:
+            server.slots.release()
+        server.metrics.record(endpoint, time.perf_counter() - t0, ok)
+        self._send(status, body, ctype)
+
+    def _dispatch(self, endpoint, params):
+        svc = self.server.service
+        if endpoint == '/files':
+            return 200, json.dumps(svc.files()).encode(), 'application/json'
+        if endpoint == '/metrics':
+            snap = self.server.metrics.snapshot()
+            snap['cache'] = svc.cache.stats()
+            return 200, json.dumps(snap).encode(), 'application/json'
+        if endpoint == '/reindex':
+            return 200, json.dumps({'files': svc.reindex()}).encode(), 'application/json'
+
+        agency   = params.get('agency', [None])[0]
+        solution = params.get('solution', [None])[0]
+        if endpoint == '/point':
+            lat, lon = _parse_floats(params, 'lat'), _parse_floats(params, 'lon')
+            if lat.shape != lon.shape:
+                raise QueryError("'lat' and 'lon' must have the same length.")
+            result = svc.point(lat, lon, _parse_time(params, 'time'), agency, solution)
+        elif endpoint == '/series':
+            lat, lon = _parse_floats(params, 'lat'), _parse_floats(params, 'lon')
+            if lat.shape != lon.shape:
+                raise QueryError("'lat' and 'lon' must have the same length.")
+            result = svc.series(lat, lon, _parse_time(params, 'start'),
+                                _parse_time(params, 'end'), agency, solution)
+        elif endpoint == '/bbox':
+            box = [float(_parse_floats(params, k)[0])
+                   for k in ('lat_min', 'lat_max', 'lon_min', 'lon_max')]
+            start = _parse_time(params, 'start', params.get('time', [None])[0])
+            end   = _parse_time(params, 'end',   str(start))
+            result = svc.bbox(*box, start, end, agency, solution)
+        else:
+            return 404, json.dumps({'error': f'unknown endpoint {endpoint}'}).encode(), \
+                'application/json'
+
+        if params.get('format', ['json'])[0] == 'npz':
+            buf = io.BytesIO()
+            np.savez(buf, **{k: np.asarray(v) for k, v in result.items()})
+            return 200, buf.getvalue(), 'application/octet-stream'
+        return 200, json.dumps(_jsonable(result)).encode(), 'application/json'
+
+
+def make_server(root, host='127.0.0.1', port=8080, max_concurrency=8,
+                queue_timeout=5.0, cache=None, verbose=False):
+    """
+    Build (but do not start) the threaded HTTP server for *root*.
+
+    Parameters
+    ----------
+    root : str
+        Directory of IONEX files (searched recursively).
+    host, port : str, int
+        Bind address.  ``port=0`` picks a free port (see ``server.server_port``).
+    max_concurrency : int
+        Requests processed simultaneously; others wait up to *queue_timeout*
+        seconds and then get ``503``.
+    cache : DatasetCache or None
+        Shared decoded-Dataset cache.
+    verbose : bool
+        Log every request to stderr.
+
+    Returns
+    -------
+    http.server.ThreadingHTTPServer
+        Call ``serve_forever()`` to run and ``shutdown()`` to stop.
+    """
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service       = TecService(root, cache=cache)
+    server.metrics       = _Metrics()
+    server.slots         = threading.BoundedSemaphore(max_concurrency)
+    server.queue_timeout = queue_timeout
+    server.verbose       = verbose
+    return server
+
+
+def serve(root, host='127.0.0.1', port=8080, **kwargs):
+    """Run the query service until interrupted (see :func:`make_server`)."""
+    server = make_server(root, host=host, port=port, **kwargs)
+    print(f'Serving {len(server.service.files())} IONEX files from {root} '
+          f'on http://{host}:{server.server_port}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
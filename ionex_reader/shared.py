@@ -0,0 +1,280 @@
+"""
+shared.py
+=========
+Publish a decoded TEC/RMS cube once and let other processes attach to it
+as zero-copy, read-only views — one copy in RAM however many workers run.
+
+The cube is written into a single segment, either POSIX shared memory
+(:mod:`multiprocessing.shared_memory`, the default) or a memory-mapped
+file.  :attr:`SharedMaps.descriptor` is a small JSON-serialisable dict
+(segment name, array offsets / shapes / dtypes, metadata) that is handed to
+workers through whatever channel is convenient: an environment variable,
+a pickle, or a file.
+
+Segment layout
+--------------
+::
+
+    [0:8)     int64 reference count (publisher + every live attachment)
+    [64:…)    tec, rms, time (int64 ns), latitude, longitude, height,
+              each 64-byte aligned
+
+The count is updated under an advisory lock file next to the segment.
+:meth:`SharedMaps.close` decrements it, and the last handle to close
+removes the segment.  Handles are also closed when garbage-collected or at
+interpreter exit, so a worker that forgets ``close()`` does not leak
+the segment.
+
+Example
+-------
+>>> # parent
+>>> from ionex_reader.shared import publish_shared
+>>> pub = publish_shared(read_ionex('igsg0010.24i'))
+>>> os.environ['IONEX_SHARED'] = json.dumps(pub.descriptor)
+>>> # each worker
+>>> from ionex_reader.shared import attach_shared
+>>> ds = attach_shared(json.loads(os.environ['IONEX_SHARED'])).to_xarray()
+"""
+
+import mmap
+import os
+import secrets
+import sys
+import tempfile
+import weakref
+
+import numpy as np
+
+from ionex_reader._locks import _exclusive_lock
+from ionex_reader.ionex import IonexMaps
+
+_HEADER_BYTES = 64
+_ALIGN        = 64
+_FIELDS       = ('tec', 'rms', 'time', 'latitude', 'longitude', 'height')
+
+
+def _as_arrays(source):
+    """``({field: array}, metadata)`` from an IonexMaps or a read_ionex Dataset."""
+    if isinstance(source, IonexMaps):
+        arrays = {'tec': source.tec, 'rms': source.rms, 'time': source.epochs,
+                  'latitude': source.lat, 'longitude': source.lon,
+                  'height': source.height}
+        metadata = dict(source.metadata)
+    else:
+        arrays = {name: source[name].values
+                  for name in ('tec', 'rms', 'time', 'latitude', 'longitude')}
+        arrays['height'] = np.asarray(source.attrs.get('height', []), dtype=np.float64)
+        metadata = {k: v for k, v in source.attrs.items() if isinstance(v, str)}
+    arrays['time'] = np.asarray(arrays['time'], dtype='datetime64[ns]').view(np.int64)
+    return {k: np.ascontiguousarray(v) for k, v in arrays.items()}, metadata
+
+
+def _layout(arrays):
+    """Byte offsets of each field; returns ``(table, total_size)``."""
+    table, offset = {}, _HEADER_BYTES
+    for name in _FIELDS:
+        a = arrays[name]
+        table[name] = [offset, list(a.shape), a.dtype.str]
+        offset += -(-a.nbytes // _ALIGN) * _ALIGN
+    return table, max(offset, _HEADER_BYTES + _ALIGN)
+
+
+def _lock_path(descriptor):
+    if descriptor['backend'] == 'memmap':
+        return descriptor['path']
+    return os.path.join(tempfile.gettempdir(), descriptor['name'])
+
+
+def _open_segment(descriptor, create=False):
+    """Return ``(buffer, closer, unlinker)`` for the segment of *descriptor*."""
+    if descriptor['backend'] == 'shm':
+        from multiprocessing import shared_memory
+
+        options = dict(name=descriptor['name'], create=create,
+                       size=descriptor['size'] if create else 0)
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(track=False, **options)
+        else:
+            # The resource tracker would unlink the segment when *any*
+            # process exits (bpo-39959); the reference count decides instead.
+            from multiprocessing import resource_tracker
+            shm = shared_memory.SharedMemory(**options)
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm.buf, shm.close, lambda: _unlink_shm(shm)
+
+    path = descriptor['path']
+    if create:
+        with open(path, 'wb') as f:
+            f.truncate(descriptor['size'])
+    with open(path, 'r+b') as f:
+        mapped = mmap.mmap(f.fileno(), descriptor['size'])
+    return mapped, mapped.close, lambda: os.remove(path)
+
+
+def _unlink_shm(shm):
+    """``shm.unlink()`` without notifying the resource tracker."""
+    from multiprocessing import shared_memory
+    if sys.version_info >= (3, 13):
+        shm.unlink()
+    else:
+        shared_memory._posixshmem.shm_unlink(shm._name)
+
+
+def _refcount(buf):
+    return np.ndarray((), dtype=np.int64, buffer=buf, offset=0)
+
+
+def _release(buf, closer, unlinker, lock):
+    """Drop one reference; the last one removes the segment (and lock file)."""
+    with _exclusive_lock(lock):
+        count = _refcount(buf)
+        count -= 1
+        last = int(count) <= 0
+        del count
+        try:
+            closer()
+        except BufferError:      # caller still holds views — unmapped on GC
+            pass
+        if last:
+            try:
+                unlinker()
+            except FileNotFoundError:
+                pass
+    if last:
+        try:
+            os.remove(f'{lock}.lock')
+        except FileNotFoundError:
+            pass
+
+
+class SharedMaps:
+    """
+    Handle on a published cube (use :func:`publish_shared` /
+    :func:`attach_shared` rather than the constructor).
+
+    Attributes
+    ----------
+    descriptor : dict
+        JSON-serialisable description; pass it to :func:`attach_shared`.
+    maps : IonexMaps
+        Read-only zero-copy views onto the segment.
+    """
+
+    def __init__(self, descriptor, create=False):
+        self.descriptor = descriptor
+        buf, closer, unlinker = _open_segment(descriptor, create=create)
+        lock = _lock_path(descriptor)
+        with _exclusive_lock(lock):
+            count = _refcount(buf)
+            count += 1
+            del count
+
+        views = {}
+        for name, (offset, shape, dtype) in descriptor['arrays'].items():
+            view = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=buf, offset=offset)
+            views[name] = view
+        self._views = views
+        self._buf   = buf
+        self._finalizer = weakref.finalize(self, _release, buf, closer, unlinker, lock)
+
+        if create:
+            return
+        for view in views.values():
+            view.flags.writeable = False
+        self.maps = self._make_maps()
+
+    def _make_maps(self):
+        v = self._views
+        return IonexMaps(v['tec'], v['rms'], v['time'].view('datetime64[ns]'),
+                         v['latitude'], v['longitude'], v['height'],
+                         dict(self.descriptor.get('metadata', {})))
+
+    @property
+    def refcount(self):
+        """Live handles (publisher + attachments) across all processes."""
+        return int(_refcount(self._buf))
+
+    @property
+    def closed(self):
+        return not self._finalizer.alive
+
+    def to_xarray(self):
+        """The cube as an ``xr.Dataset`` whose variables view the segment."""
+        return self.maps.to_xarray()
+
+    def close(self):
+        """Release this handle; the last handle in any process frees the segment."""
+        self.maps = self._views = None
+        self._buf = None
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def publish_shared(source, backend='shm', name=None, directory=None):
+    """
+    Copy a decoded cube into shared memory (or a memory-mapped file).
+
+    Parameters
+    ----------
+    source : xr.Dataset or IonexMaps
+        Output of :func:`read_ionex` (either mode) or
+        :func:`ionex_reader.multifile.read_mfionex`.
+    backend : {'shm', 'memmap'}
+        ``'shm'`` — POSIX shared memory (``/dev/shm`` on Linux).
+        ``'memmap'`` — a file in *directory*, for hosts with a small
+        ``/dev/shm`` or to survive the publisher's exit.
+    name : str or None
+        Segment / file name; random by default.
+    directory : str or None
+        Directory for the ``'memmap'`` file (default: the temp directory).
+
+    Returns
+    -------
+    SharedMaps
+        The publisher's handle (holds one reference until closed).
+    """
+    if backend not in ('shm', 'memmap'):
+        raise ValueError("backend must be 'shm' or 'memmap'.")
+    arrays, metadata = _as_arrays(source)
+    table, size = _layout(arrays)
+    name = name or f'ionex_{secrets.token_hex(6)}'
+    descriptor = {'backend': backend, 'name': name, 'size': size,
+                  'arrays': table, 'metadata': metadata}
+    if backend == 'memmap':
+        descriptor['path'] = os.path.join(directory or tempfile.gettempdir(), name)
+
+    handle = SharedMaps(descriptor, create=True)
+    for field, array in arrays.items():
+        handle._views[field][...] = array
+    for view in handle._views.values():
+        view.flags.writeable = False
+    handle.maps = handle._make_maps()
+    return handle
+
+
+def attach_shared(descriptor):
+    """
+    Attach to a cube published with :func:`publish_shared`.
+
+    Parameters
+    ----------
+    descriptor : dict
+        :attr:`SharedMaps.descriptor` of the publisher.
+
+    Returns
+    -------
+    SharedMaps
+        Read-only views; call :meth:`SharedMaps.close` (or use ``with``)
+        when done.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the segment has already been freed.
+    """
+    return SharedMaps(descriptor)
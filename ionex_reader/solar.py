@@ -0,0 +1,371 @@
+"""
+solar.py
+========
+Solar geometry for ionospheric maps (pure numpy — no extra dependencies).
+
+:func:`subsolar_point` evaluates the Astronomical Almanac low-precision
+solar position model on whole ``datetime64`` arrays, and
+:func:`add_solar_geometry` broadcasts it over a ``(time, lat, lon)`` cube to
+attach the solar zenith angle, local solar time and a daylight mask — lazily,
+chunk by chunk, when the cube is dask-backed.  :func:`to_local_time`
+re-indexes a cube into the sun-fixed frame ``(time, lat, local_time)``.
+
+The day/night terminator — the locus where the solar zenith angle is 90° —
+has a closed form once the subsolar point (δ, λs) is known::
+
+    cos Z = sin φ sin δ + cos φ cos δ cos(λ − λs) = 0
+    ⇒  φ(λ) = arctan(−cos(λ − λs) / tan δ)
+
+so :func:`terminator_curve` evaluates it directly on a longitude grid, for
+many epochs at once, instead of contouring ``cos Z`` over a dense lat/lon
+grid.  Results are memoised per epoch, which makes re-plotting the same
+epoch (animations, dashboards) free.
+
+Example
+-------
+>>> from ionex_reader.solar import add_solar_geometry, terminator_curve
+>>> ds = add_solar_geometry(read_ionex('igsg0010.24i'))
+>>> ds['tec'].where(ds['is_day'] == 1).mean('time')
+>>> lon, lat, night = terminator_curve(ds.time.values)
+>>> lat.shape, night.shape
+((13, 361), (13, 363, 2))
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from ionex_reader.regridding import _period
+
+# Smallest |tan δ| used by the closed form; at the equinoxes the terminator
+# degenerates to two meridians and the curve becomes a near-vertical step.
+_MIN_TAN_DEC = 1e-9
+
+_CACHE_SIZE = 4096
+_cache      = OrderedDict()         # (epoch seconds, n_points) → (lat, night)
+_cache_lock = threading.Lock()
+
+
+def subsolar_point(times):
+    """
+    Subsolar latitude and longitude for an array of UTC epochs.
+
+    Uses the Astronomical Almanac low-precision solar coordinate model
+    (~0.5° accuracy over a few decades around J2000), which is well within
+    the resolution of any global TEC map.  Fully vectorised: one pass of
+    numpy ufuncs over *times*.
+
+    Parameters
+    ----------
+    times : datetime64 array-like (or anything ``np.asarray(…, 'datetime64[ns]')``
+        accepts: datetimes, ISO strings, ``ds.time.values``)
+
+    Returns
+    -------
+    lat_sun, lon_sun : np.ndarray, np.ndarray  (degrees, float64, shape of *times*)
+    """
+    ns = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+    jd = ns / 86400e9 + 2440587.5                 # Julian day of the Unix epoch
+    T  = (jd - 2451545.0) / 36525.0
+    L0 = (280.46646 + 36000.76983 * T) % 360
+    M  = np.radians((357.52911 + 35999.05029 * T - 0.0001537 * T**2) % 360)
+    C  = ((1.914602 - 0.004817 * T - 0.000014 * T**2) * np.sin(M)
+          + (0.019993 - 0.000101 * T) * np.sin(2 * M)
+          + 0.000289 * np.sin(3 * M))
+
+    omega   = np.radians(125.04 - 1934.136 * T)
+    lam     = np.radians(L0 + C - 0.00569 - 0.00478 * np.sin(omega))
+    eps     = np.radians(23.439291 - 0.013004 * T + 0.00256 * np.cos(omega))
+    lat_sun = np.degrees(np.arcsin(np.sin(eps) * np.sin(lam)))
+
+    gmst    = (280.46061837
+               + 360.98564736629 * (jd - 2451545.0)
+               + 0.000387933 * T**2
+               - T**3 / 38710000) % 360
+    ra_sun  = np.degrees(np.arctan2(np.cos(eps) * np.sin(lam), np.cos(lam))) % 360
+    lon_sun = (ra_sun - gmst + 180) % 360 - 180
+
+    return lat_sun, lon_sun
+
+
+def _subsolar_point(dt):
+    """
+    Subsolar latitude and longitude for one UTC datetime.
+
+    Scalar form of :func:`subsolar_point`, kept for the plotting helpers.
+
+    Returns
+    -------
+    lat_sun, lon_sun : float, float  (degrees)
+    """
+    lat_sun, lon_sun = subsolar_point(np.datetime64(dt.replace(tzinfo=None), 'us'))
+    return float(lat_sun), float(lon_sun)
+
+
+def add_solar_geometry(ds, dtype='float32'):
+    """
+    Attach solar zenith angle, local solar time and a daylight mask to *ds*.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Any Dataset with ``time``, ``latitude`` and ``longitude`` coordinates
+        (:func:`read_ionex`, :func:`read_mfionex`, an archive read, …).
+    dtype : str or np.dtype
+        Floating dtype of the new variables (default ``float32``: a year of
+        15-min 2.5° × 5° maps is ~0.9 GB per variable instead of 1.8 GB).
+
+    Returns
+    -------
+    xr.Dataset
+        A copy of *ds* with
+
+        ``sza`` (time, latitude, longitude)
+            Solar zenith angle in degrees.
+        ``local_solar_time`` (time, longitude)
+            Apparent local solar time in hours, 12 at the subsolar meridian
+            (independent of latitude — broadcasts against the maps).
+        ``is_day`` (time, latitude, longitude)
+            1.0 where the sun is above the horizon (``sza < 90``), else 0.0;
+            its time mean is the daylight fraction.
+
+    Notes
+    -----
+    The solar position is computed once per epoch (a 1-D pass); everything
+    per grid point is a broadcast of ``sin φ``/``cos φ`` against it.  If
+    ``ds['tec']`` is dask-backed the new variables are lazy and chunked
+    along time like it, so multi-year cubes are processed chunk by chunk.
+    """
+    import xarray as xr
+
+    dtype   = np.dtype(dtype)
+    times   = ds['time'].values
+    lat_sun, lon_sun = subsolar_point(times)
+
+    chunks = ds['tec'].chunks if 'tec' in ds else None
+    def per_time(values):
+        da = xr.DataArray(values.astype(dtype), dims='time', coords={'time': ds['time']})
+        return da.chunk({'time': chunks[0]}) if chunks else da
+
+    dec  = np.radians(lat_sun)
+    lat  = np.radians(ds['latitude'].astype(dtype))
+    # Hour angle of the sun at each meridian, (time, longitude).
+    hour = np.radians(ds['longitude'].astype(dtype) - per_time(lon_sun))
+
+    cos_sza = (np.sin(lat) * per_time(np.sin(dec))
+               + np.cos(lat) * per_time(np.cos(dec)) * np.cos(hour))
+    cos_sza = cos_sza.clip(-1, 1).transpose('time', 'latitude', 'longitude')
+
+    sza = np.degrees(np.arccos(cos_sza)).astype(dtype)
+    sza.attrs = {'long_name': 'Solar zenith angle', 'units': 'degree'}
+
+    lst = ((np.degrees(hour) / 15 + 12) % 24).astype(dtype)
+    lst = lst.transpose('time', 'longitude')
+    lst.attrs = {'long_name': 'Apparent local solar time', 'units': 'hour'}
+
+    is_day = (cos_sza > 0).astype(dtype)
+    is_day.attrs = {'long_name': 'Sun above the horizon (sza < 90°)', 'units': '1'}
+
+    return ds.assign(sza=sza, local_solar_time=lst, is_day=is_day)
+
+
+def _to_seconds(times):
+    """1-D int64 UTC seconds from datetimes / datetime64 / strings."""
+    if isinstance(times, datetime) or np.ndim(times) == 0:
+        times = [times]
+    return np.asarray(times, dtype='datetime64[s]').astype(np.int64).ravel()
+
+
+def _terminator_rows(lat_sun, lon_sun, lon):
+    """Terminator latitudes ``(n_times, n_lon)`` and closed night polygons."""
+    tan_dec = np.tan(np.radians(lat_sun))[:, np.newaxis]
+    tan_dec = np.where(np.abs(tan_dec) < _MIN_TAN_DEC,
+                       np.copysign(_MIN_TAN_DEC, tan_dec), tan_dec)
+    hour    = np.radians(lon[np.newaxis, :] - lon_sun[:, np.newaxis])
+    lat     = np.degrees(np.arctan(-np.cos(hour) / tan_dec))
+
+    # Night is the polar cap away from the sun: south of the curve when the
+    # sun is north of the equator, north of it otherwise.
+    pole  = np.where(tan_dec[:, 0] > 0, -90.0, 90.0)[:, np.newaxis]
+    n     = lat.shape[0]
+    night = np.empty((n, lon.size + 2, 2))
+    night[:, :lon.size, 0] = lon
+    night[:, :lon.size, 1] = lat
+    night[:, lon.size:, 0] = [lon[-1], lon[0]]
+    night[:, lon.size:, 1] = pole
+    return lat, night
+
+
+def terminator_curve(times, n_points=361):
+    """
+    Day/night terminator polylines and night-side polygons for many epochs.
+
+    Parameters
+    ----------
+    times : datetime, datetime64, str or array-like of them
+        UTC epochs (e.g. ``ds.time.values``).
+    n_points : int
+        Longitude samples from −180° to 180° (default 361 — every 1°).
+
+    Returns
+    -------
+    lon : np.ndarray, shape (n_points,)
+        Longitudes in degrees.
+    lat : np.ndarray, shape (n_times, n_points)
+        Terminator latitude at each longitude.
+    night : np.ndarray, shape (n_times, n_points + 2, 2)
+        Closed ``(lon, lat)`` polygon of the night side: the terminator
+        followed by the two corners on the dark pole.
+
+    Notes
+    -----
+    Rows are memoised by epoch (up to a few thousand), so only epochs not
+    seen before are computed — in one vectorised pass.  The returned arrays
+    are fresh copies.
+    """
+    seconds = _to_seconds(times)
+    lon     = np.linspace(-180.0, 180.0, n_points)
+
+    with _cache_lock:
+        rows = [_cache.get((int(s), n_points)) for s in seconds]
+    missing = sorted({int(s) for s, row in zip(seconds, rows) if row is None})
+    if missing:
+        lat_sun, lon_sun = subsolar_point(np.array(missing, dtype='datetime64[s]'))
+        lat, night = _terminator_rows(lat_sun, lon_sun, lon)
+        fresh = {s: (lat[i], night[i]) for i, s in enumerate(missing)}
+        with _cache_lock:
+            for s, row in fresh.items():
+                _cache[(s, n_points)] = row
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+        rows = [row if row is not None else fresh[int(s)]
+                for s, row in zip(seconds, rows)]
+
+    return (lon,
+            np.array([row[0] for row in rows]).reshape(len(rows), n_points),
+            np.array([row[1] for row in rows]).reshape(len(rows), n_points + 2, 2))
+
+
+def _local_time_tables(times, lons, lt):
+    """
+    Integer shift and weight tables for sampling a map at local solar times.
+
+    Local solar time *L* at epoch *t* is found at longitude
+    ``λs(t) + 15·(L − 12)``; that longitude falls between grid columns
+    ``i0`` and ``i1 = i0 + 1`` with weight ``w`` on ``i1``.  Returns
+    ``(i0, i1, w)``, each ``(n_times, n_lt)``; ``w`` is NaN where a regional
+    grid does not cover the longitude.
+    """
+    _, lon_sun = subsolar_point(times)
+    target = lon_sun[:, np.newaxis] + 15.0 * (np.asarray(lt)[np.newaxis, :] - 12.0)
+    return _meridian_tables(target, lons)
+
+
+def _meridian_tables(target, lons):
+    """``(i0, i1, w)`` linear-interpolation tables for longitudes *target*
+    on the regular grid *lons* (see :func:`_local_time_tables`)."""
+    lon0, dlon = float(lons[0]), float(lons[1] - lons[0])
+    tiling, period = _period(lons)
+    periodic = period is not None
+    n = tiling.size
+
+    pos    = ((target - lon0) % 360) / dlon
+    base   = np.floor(pos)
+    w      = pos - base
+    i0     = base.astype(np.intp)
+    if periodic:
+        i0 %= n
+        i1 = (i0 + 1) % n
+    else:
+        outside = i0 > n - 2
+        w[outside & ~((i0 == n - 1) & (w == 0))] = np.nan
+        i0 = np.minimum(i0, n - 1)
+        i1 = np.minimum(i0 + 1, n - 1)
+    return i0, i1, w
+
+
+def _sample_columns(values, i0, i1, w):
+    """``(1 − w)·values[..., i0] + w·values[..., i1]`` per epoch (one gather each)."""
+    a = np.take_along_axis(values, i0, axis=-1)
+    b = np.take_along_axis(values, i1, axis=-1)
+    return (a + w * (b - a)).astype(values.dtype, copy=False)
+
+
+def to_local_time(ds, lt_bins=24, variables=None, climatology=False):
+    """
+    Re-index a ``(time, latitude, longitude)`` cube onto local solar time.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        Output of :func:`read_ionex`, :func:`read_mfionex` (optionally
+        dask-backed) or an archive read.  Longitudes must be regularly
+        spaced; a global grid (with or without the duplicated 180° column)
+        wraps around.
+    lt_bins : int or array-like
+        Number of local-time bins over 0–24 h (centres at ``(k + 0.5)·24/n``)
+        or explicit local times in hours.  Default 24 (hourly).
+    variables : sequence of str or None
+        Variables with dims ``(time, latitude, longitude)`` to convert
+        (default: all of them, e.g. ``tec`` and ``rms``).
+    climatology : bool
+        Return the time mean instead — a ``(latitude, local_time)``
+        climatology of the whole period.
+
+    Returns
+    -------
+    xr.Dataset
+        Variables on ``(time, latitude, local_time)`` (or ``(latitude,
+        local_time)`` for a climatology); ``local_time`` is in hours.
+
+    Notes
+    -----
+    Each map is sampled, by linear interpolation in longitude, at the
+    meridian where the local solar time equals each bin value.  The column
+    indices and weights for every epoch are precomputed once from the
+    vectorised subsolar longitude, and applied to whole chunks of maps with
+    two gathers — there is no per-map loop.  Dask-backed cubes stay lazy
+    and are processed chunk by chunk along time.
+    """
+    import xarray as xr
+
+    if np.isscalar(lt_bins):
+        lt = (np.arange(int(lt_bins)) + 0.5) * 24.0 / int(lt_bins)
+    else:
+        lt = np.asarray(lt_bins, dtype=np.float64) % 24
+    if variables is None:
+        variables = [name for name, da in ds.data_vars.items()
+                     if da.dims == ('time', 'latitude', 'longitude')]
+
+    lons = ds['longitude'].values
+    tiling, _ = _period(lons)            # 180° duplicates −180°: dropped
+    cols = slice(0, tiling.size)
+    lons = lons[cols]
+
+    i0, i1, w = _local_time_tables(ds['time'].values, lons, lt)
+    coords = {'time': ds['time'], 'local_time': lt}
+    tables = [xr.DataArray(t, dims=('time', 'local_time'), coords=coords)
+              for t in (i0, i1, w)]
+    chunks = ds[variables[0]].chunks if variables else None
+    if chunks:
+        tables = [t.chunk({'time': chunks[0]}) for t in tables]
+
+    out = {}
+    for name in variables:
+        da = ds[name].isel(longitude=cols)
+        res = xr.apply_ufunc(
+            _sample_columns, da, *tables,
+            input_core_dims=[['longitude'], ['local_time'], ['local_time'], ['local_time']],
+            output_core_dims=[['local_time']],
+            dask='parallelized', output_dtypes=[da.dtype],
+        ).transpose('time', 'latitude', 'local_time')
+        res.attrs = dict(da.attrs)
+        out[name] = res
+
+    result = xr.Dataset(out, attrs=dict(ds.attrs))
+    result['local_time'].attrs = {'long_name': 'Local solar time', 'units': 'hour'}
+    if climatology:
+        result = result.mean('time', keep_attrs=True)
+    return result
@@ -0,0 +1,213 @@
+"""
+stream.py
+=========
+Stream IONEX maps one epoch at a time in constant memory.
+
+:func:`iter_maps` reads files line by line through the same transparent
+decompression as :func:`ionex_reader.ionex.scan_header` (gzip / bzip2 / xz
+are inflated incrementally), so memory use depends on the grid size only —
+not on the file size or the number of files.  TEC and RMS maps live in
+separate sections of an IONEX file; each is followed by its own stream, and
+the two advance in lockstep so every step yields the matching pair.
+
+Files are chained in time order (from their headers) and the midnight map
+shared by consecutive daily files is yielded once, from the earlier file.
+
+With ``prefetch=K`` the next K files are read and decompressed by
+background threads while the caller works on the current one (see
+:func:`_prefetch`, also used by :func:`ionex_reader.multifile.read_mfionex`).
+
+Example
+-------
+>>> from ionex_reader.stream import iter_maps
+>>> for epoch, tec, rms in iter_maps(sorted(glob('/archive/2024/*/jplg*.24i.Z'))):
+...     detector.update(epoch, tec, rms)
+"""
+
+import io
+import os
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from ionex_reader.ionex import (
+    _decompress, _open_stream, _parse_values, get_epoch, scan_header,
+)
+
+_VARIABLES = ('tec', 'rms')
+
+
+# ===========================================================================
+# 1.  PREFETCHING
+# ===========================================================================
+
+def _load_bytes(path):
+    """Read and decompress a whole file (runs in a prefetch thread)."""
+    with open(path, 'rb') as f:
+        return _decompress(f.read(), path)
+
+
+def _prefetch(items, load, depth):
+    """
+    Yield ``load(item)`` for each of *items*, in order, computed ahead by
+    *depth* background threads.
+
+    At most *depth* results are in flight or waiting, so a slow consumer
+    holds back the readers (backpressure).  Closing the generator early
+    (``break``, exception, garbage collection) cancels every load that has
+    not started; running loads finish but their results are dropped.
+    Exceptions from *load* are raised when their item is reached.
+    """
+    items = iter(items)
+    pool  = ThreadPoolExecutor(max_workers=depth, thread_name_prefix='ionex-prefetch')
+    window = deque()
+    try:
+        for item in items:
+            window.append(pool.submit(load, item))
+            if len(window) == depth:
+                break
+        while window:
+            result = window.popleft().result()
+            for item in items:             # refill one slot
+                window.append(pool.submit(load, item))
+                break
+            yield result
+    finally:
+        for future in window:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ===========================================================================
+# 2.  STREAMING
+# ===========================================================================
+
+def _iter_blocks(source, kind):
+    """
+    Yield the raw bytes of each ``kind`` map block of *source* (a path, or
+    already decompressed ``bytes``), in file order.
+
+    A block is everything between its ``START OF <kind> MAP`` and
+    ``END OF <kind> MAP`` lines (the same span as
+    :func:`ionex_reader.ionex.index_blocks`).  Only one block is buffered.
+    """
+    start_tag = f'START OF {kind} MAP'.encode()
+    end_tag   = f'END OF {kind} MAP'.encode()
+    stream = io.BytesIO(source) if isinstance(source, bytes) else _open_stream(source)
+    with stream as f:
+        lines = None
+        for line in f:
+            if lines is None:
+                if start_tag in line:
+                    lines = []
+            elif end_tag in line:
+                yield b''.join(lines)
+                lines = None
+            elif start_tag in line:          # truncated block
+                yield b''.join(lines)
+                lines = []
+            else:
+                lines.append(line)
+        if lines:
+            yield b''.join(lines)
+
+
+def iter_maps(paths, variables=_VARIABLES, reuse=False, prefetch=0):
+    """
+    Yield ``(epoch, *maps)`` one epoch at a time across one or more files.
+
+    Parameters
+    ----------
+    paths : str, path-like or iterable of them
+        IONEX file(s), plain or compressed, in any order — files are chained
+        by the first epoch in their headers.
+    variables : sequence of {'tec', 'rms'}
+        Maps to decode, in the order they appear in each yielded tuple.
+    reuse : bool
+        If ``True``, the same output arrays are overwritten at every step
+        (copy a map to keep it).  Default ``False`` — fresh arrays.
+    prefetch : int
+        Read and decompress up to this many upcoming files in background
+        threads while the current one is consumed (default ``0`` — off,
+        files are streamed).  Memory then grows to about *prefetch* + 1
+        decompressed files.
+
+    Yields
+    ------
+    tuple
+        ``(epoch, tec, rms)`` for the default *variables*: a
+        ``datetime64[s]`` epoch and ``(n_lat, n_lon)`` float64 maps in TECU.
+        RMS is all-NaN (with a ``UserWarning``) for files without RMS maps.
+        Use :func:`ionex_reader.ionex.scan_header` for the grid.
+
+    Notes
+    -----
+    Malformed blocks are skipped with a ``UserWarning``, as in
+    :func:`ionex_reader.ionex.read_ionex`.  Epochs not later than the last
+    yielded one (the duplicated midnight of consecutive days) are dropped.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    variables = tuple(variables)
+    unknown = set(variables) - set(_VARIABLES)
+    if not variables or unknown:
+        raise ValueError(f"variables must be a non-empty subset of {_VARIABLES}, "
+                         f"got {variables!r}.")
+
+    headers = {os.fspath(p): scan_header(p) for p in paths}
+    order   = sorted(headers, key=lambda p: headers[p]['first_epoch'] or datetime.min)
+
+    sources = _prefetch(order, _load_bytes, prefetch) if prefetch else iter(order)
+    try:
+        yield from _chain(order, sources, headers, variables, reuse)
+    finally:
+        if prefetch:
+            sources.close()
+
+
+def _chain(order, sources, headers, variables, reuse):
+    """Body of :func:`iter_maps`: walk *sources* (paths or bytes) in *order*."""
+    buffers = {}
+    last    = None
+    for path, source in zip(order, sources):
+        shape = (headers[path]['latitude'].size, headers[path]['longitude'].size)
+        tec_blocks = _iter_blocks(source, 'TEC')
+        rms_blocks = _iter_blocks(source, 'RMS') if 'rms' in variables else None
+        no_rms = None
+        try:
+            for tec_block in tec_blocks:
+                rms_block = next(rms_blocks, None) if rms_blocks is not None else None
+                if rms_blocks is not None and rms_block is None and no_rms is None:
+                    warnings.warn(f"'{path}' contains no RMS maps. "
+                                  "The 'rms' maps will be all-NaN.", UserWarning)
+                    no_rms = np.full(shape, np.nan)
+                try:
+                    epoch = np.datetime64(get_epoch(tec_block), 's')
+                    if last is not None and epoch <= last:
+                        continue
+                    maps = {}
+                    if 'tec' in variables:
+                        maps['tec'] = _parse_values(tec_block, 'TEC', -1)
+                    if 'rms' in variables:
+                        maps['rms'] = (no_rms.copy() if no_rms is not None
+                                       else _parse_values(rms_block, 'RMS', -1))
+                except (ValueError, IndexError) as exc:
+                    warnings.warn(f"Skipping malformed block in '{path}': {exc}", UserWarning)
+                    continue
+
+                last = epoch
+                if reuse:
+                    for name in variables:
+                        out = buffers.get(name)
+                        if out is None or out.shape != maps[name].shape:
+                            out = buffers[name] = np.empty_like(maps[name])
+                        out[...] = maps[name]
+                        maps[name] = out
+                yield (epoch,) + tuple(maps[name] for name in variables)
+        finally:
+            tec_blocks.close()
+            if rms_blocks is not None:
+                rms_blocks.close()
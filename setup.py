@@ -96,6 +96,13 @@ setup(
     extras_require = {
         # pip install ionex_reader[geomag]
         'geomag': ['geomag'],
+        # pip install ionex_reader[compress]   — read unix-compressed .Z files
+        'compress': ['unlzw3'],
+        # pip install ionex_reader[netcdf] / [zarr] — converter / export backends
+        'netcdf': ['netCDF4'],
+        'zarr': ['zarr'],
+        # pip install ionex_reader[dask]  — out-of-core read_mfionex(dask=True)
+        'dask': ['dask[array]'],
         # pip install ionex_reader[dev]
         'dev': [
             'pytest>=7',
@@ -106,6 +113,11 @@ setup(
         ],
     },
 
+    # --- console scripts ---
+    entry_points = {
+        'console_scripts': ['ionex-reader = ionex_reader.cli:main'],
+    },
+
     # --- no non-Python data files needed ---
     include_package_data = False,
 )
@@ -0,0 +1,113 @@
+"""
+Shared fixtures: small synthetic IONEX files written to ``tmp_path``.
+
+The generator follows the IONEX 1.0 layout closely enough for every reader
+path in the package (16 I5 values per data line, ``LAT/LON1/LON2/DLON/H``
+row headers, 24:00 epochs, optional RMS section).
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+
+def _line(content, label):
+    return f'{content:<60}{label}\n'
+
+
+def make_ionex(start=datetime(2024, 1, 1), n_maps=13, interval_s=7200,
+               lat=(87.5, -87.5, -2.5), lon=(-180.0, 180.0, 5.0),
+               with_rms=True, agency='JPL', seed=0):
+    """
+    Return the text of a synthetic IONEX file and the TEC/RMS cubes it encodes.
+
+    Values are integers in units of 0.1 TECU (``EXPONENT -1``).  The last
+    epoch of a 24 h file is written as ``hour == 24`` just like real products.
+    """
+    lat1, lat2, dlat = lat
+    lon1, lon2, dlon = lon
+    lats = np.linspace(lat1, lat2, round(abs(lat2 - lat1) / abs(dlat)) + 1)
+    lons = np.linspace(lon1, lon2, round(abs(lon2 - lon1) / abs(dlon)) + 1)
+
+    rng  = np.random.default_rng(seed)
+    tec  = rng.integers(0, 900, size=(n_maps, lats.size, lons.size))
+    rms  = rng.integers(0, 90,  size=(n_maps, lats.size, lons.size))
+    epochs = [start + timedelta(seconds=interval_s * i) for i in range(n_maps)]
+
+    def epoch_fields(ep):
+        if ep.hour == 0 and ep.minute == 0 and ep != start:
+            prev = ep - timedelta(days=1)
+            return (prev.year, prev.month, prev.day, 24, 0, 0)
+        return (ep.year, ep.month, ep.day, ep.hour, ep.minute, ep.second)
+
+    out = [
+        _line('     1.0            IONOSPHERE MAPS     GPS', 'IONEX VERSION / TYPE'),
+        _line(f'synthgen            {agency:<20}02-JAN-24 00:00', 'PGM / RUN BY / DATE'),
+        _line('  {:4d}{:6d}{:6d}{:6d}{:6d}{:6d}'.format(*epoch_fields(epochs[0])),
+              'EPOCH OF FIRST MAP'),
+        _line('  {:4d}{:6d}{:6d}{:6d}{:6d}{:6d}'.format(*epoch_fields(epochs[-1])),
+              'EPOCH OF LAST MAP'),
+        _line(f'{interval_s:6d}', 'INTERVAL'),
+        _line(f'{n_maps:6d}', '# OF MAPS IN FILE'),
+        _line('     2', 'MAP DIMENSION'),
+        _line('   450.0 450.0   0.0', 'HGT1 / HGT2 / DHGT'),
+        _line(f'  {lat1:6.1f}{lat2:6.1f}{dlat:6.1f}', 'LAT1 / LAT2 / DLAT'),
+        _line(f'  {lon1:6.1f}{lon2:6.1f}{dlon:6.1f}', 'LON1 / LON2 / DLON'),
+        _line('    -1', 'EXPONENT'),
+        _line('', 'END OF HEADER'),
+    ]
+
+    def write_maps(cube, kind):
+        for i, ep in enumerate(epochs):
+            out.append(_line(f'{i + 1:6d}', f'START OF {kind} MAP'))
+            out.append(_line('  {:4d}{:6d}{:6d}{:6d}{:6d}{:6d}'.format(
+                *epoch_fields(ep)), 'EPOCH OF CURRENT MAP'))
+            for j, la in enumerate(lats):
+                out.append(_line(f'  {la:6.1f}{lon1:6.1f}{lon2:6.1f}{dlon:6.1f} 450.0',
+                                 'LAT/LON1/LON2/DLON/H'))
+                row = cube[i, j]
+                for k in range(0, row.size, 16):
+                    out.append(''.join(f'{v:5d}' for v in row[k:k + 16]) + '\n')
+            out.append(_line(f'{i + 1:6d}', f'END OF {kind} MAP'))
+
+    write_maps(tec, 'TEC')
+    if with_rms:
+        write_maps(rms, 'RMS')
+    out.append(_line('', 'END OF FILE'))
+
+    return ''.join(out), {
+        'tec': tec * 0.1, 'rms': rms * 0.1,
+        'lat': lats, 'lon': lons, 'epochs': epochs,
+    }
+
+
+@pytest.fixture
+def ionex_file(tmp_path):
+    """Path to a 13-map, 5° × 2.5° synthetic file plus the expected values."""
+    text, expected = make_ionex()
+    path = tmp_path / 'jplg0010.24i'
+    path.write_text(text)
+    return path, expected
+
+
+@pytest.fixture
+def natural_earth(tmp_path_factory, monkeypatch):
+    """
+    Point cartopy at tiny stand-in Natural Earth shapefiles so map plots
+    render without downloading coastlines.
+    """
+    cartopy   = pytest.importorskip('cartopy')
+    shapefile = pytest.importorskip('shapefile')
+    root = tmp_path_factory.mktemp('natural_earth')
+    for category, name in (('physical', 'coastline'),
+                           ('cultural', 'admin_0_boundary_lines_land')):
+        folder = root / 'shapefiles' / 'natural_earth' / category
+        folder.mkdir(parents=True)
+        with shapefile.Writer(str(folder / f'ne_110m_{name}'),
+                              shapeType=shapefile.POLYLINE) as w:
+            w.field('name', 'C')
+            w.line([[[-10.0, 40.0], [0.0, 50.0], [10.0, 45.0]]])
+            w.record(name)
+    monkeypatch.setitem(cartopy.config, 'pre_existing_data_dir', str(root))
+    return root
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pytest
+
+from ionex_reader import read_ionex
+
+pytest.importorskip('cartopy')
+from ionex_reader.animation import animate_tec, render_maps  # noqa: E402
+
+
+@pytest.fixture
+def ds(ionex_file):
+    return read_ionex(ionex_file[0]).isel(time=slice(0, 4))
+
+
+def test_frames_directory(ds, tmp_path, natural_earth):
+    out = animate_tec(ds, tmp_path / 'frames', dpi=40)
+    names = sorted(os.listdir(out))
+    assert names == [f'frame_{i:05d}.png' for i in range(4)]
+
+
+def test_gif_in_worker_processes(ds, tmp_path, natural_earth):
+    Image = pytest.importorskip('PIL.Image')
+    out = animate_tec(ds, tmp_path / 'day.gif', variable='rms', dpi=40, workers=2)
+    with Image.open(out) as gif:
+        assert gif.n_frames == 4
+        first = np.asarray(gif.convert('RGB'))
+        gif.seek(3)
+        assert not np.array_equal(first, np.asarray(gif.convert('RGB')))
+
+
+def test_rejects_unknown_variable(ds, tmp_path):
+    with pytest.raises(ValueError, match='variable'):
+        animate_tec(ds, tmp_path / 'x.gif', variable='dcb')
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_render_maps_selected_epochs(ds, tmp_path, natural_earth, executor):
+    times = ds['time'].values[[0, 2, 3]]
+    report = render_maps(ds, times, tmp_path / 'png', workers=2, executor=executor, dpi=40)
+    assert report['n_maps'] == 3 and report['maps_per_second'] > 0
+    assert [os.path.basename(p) for p in report['paths']] == [
+        'tec_20240101T0000.png', 'tec_20240101T0400.png', 'tec_20240101T0600.png']
+    assert sorted(os.listdir(tmp_path / 'png')) == sorted(
+        os.path.basename(p) for p in report['paths'])
+
+
+def test_render_maps_leaves_no_pyplot_figures(ds, tmp_path, natural_earth):
+    import matplotlib.pyplot as plt
+    before = plt.get_fignums()
+    render_maps(ds, slice(None), tmp_path, dpi=40)
+    assert plt.get_fignums() == before
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import make_ionex
+from ionex_reader.archive import IonexArchive
+
+pytest.importorskip('zarr')
+pytest.importorskip('xarray')
+
+
+@pytest.fixture
+def days(tmp_path):
+    """Three consecutive daily files, each ending with the 24:00 map."""
+    paths, cubes = [], []
+    for d in range(3):
+        text, exp = make_ionex(start=datetime(2024, 1, 1 + d), seed=d)
+        path = tmp_path / f'jplg{d + 1:03d}0.24i'
+        path.write_text(text)
+        paths.append(path)
+        cubes.append(exp)
+    return paths, cubes
+
+
+def test_append_dedupes_midnight_and_is_idempotent(days, tmp_path):
+    paths, cubes = days
+    arc = IonexArchive(tmp_path / 'jpl.zarr', time_chunk=8)
+    assert [arc.append(p) for p in paths] == [13, 12, 12]
+    assert arc.append(paths[1]) == 0                 # re-ingest → no-op
+    assert len(arc) == 37
+    assert np.all(np.diff(arc.times) == np.timedelta64(2, 'h'))
+
+    # Window read: day 2 file's first map is day 1's 24:00 map (first wins)
+    ds = arc.read('2024-01-02T02:00', '2024-01-02T06:00')
+    assert ds.sizes['time'] == 3
+    np.testing.assert_allclose(ds['tec'].values, cubes[1]['tec'][1:4], atol=1e-9)
+
+    # A fresh handle sees the committed state
+    assert len(IonexArchive(tmp_path / 'jpl.zarr')) == 37
+
+
+def test_grid_mismatch(days, tmp_path):
+    paths, _ = days
+    coarse = tmp_path / 'codg0040.24i'
+    coarse.write_text(make_ionex(start=datetime(2024, 1, 4),
+                                 lon=(-180.0, 180.0, 10.0))[0])
+
+    arc = IonexArchive(tmp_path / 'a.zarr')
+    arc.append(paths[2])
+    with pytest.raises(ValueError, match='does not match'):
+        arc.append(coarse)
+
+    arc = IonexArchive(tmp_path / 'a.zarr', on_grid_mismatch='regrid')
+    assert arc.append(coarse) == 12
+    assert arc.read().sizes['longitude'] == 73
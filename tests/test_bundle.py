@@ -0,0 +1,76 @@
+import gzip
+import io
+import tarfile
+import zipfile
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import make_ionex
+from ionex_reader.bundle import read_ionex_archive
+from ionex_reader.ionex import read_ionex
+
+pytest.importorskip('xarray')
+
+
+class _Pipe(io.RawIOBase):
+    """Non-seekable binary stream, like a socket or HTTP body."""
+
+    def __init__(self, data):
+        self._buf = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        chunk = self._buf.read(len(b))
+        b[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def _payloads():
+    a, exp_a = make_ionex(datetime(2024, 1, 1), seed=1)
+    b, exp_b = make_ionex(datetime(2024, 1, 2), seed=2)
+    return {'jplg0010.24i': a.encode(), 'jplg0020.24i.gz': gzip.compress(b.encode()),
+            'README': b'not ionex'}, (exp_a, exp_b)
+
+
+def _tar_bytes(members, mode='w:gz'):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode=mode) as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(f'2024/{name}')
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def test_in_memory_sources(ionex_file):
+    path, expected = ionex_file
+    data = path.read_bytes()
+    reference = read_ionex(path)
+    chunks = (data[i:i + 4096] for i in range(0, len(data), 4096))
+    for source in (data, memoryview(data), io.BytesIO(gzip.compress(data)), chunks):
+        assert read_ionex(source).identical(reference)
+    with pytest.raises(TypeError, match='binary mode'):
+        read_ionex(io.StringIO(data.decode()))
+
+
+def test_tar_zip_and_streams(tmp_path):
+    members, expected = _payloads()
+    tar_path = tmp_path / 'bundle.tar.gz'
+    tar_path.write_bytes(_tar_bytes(members))
+    zip_path = tmp_path / 'bundle.zip'
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+    ionex_members = [(n, d) for n, d in members.items() if n != 'README']
+    sources = (tar_path, zip_path, _Pipe(tar_path.read_bytes()),
+               io.BytesIO(zip_path.read_bytes()), iter(ionex_members))
+    for source in sources:
+        read = list(read_ionex_archive(source))
+        assert [name.split('/')[-1] for name, _ in read] == ['jplg0010.24i', 'jplg0020.24i.gz']
+        for (_, ds), exp in zip(read, expected):
+            np.testing.assert_allclose(ds['tec'].values, exp['tec'])
@@ -0,0 +1,65 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ionex_reader.cache import DatasetCache
+from ionex_reader.ionex import read_ionex
+
+pytest.importorskip('xarray')
+
+
+def test_hits_misses_and_read_only(ionex_file):
+    path, _ = ionex_file
+    cache = DatasetCache()
+    a = cache.get(path)
+    b = cache.get(path)
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert a is not b and a['tec'].values is b['tec'].values    # shallow copies
+    with pytest.raises(ValueError):
+        a['tec'].values[0, 0, 0] = -1.0
+    cache.get(path, read_metadata=True)                           # distinct key
+    assert len(cache) == 2
+
+
+def test_budget_eviction_and_invalidation(ionex_file, tmp_path):
+    path, _ = ionex_file
+    other = tmp_path / 'copy.24i'
+    other.write_bytes(path.read_bytes())
+
+    one = read_ionex(path).nbytes
+    cache = DatasetCache(max_bytes=int(1.5 * one))
+    cache.get(path)
+    cache.get(other)                            # evicts `path` (LRU)
+    assert path not in cache and other in cache
+    assert cache.stats()['evictions'] == 1
+
+    st = os.stat(other)
+    os.utime(other, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    cache.get(other)                            # mtime changed → new key
+    assert cache.stats()['misses'] == 3
+    assert cache.invalidate(other) == 1 and len(cache) == 0
+
+
+def test_concurrent_misses_share_one_parse(ionex_file):
+    path, _ = ionex_file
+    calls = []
+
+    def slow_loader(p, **kw):
+        calls.append(p)
+        time.sleep(0.2)
+        return read_ionex(p, **kw)
+
+    cache   = DatasetCache(loader=slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(path)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and len(results) == 8
+    assert all(np.shares_memory(r['tec'].values, results[0]['tec'].values)
+               for r in results)
@@ -0,0 +1,68 @@
+import gzip
+import hashlib
+import os
+from datetime import datetime
+
+from ionex_reader.catalog import build_catalog
+
+from conftest import make_ionex
+
+
+def _archive(root):
+    (root / '2024').mkdir()
+    for day in (1, 2, 3):
+        text, _ = make_ionex(datetime(2024, 1, day), agency='JPL')
+        (root / '2024' / f'jplg{day:03d}0.24i').write_text(text)
+    text, _ = make_ionex(datetime(2024, 1, 2), agency='COD', lat=(87.5, -87.5, -5.0),
+                         with_rms=False)
+    with gzip.open(root / '2024' / 'codg0020.24i.gz', 'wt') as f:
+        f.write(text)
+    (root / 'notes.txt').write_text('not ionex')
+
+
+def test_catalog_select(tmp_path):
+    _archive(tmp_path)
+    cat = build_catalog(tmp_path, workers=2)
+    assert len(cat) == 4 and cat.last_update['added'] == 4 and not cat.errors()
+
+    names = lambda paths: [os.path.basename(p) for p in paths]
+    assert names(cat.select(agency='jpl')) == ['jplg0010.24i', 'jplg0020.24i', 'jplg0030.24i']
+    assert names(cat.select(('2024-01-02T06:00', '2024-01-02T12:00'))) == \
+        ['codg0020.24i.gz', 'jplg0020.24i']
+    assert names(cat.select(resolution=(5.0, 5.0))) == ['codg0020.24i.gz']
+    assert names(cat.select(('2024-01-03T01:00', '2024-01-05'), resolution=(2.5, 5))) == \
+        ['jplg0030.24i']
+
+    # Header only: the map count is the header record, RMS presence unknown
+    row = cat._conn.execute(
+        'SELECT n_tec_maps, n_rms_maps, has_rms, has_dcb, sha256 FROM files '
+        'WHERE agency = ?', ('COD',)).fetchone()
+    assert row == (13, None, None, 0, None)
+
+
+def test_catalog_verify(tmp_path):
+    _archive(tmp_path)
+    build_catalog(tmp_path, workers=1).close()
+    cat = build_catalog(tmp_path, workers=1, verify=True)
+    assert cat.last_update['updated'] == 4          # checksum missing → re-read
+
+    path = tmp_path / '2024' / 'codg0020.24i.gz'
+    row = cat._conn.execute(
+        'SELECT n_tec_maps, n_rms_maps, has_rms, has_dcb, sha256 FROM files '
+        'WHERE path = ?', (str(path),)).fetchone()
+    assert row == (13, 0, 0, 0, hashlib.sha256(path.read_bytes()).hexdigest())
+    assert cat._conn.execute(
+        "SELECT n_rms_maps, has_rms FROM files WHERE agency = 'JPL'").fetchone() == (13, 1)
+    assert build_catalog(tmp_path, workers=1, verify=True).last_update['unchanged'] == 4
+
+
+def test_catalog_incremental(tmp_path):
+    _archive(tmp_path)
+    build_catalog(tmp_path, workers=1).close()
+
+    os.remove(tmp_path / '2024' / 'jplg0030.24i')
+    text, _ = make_ionex(datetime(2024, 1, 4), agency='JPL')
+    (tmp_path / '2024' / 'jplg0040.24i').write_text(text)
+    cat = build_catalog(tmp_path, workers=1)
+    assert cat.last_update == {'added': 1, 'updated': 0, 'removed': 1, 'unchanged': 3}
+    assert cat.select(('2024-01-03T12:00', '2024-01-03T13:00')) == []
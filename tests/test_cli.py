@@ -0,0 +1,81 @@
+import gzip
+
+import numpy as np
+import pytest
+
+from conftest import make_ionex
+from ionex_reader import cli
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """A two-day directory tree: one plain file, one gzipped."""
+    src = tmp_path / 'src'
+    (src / '001').mkdir(parents=True)
+    (src / '002').mkdir()
+    text1, exp1 = make_ionex()
+    text2, _    = make_ionex(seed=1)
+    (src / '001' / 'jplg0010.24i').write_text(text1)
+    (src / '002' / 'jplg0020.24i.gz').write_bytes(gzip.compress(text2.encode()))
+    return src, exp1
+
+
+def test_convert_npz_int16_roundtrip(archive, tmp_path, capsys):
+    src, expected = archive
+    out = tmp_path / 'out'
+    status = cli.main(['convert', str(src), '-o', str(out), '-f', 'npz',
+                       '--dtype', 'int16', '-j', '2'])
+    assert status == 0
+    assert (out / '002' / 'jplg0020.24i.npz').exists()
+
+    with np.load(out / '001' / 'jplg0010.24i.npz') as z:
+        assert z['tec'].dtype == np.int16
+        np.testing.assert_allclose(z['tec'] * z['scale_factor'], expected['tec'])
+    assert 'MB/s' in capsys.readouterr().out
+
+
+def test_convert_netcdf(archive, tmp_path):
+    pytest.importorskip('netCDF4')
+    import xarray as xr
+    src, expected = archive
+    out = tmp_path / 'nc'
+    assert cli.main(['convert', str(src / '*' / '*.24i'), '-o', str(out),
+                     '-j', '1']) == 0
+    with xr.open_dataset(out / 'jplg0010.24i.nc') as ds:
+        np.testing.assert_allclose(ds['tec'].values, expected['tec'], atol=1e-4)
+
+
+def test_failures_set_exit_status(archive, tmp_path, capsys):
+    src, _ = archive
+    (src / '001' / 'bad_0010.24i').write_text('not an ionex file\n')
+    status = cli.main(['convert', str(src), '-o', str(tmp_path / 'o'),
+                       '-f', 'npz', '-j', '2'])
+    assert status == 1
+    assert 'FAIL' in capsys.readouterr().err
+
+
+def test_convert_refuses_colliding_outputs(archive, tmp_path, capsys):
+    src, _ = archive
+    text, _ = make_ionex(seed=2)
+    (src / '002' / 'jplg0010.24i').write_text(text)
+    out = tmp_path / 'o'
+    assert cli.main(['convert', str(src / '*' / '*.24i'), '-o', str(out), '-f', 'npz']) == 2
+    assert 'jplg0010.24i.npz' in capsys.readouterr().err
+    assert not out.exists()
+
+    # Directory inputs keep the layout, so the same files convert fine
+    assert cli.main(['convert', str(src), '-o', str(out), '-f', 'npz', '-j', '8']) == 0
+    assert '3 workers' in capsys.readouterr().err
+
+
+def test_convert_missing_inputs_fail(archive, tmp_path, capsys):
+    src, _ = archive
+    out = tmp_path / 'o'
+    assert cli.main(['convert', str(tmp_path / 'nonexistent.24i'), '-o', str(out)]) == 2
+    assert 'error: no such file' in capsys.readouterr().err
+
+    # One good input does not hide a missing one
+    assert cli.main(['convert', str(src), str(src / '*.nothing'), '-o', str(out),
+                     '-f', 'npz']) == 2
+    assert '*.nothing' in capsys.readouterr().err
+    assert not out.exists()
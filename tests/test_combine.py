@@ -0,0 +1,96 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import make_ionex
+from ionex_reader import combine_products, read_ionex, regrid
+
+
+@pytest.fixture
+def products(tmp_path):
+    """Two days of a 2-hourly 2.5° × 5° product and an hourly 2.5° × 10° one."""
+    groups = {'a': [], 'b': []}
+    for day in (1, 2):
+        for name, n_maps, interval, lon in (('a', 13, 7200, (-180.0, 180.0, 5.0)),
+                                            ('b', 25, 3600, (-180.0, 180.0, 10.0))):
+            text, _ = make_ionex(start=datetime(2024, 1, day), n_maps=n_maps,
+                                 interval_s=interval, lon=lon, seed=10 * day + len(name))
+            path = tmp_path / f'{name}g{day:03d}0.24i'
+            path.write_text(text)
+            groups[name].append(path)
+    return groups
+
+
+def test_inverse_rms_combination(products):
+    ds = combine_products(products)
+    assert ds['tec'].dims == ('time', 'latitude', 'longitude')
+    assert ds.sizes == {'time': 49, 'latitude': 71, 'longitude': 73}
+    assert ds['time'].values[-1] == np.datetime64('2024-01-03')
+    # Even hours have both products, odd hours only 'b'
+    np.testing.assert_array_equal(ds['n_products'].values[:4], [2, 1, 2, 1])
+    assert ds.attrs['products'] == 'a, b'
+
+    a = read_ionex(products['a'][0])
+    b = read_ionex(products['b'][0])
+    b_tec = regrid(b, a.latitude, a.longitude)['tec']
+    b_var = regrid((b['rms'] ** 2).to_dataset(), a.latitude, a.longitude)['rms']
+    epoch = a.time.values[3]
+    wa = 1 / np.maximum(a['rms'].sel(time=epoch).values, 0.1) ** 2
+    wb = 1 / np.maximum(b_var.sel(time=epoch).values, 0.01)
+    expected = (wa * a['tec'].sel(time=epoch).values
+                + wb * b_tec.sel(time=epoch).values) / (wa + wb)
+    np.testing.assert_allclose(ds['tec'].sel(time=epoch), expected)
+
+    floored = (a['rms'].sel(time=epoch).values >= 0.1) & (b_var.sel(time=epoch).values >= 0.01)
+    np.testing.assert_allclose(ds['rms'].sel(time=epoch).values[floored],
+                               (1 / np.sqrt(wa + wb))[floored])
+
+    # Odd hours: 'b' alone, regridded
+    odd = b.time.values[1]
+    np.testing.assert_allclose(ds['tec'].sel(time=odd), b_tec.sel(time=odd))
+
+
+def test_options_and_parallel_days(products):
+    serial = combine_products(products, weights='equal')
+    threads = combine_products(products, weights='equal', workers=2, executor='thread')
+    np.testing.assert_allclose(threads['tec'], serial['tec'])
+
+    common = combine_products(products, weights={'a': 1, 'b': 3}, min_products=2)
+    assert (common['n_products'] == 2).all() and common.sizes['time'] == 25
+
+    days = []
+    assert combine_products(products, out=days.append) is None
+    assert [d.sizes['time'] for d in days] == [24, 24, 1]
+
+    with pytest.raises(ValueError, match='weight'):
+        combine_products(products, weights={'a': 1})
+    with pytest.raises(ValueError, match='method'):
+        combine_products(products, method='cubic')
+
+
+def test_combine_into_archive(products, tmp_path):
+    pytest.importorskip('zarr')
+    arc = combine_products(products, out=tmp_path / 'combined.zarr', workers=2)
+    assert len(arc) == 49
+    ds = combine_products(products)
+    np.testing.assert_allclose(arc.read()['tec'], ds['tec'], atol=0.05)
+
+
+def test_same_shape_grids_kept_apart(tmp_path):
+    # One product switching from -180…180 to 0…360 (same 71 × 73 shape) mid-day
+    paths, expected = [], []
+    for hour, lon in ((0, (-180.0, 180.0, 5.0)), (12, (0.0, 360.0, 5.0))):
+        text, _ = make_ionex(start=datetime(2024, 1, 1, hour), n_maps=12,
+                             interval_s=3600, lon=lon, seed=hour)
+        path = tmp_path / f'c{hour:02d}.24i'
+        path.write_text(text)
+        paths.append(path)
+    ds = combine_products({'c': paths})
+    assert ds.sizes['time'] == 24
+
+    first, second = read_ionex(paths[0]), read_ionex(paths[1])
+    np.testing.assert_allclose(ds['tec'].values[:12], first['tec'].values)
+    np.testing.assert_allclose(
+        ds['tec'].values[12:],
+        regrid(second, first.latitude, first.longitude)['tec'].values, atol=1e-12)
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+import pytest
+
+from ionex_reader import read_ionex
+from ionex_reader.export import to_netcdf_optimized, to_zarr_optimized
+
+xr = pytest.importorskip('xarray')
+
+
+@pytest.fixture
+def ds(ionex_file):
+    return read_ionex(ionex_file[0])
+
+
+def test_netcdf_packed_and_chunked_for_maps(ds, tmp_path):
+    pytest.importorskip('netCDF4')
+    path = tmp_path / 'maps.nc'
+    to_netcdf_optimized(ds, path, access='maps', time_major=True)
+
+    with xr.open_dataset(path, mask_and_scale=False) as raw:
+        assert raw['tec'].dtype == np.int16
+        assert raw['tec'].encoding['chunksizes'] == (1, 71, 73)
+    with xr.open_dataset(path) as back:
+        np.testing.assert_allclose(back['tec'].values, ds['tec'].values, atol=1e-6)
+    with xr.open_dataset(path, group='time_major') as tm:
+        assert tm['tec'].dims == ('latitude', 'longitude', 'time')
+        assert tm['tec'].encoding['chunksizes'][-1] == ds.sizes['time']
+
+    plain = tmp_path / 'plain.nc'
+    ds.to_netcdf(plain)
+    assert os.path.getsize(path) < os.path.getsize(plain)
+
+
+def test_zarr_timeseries_layout(ds, tmp_path):
+    pytest.importorskip('zarr')
+    store = tmp_path / 'ts.zarr'
+    to_zarr_optimized(ds, store, access='timeseries', dtype='float32')
+    with xr.open_zarr(store, consolidated=False) as back:
+        assert back['rms'].encoding['chunks'][0] == ds.sizes['time']
+        np.testing.assert_allclose(back['rms'].values, ds['rms'].values, rtol=1e-6)
+
+    # A partial override keeps the access layout for the other dimensions
+    partial = tmp_path / 'partial.zarr'
+    to_zarr_optimized(ds, partial, access='maps', chunks={'time': 4})
+    with xr.open_zarr(partial, consolidated=False) as back:
+        assert back['tec'].encoding['chunks'] == (4, 71, 73)
+
+
+def test_invalid_access(ds, tmp_path):
+    with pytest.raises(ValueError, match='access'):
+        to_netcdf_optimized(ds, tmp_path / 'x.nc', access='diagonal')
@@ -0,0 +1,33 @@
+import numpy as np
+
+from ionex_reader.filenames import filename_time_mask, parse_ionex_filenames
+
+
+def test_legacy_and_long_names():
+    rec = parse_ionex_filenames([
+        '/archive/2024/001/igsg0010.24i',
+        'jplg0610.98i.Z',
+        'IGS0OPSFIN_20240010000_01D_02H_GIM.INX.gz',
+        'cod0opsrap_20240600000_01D_01H_gim.inx',
+        'c1pg0010.24i',
+        'uqrg001b.24i',
+        'readme.txt',
+    ])
+    assert list(rec['agency']) == ['IGS', 'JPL', 'IGS', 'COD', 'C1P', 'UQR', '']
+    assert list(rec['solution']) == ['FIN', 'FIN', 'FIN', 'RAP', 'PRD', 'RAP', '']
+    assert list(rec['convention']) == ['legacy'] * 2 + ['long'] * 2 + ['legacy'] * 2 + ['']
+    assert list(rec['compression']) == ['', 'Z', 'gz', '', '', '', '']
+    np.testing.assert_array_equal(rec['start'], np.array([
+        '2024-01-01', '1998-03-02', '2024-01-01', '2024-02-29', '2024-01-01',
+        '2024-01-01T01:00', 'NaT'], dtype='datetime64[s]'))
+    assert rec['span'][5] == np.timedelta64(1, 'h')
+    assert rec['sampling'][2] == np.timedelta64(2, 'h') and np.isnat(rec['sampling'][0])
+
+
+def test_scalar_and_time_mask():
+    rec = parse_ionex_filenames('igsg3660.24i')
+    assert rec.shape == () and rec['start'] == np.datetime64('2024-12-31')
+
+    rec = parse_ionex_filenames(['jplg0010.24i', 'jplg0020.24i', 'jplg0030.24i', 'x.inx'])
+    np.testing.assert_array_equal(filename_time_mask(rec, '2024-01-02T06:00', '2024-01-02T07:00'),
+                                  [False, True, False, True])
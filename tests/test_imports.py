@@ -0,0 +1,39 @@
+import subprocess
+import sys
+import unittest
+
+HEAVY = ('matplotlib', 'cartopy', 'mpl_toolkits', 'xarray')
+
+
+def _loaded_after(code):
+    """Run *code* in a fresh interpreter and return which HEAVY modules it loaded."""
+    probe = f"{code}\nimport sys\nprint(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, '-c', probe],
+                         capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(',') if m]
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_package_import_is_numpy_only(self):
+        self.assertEqual(_loaded_after('import ionex_reader'), [])
+
+    def test_reader_import_is_numpy_only(self):
+        self.assertEqual(
+            _loaded_after('from ionex_reader import read_ionex, get_grid'), [])
+
+    def test_plotting_resolved_on_access(self):
+        loaded = _loaded_after(
+            'import ionex_reader\n'
+            'assert ionex_reader.plot_tec_map.__module__ == "ionex_reader.plotting"')
+        self.assertIn('matplotlib', loaded)
+        self.assertIn('cartopy', loaded)
+
+    def test_legacy_plotting_import_path(self):
+        from ionex_reader.ionex import plot_time_series
+        from ionex_reader.plotting import plot_time_series as direct
+        self.assertIs(plot_time_series, direct)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from ionex_reader import magnetic, read_ionex
+from ionex_reader.magnetic import (
+    dip_latitude, dip_latitude_grid, load_coefficients, magnetic_coords,
+    magnetic_field, to_magnetic_coords,
+)
+
+POINTS = [(22.5, 75.5), (0.0, 0.0), (60.0, -100.0), (-45.0, 170.0),
+          (89.0, 10.0), (-12.0, -77.0), (35.0, 139.0)]
+
+
+def test_matches_geomag():
+    geomag = pytest.importorskip('geomag.geomag')
+    gm = geomag.GeoMag()
+    lat, lon = np.array(POINTS).T
+    X, Y, Z = (c.ravel() for c in
+               magnetic_field(lat[:, None], lon[:, None], year=2015.0, model='wmm'))
+    dip = np.degrees(np.arctan2(Z, np.hypot(X, Y)))
+    for i, (la, lo) in enumerate(POINTS):
+        ref = gm.GeoMag(la, lo, 0, date(2015, 1, 1))
+        np.testing.assert_allclose([X[i], Y[i], Z[i]], [ref.bx, ref.by, ref.bz], atol=0.5)
+        assert dip[i] == pytest.approx(ref.dip, abs=1e-3)
+
+
+def test_embedded_igrf13():
+    coef = load_coefficients('igrf13')
+    assert (coef['name'], coef['epoch'], coef['g'].shape) == ('IGRF-13', 2020.0, (5, 5))
+    lats = np.array([-80.0, 0.0, 80.0])
+    mlat = dip_latitude(lats, np.array([0.0, 120.0]), model='igrf13')
+    assert mlat.shape == (3, 2)
+    assert (mlat[0] < -40).all() and (mlat[2] > 60).all() and (abs(mlat[1]) < 20).all()
+    # Broadcast points agree with the outer grid
+    np.testing.assert_allclose(dip_latitude(lats[:, None], 120.0, model='igrf13')[:, 0],
+                               mlat[:, 1])
+
+
+def test_igrf13_close_to_wmm():
+    pytest.importorskip('geomag')
+    lats, lons = np.arange(-80, 81, 10.0), np.arange(-180, 180, 30.0)
+    diff = (dip_latitude(lats, lons, model='igrf13')
+            - dip_latitude(lats, lons, year=2020.0, model='wmm'))
+    assert abs(diff).max() < 5 and abs(diff).mean() < 1.5      # degree-4 truncation
+
+
+def test_grid_cached_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv('IONEX_READER_CACHE', str(tmp_path))
+    monkeypatch.setattr(magnetic, '_memo', {})
+    lats, lons, mlat = dip_latitude_grid((10.0, 20.0), model='igrf13')
+    assert mlat.shape == (19, 19) and lats[0] == -90 and lons[-1] == 180
+    assert [p.name for p in tmp_path.iterdir()] == ['dip_IGRF-13_2020_10x20.npy']
+    assert dip_latitude_grid((10.0, 20.0), model='igrf13')[2] is mlat
+
+    # A fresh process (empty memo) reads the file instead of recomputing
+    monkeypatch.setattr(magnetic, '_memo', {})
+    monkeypatch.setattr(magnetic, 'dip_latitude', None)     # must not be called
+    np.testing.assert_array_equal(dip_latitude_grid((10.0, 20.0), model='igrf13')[2], mlat)
+
+
+def test_magnetic_coords_dipole():
+    coef = load_coefficients('igrf13')
+    g10, g11, h11 = coef['g'][1, 0], coef['g'][1, 1], coef['h'][1, 1]
+    pole_lat = 90 - np.degrees(np.arccos(-g10 / np.sqrt(g10**2 + g11**2 + h11**2)))
+    pole_lon = np.degrees(np.arctan2(-h11, -g11))
+    assert magnetic_coords(pole_lat, pole_lon, field='igrf13')[0] == pytest.approx(90)
+    assert magnetic_coords(-90.0, 0.0, field='igrf13')[1] == pytest.approx(0, abs=1e-9)
+    # 'igrf' swaps in the dip latitude
+    mlat, _ = magnetic_coords(22.5, 75.5, model='igrf', field='igrf13')
+    assert mlat == pytest.approx(dip_latitude(22.5, 75.5, model='igrf13'))
+
+
+def test_to_magnetic_coords(ionex_file):
+    ds = read_ionex(ionex_file[0])
+    years = np.full(ds.sizes['time'], 2024)
+    mlat, mlon = magnetic_coords(ds.latitude.values, ds.longitude.values, 2024.5,
+                                 field='igrf13')
+    mlon_sun = magnetic._subsolar_mlon(ds.time.values, years, 'igrf13')
+    mlt = (12 + (mlon[None] - mlon_sun[:, None, None]) / 15) % 24
+
+    def pattern(mlat, mlt):
+        return 10 + 5 * np.cos(2 * np.pi * mlt / 24) + 0.05 * mlat
+
+    ds['tec'] = (('time', 'latitude', 'longitude'), pattern(mlat[None], mlt))
+    ds['rms'][0, :10] = np.nan                      # missing values are skipped
+
+    out = to_magnetic_coords(ds, mlat_bins=36, mlt_bins=12, field='igrf13')
+    assert out['tec'].dims == ('time', 'mlat', 'mlt')
+    assert out['tec'].shape == (ds.sizes['time'], 36, 12)
+    np.testing.assert_allclose(out['mlt'], np.arange(1, 24, 2))
+    np.testing.assert_allclose(out['mlat'], np.arange(-87.5, 90, 5))
+
+    mid = out.sel(mlat=slice(-60, 60))
+    expected = pattern(mid['mlat'].values[:, None], mid['mlt'].values[None])
+    np.testing.assert_allclose(mid['tec'], np.broadcast_to(expected, mid['tec'].shape),
+                               atol=0.2)
+    assert np.isfinite(out['rms'][0].sel(mlat=slice(-60, 60))).all()
+
+    # Weights are built once per (grid, bins, year)
+    hits = magnetic._magnetic_weights.cache_info().hits
+    to_magnetic_coords(ds, mlat_bins=36, mlt_bins=12, field='igrf13')
+    assert magnetic._magnetic_weights.cache_info().hits == hits + 1
+
+    pytest.importorskip('dask')
+    lazy = to_magnetic_coords(ds.chunk({'time': 5}), mlat_bins=36, mlt_bins=12,
+                              field='igrf13')
+    assert lazy['tec'].chunks[0] == (5, 5, 3)
+    np.testing.assert_allclose(lazy['tec'].values, out['tec'].values)
+
+
+def test_igrf_polar_caps_documented_gaps(ionex_file):
+    ds = read_ionex(ionex_file[0])
+    ds['tec'][:] = 10.0
+    dipole = to_magnetic_coords(ds, mlat_bins=36, field='igrf13')['tec']
+    assert np.isfinite(dipole).all()
+
+    # Dip latitude with dipole MLT: the caps only reach part of the MLT circle
+    igrf = to_magnetic_coords(ds, mlat_bins=36, model='igrf', field='igrf13')['tec']
+    assert np.isfinite(igrf.sel(mlat=slice(-57.5, 82.5))).all()
+    assert np.isnan(igrf.sel(mlat=-87.5)).any() and np.isnan(igrf.sel(mlat=87.5)).any()
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import make_ionex
+from ionex_reader.multifile import read_mfionex
+
+pytest.importorskip('xarray')
+
+
+@pytest.fixture
+def days(tmp_path):
+    paths, tec = [], []
+    for d in range(3):
+        text, exp = make_ionex(start=datetime(2024, 1, 1 + d), seed=d,
+                               with_rms=(d != 1))
+        path = tmp_path / f'jplg{d + 1:03d}0.24i'
+        path.write_text(text)
+        paths.append(str(path))
+        tec.append(exp['tec'] if d == 0 else exp['tec'][1:])
+    return paths[::-1], np.concatenate(tec)    # unsorted on purpose
+
+
+def test_eager_concatenates_and_drops_midnight(days):
+    paths, tec = days
+    with pytest.warns(UserWarning, match='no RMS'):
+        ds = read_mfionex(paths)
+    assert ds.sizes['time'] == 37
+    np.testing.assert_allclose(ds['tec'].values, tec)
+
+
+@pytest.mark.parametrize('maps_per_chunk', [None, 5])
+def test_dask_threaded(days, maps_per_chunk):
+    dask = pytest.importorskip('dask')
+    paths, tec = days
+    ds = read_mfionex(paths, dask=True, maps_per_chunk=maps_per_chunk)
+    assert ds['tec'].chunks is not None
+    with dask.config.set(scheduler='threads'):
+        np.testing.assert_allclose(ds['tec'].values, tec)
+        hourly = ds['tec'].groupby('time.hour').mean().compute()
+    assert hourly.sizes['hour'] == 12
+    assert np.isnan(ds['rms'].isel(time=20)).all()
+
+
+def test_dask_malformed_block_keeps_epochs(days):
+    pytest.importorskip('dask')
+    paths, tec = days
+    path = paths[-1]                               # 2024-01-01
+    with open(path) as f:
+        lines = f.read().split('\n')
+    start = [i for i, line in enumerate(lines) if 'START OF TEC MAP' in line][3]
+    lines[start + 3] += '    1'                     # ragged first row of map 3
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+
+    ds = read_mfionex(paths, dask=True)
+    with pytest.warns(UserWarning, match='malformed'):
+        values = ds['tec'].values
+    assert np.isnan(values[3]).all()
+    np.testing.assert_allclose(np.delete(values, 3, axis=0), np.delete(tec, 3, axis=0))
+
+
+def test_dask_distributed(days):
+    distributed = pytest.importorskip('distributed')
+    paths, tec = days
+    ds = read_mfionex(paths, dask=True)
+    with distributed.LocalCluster(n_workers=2, threads_per_worker=1,
+                                  processes=False, dashboard_address=None) as cluster, \
+            distributed.Client(cluster):
+        regional = ds['tec'].sel(latitude=slice(30, 0)).mean(('latitude', 'longitude'))
+        np.testing.assert_allclose(regional.compute().values,
+                                   tec[:, 23:36].mean(axis=(1, 2)))
+
+
+def test_time_range_prefilters_by_name(days, tmp_path):
+    paths, tec = days
+    decoy = tmp_path / 'jplg0400.24i'           # never opened: outside the range
+    decoy.write_text('not an ionex file')
+    with pytest.warns(UserWarning, match='no RMS'):
+        ds = read_mfionex(paths + [str(decoy)],
+                          time_range=('2024-01-03', '2024-01-03T12:00'))
+    assert ds.sizes['time'] == 7
+    np.testing.assert_allclose(ds['tec'].values, tec[24:31])
+
+
+def test_prefetch_matches_eager(days):
+    paths, tec = days
+    with pytest.warns(UserWarning, match=r"jplg0020\.24i' contains no RMS"):
+        ds = read_mfionex(paths, prefetch=2)
+    np.testing.assert_allclose(ds['tec'].values, tec)
+    with pytest.raises(ValueError, match='prefetch'):
+        read_mfionex(paths, dask=True, prefetch=2)
@@ -0,0 +1,80 @@
+import gzip
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from ionex_reader.ionex import (
+    IonexMaps, get_epoch, index_blocks, parse_map, parse_rms_map, read_ionex,
+)
+
+
+def test_str_and_bytes_parse_identically(ionex_file):
+    path, expected = ionex_file
+    text, data = path.read_text(), path.read_bytes()
+    assert index_blocks(text, 'TEC') == index_blocks(data, 'TEC')
+
+    (s, e), (rs, re_) = index_blocks(data, 'TEC')[3], index_blocks(data, 'RMS')[3]
+    np.testing.assert_allclose(parse_map(data[s:e]), expected['tec'][3])
+    np.testing.assert_allclose(parse_map(text[s:e]), expected['tec'][3])
+    np.testing.assert_allclose(parse_rms_map(data[rs:re_]), expected['rms'][3])
+    assert get_epoch(data[s:e]) == get_epoch(text[s:e]) == expected['epochs'][3]
+
+
+def test_ragged_rows_raise(ionex_file):
+    path, _ = ionex_file
+    data = path.read_bytes()
+    s, e = index_blocks(data, 'TEC')[0]
+    block = data[s:e]
+    cut = block.index(b'\n', block.index(b'LAT/LON1/LON2/DLON/H') + 21)
+    with pytest.raises(ValueError, match='inconsistent lengths'):
+        parse_map(block[:cut] + b'    1' + block[cut:])
+
+
+def test_mmap_and_compressed_reads_agree(ionex_file, tmp_path):
+    path, expected = ionex_file
+    packed = tmp_path / (path.name + '.gz')
+    packed.write_bytes(gzip.compress(path.read_bytes()))
+    pytest.importorskip('xarray')
+    a, b = read_ionex(path), read_ionex(packed)
+    assert a.identical(b)
+    np.testing.assert_allclose(a['tec'].values, expected['tec'])
+
+
+def test_crlf_line_endings(ionex_file, tmp_path):
+    path, expected = ionex_file
+    crlf = tmp_path / path.name
+    crlf.write_bytes(path.read_bytes().replace(b'\n', b'\r\n'))
+    maps = read_ionex(crlf, as_='numpy')
+    np.testing.assert_allclose(maps.tec, expected['tec'])
+    np.testing.assert_allclose(maps.rms, expected['rms'])
+    np.testing.assert_array_equal(maps.epochs, np.array(expected['epochs'], 'datetime64[ns]'))
+
+
+def test_numpy_result_and_zero_copy_xarray(ionex_file):
+    path, expected = ionex_file
+    maps = read_ionex(path, read_metadata=True, as_='numpy')
+    assert isinstance(maps, IonexMaps) and len(maps) == 13
+    assert maps.epochs.dtype == np.dtype('datetime64[ns]')
+    assert maps.metadata['run_by'] == 'JPL' and maps.height.tolist() == [450.0]
+    np.testing.assert_allclose(maps.tec, expected['tec'])
+    with pytest.raises(AttributeError):
+        maps.extra = 1                                   # slotted
+
+    pytest.importorskip('xarray')
+    ds = maps.to_xarray()
+    assert np.shares_memory(ds['tec'].values, maps.tec)
+    assert ds.identical(read_ionex(path, read_metadata=True))
+    with pytest.raises(ValueError, match='as_'):
+        read_ionex(path, as_='pandas')
+
+
+def test_numpy_mode_does_not_import_xarray(ionex_file):
+    path, _ = ionex_file
+    code = ('import sys\nfrom ionex_reader import read_ionex\n'
+            f'read_ionex({str(path)!r}, as_="numpy")\n'
+            'print("xarray" in sys.modules)')
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         check=True)
+    assert out.stdout.strip() == 'False'
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from ionex_reader import read_ionex
+
+pytest.importorskip('cartopy')
+from ionex_reader.plotting import MapCanvas, plot_rms_map, plot_tec_map  # noqa: E402
+
+
+@pytest.fixture
+def ds(ionex_file):
+    return read_ionex(ionex_file[0])
+
+
+def test_cached_canvas_per_key():
+    a = MapCanvas.cached((-182.5, 182.5, -90, 90), figsize=(6, 3))
+    assert MapCanvas.cached((-182.5, 182.5, -90, 90), figsize=(6, 3)) is a
+    assert MapCanvas.cached((-182.5, 182.5, -90, 90), figsize=(8, 3)) is not a
+
+
+def test_plots_reuse_canvas(ds, natural_earth):
+    import matplotlib.pyplot as plt
+    canvas = MapCanvas(figsize=(6, 3), dpi=50)
+    n_artists = len(canvas.ax.get_children())
+
+    fig, ax = plot_tec_map(ds['tec'].isel(time=1), add_terminator=True, canvas=canvas)
+    assert fig is canvas.fig and ax is canvas.ax
+    np.testing.assert_array_equal(canvas.image.get_array(), ds['tec'].values[1])
+    assert canvas.image.get_clim() == (0, 100)
+    assert '2024-01-01T02:00' in canvas.title.get_text()
+    fig.canvas.draw()
+
+    plot_rms_map(ds['rms'].isel(time=2), add_terminator=True, canvas=canvas)
+    assert canvas.image.get_clim() == (0, 10)
+    assert canvas.image.get_cmap().name == 'plasma'
+    # the previous terminator was replaced, not stacked
+    assert len(canvas.ax.get_children()) == n_artists + 2
+
+    plot_tec_map(ds['tec'].values[0], canvas=canvas)
+    assert len(canvas.ax.get_children()) == n_artists
+    assert plt.get_fignums() == []
+
+
+def test_plot_without_canvas_uses_pyplot(ds, natural_earth):
+    import matplotlib.pyplot as plt
+    fig, ax = plot_tec_map(ds['tec'].isel(time=0), add_terminator=True,
+                           terminator_dt=datetime(2024, 1, 1, 12))
+    try:
+        assert fig.number in plt.get_fignums()
+        fig.canvas.draw()
+    finally:
+        plt.close(fig)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from conftest import make_ionex
+from ionex_reader import read_ionex, regrid
+from ionex_reader.regridding import _SparseWeights, _cached_weights, regrid_weights
+
+
+def test_sparse_weights():
+    W = _SparseWeights.from_coo([0, 0, 2, 0], [1, 3, 0, 1], [1.0, 2.0, 4.0, 1.0], (3, 4))
+    dense = np.array([[0, 2, 0, 2], [0, 0, 0, 0], [4, 0, 0, 0]], dtype=float)
+    x = np.arange(8.0).reshape(2, 4)
+    np.testing.assert_allclose(W.dot(x), x @ dense.T)
+    x[0, 3] = np.nan
+    mean = W.mean(x)
+    np.testing.assert_allclose(mean[:, [0, 2]], [[1, 0], [6, 4]])
+    assert np.isnan(mean[:, 1]).all()
+
+    # scipy, when installed, only accelerates the product
+    W._scipy = False
+    np.testing.assert_allclose(W.mean(x)[:, [0, 2]], [[1, 0], [6, 4]])
+
+
+def _smooth(lat, lon):
+    return 20 + 10 * np.cos(np.radians(lat)) * np.sin(np.radians(lon))
+
+
+def test_bilinear_matches_interp(ionex_file):
+    ds = read_ionex(ionex_file[0])
+    lats, lons = np.arange(-87.5, 88, 1.0), np.arange(-180, 181, 1.0)
+    out = regrid(ds, lats, lons)
+    assert out['tec'].shape == (13, lats.size, lons.size)
+    np.testing.assert_array_equal(out['latitude'], lats)
+    np.testing.assert_allclose(out['tec'], ds['tec'].interp(latitude=lats, longitude=lons),
+                               atol=1e-9)
+
+
+def test_longitude_wrap():
+    src_lat, src_lon = np.array([10.0, 0.0]), np.arange(-180, 180, 5.0)     # no 180° column
+    values = _smooth(src_lat[:, None], src_lon[None])[None]
+    W = regrid_weights(src_lat, src_lon, [0.0], [177.5, 182.5, 357.5, -2.5])
+    out = W.mean(values.reshape(1, -1))[0]
+    assert out[0] == pytest.approx((values[0, 1, -1] + values[0, 1, 0]) / 2)   # 175° | −180°
+    assert out[1] == pytest.approx((values[0, 1, 0] + values[0, 1, 1]) / 2)  # −177.5°
+    assert out[2] == pytest.approx(out[3])
+
+
+def test_conservative_preserves_area_mean(ionex_file):
+    ds = read_ionex(ionex_file[0])
+    lats, lons = np.arange(-85, 90, 10.0), np.arange(-175, 180, 10.0)
+    out = regrid(ds, lats, lons, method='conservative')
+
+    def area_mean(values, lat):
+        w = np.cos(np.radians(lat))[:, None] * np.ones(values.shape[-1])
+        return (values * w).sum(axis=(-2, -1)) / w.sum()
+
+    src = ds['tec'].values[:, :, :-1]                   # drop the duplicated 180°
+    np.testing.assert_allclose(area_mean(out['tec'].values, lats),
+                               area_mean(src, ds['latitude'].values), rtol=2e-3)
+
+
+def test_regional_and_nearest():
+    text, expected = make_ionex(lat=(60.0, 30.0, -2.5), lon=(-20.0, 40.0, 5.0))
+    src_lat, src_lon = expected['lat'], expected['lon']
+    lats, lons = np.array([50.0, 0.0]), np.array([0.0, 2.0, 100.0])
+    W = regrid_weights(src_lat, src_lon, lats, lons, method='nearest')
+    out = W.mean(expected['tec'].reshape(expected['tec'].shape[0], -1)).reshape(-1, 2, 3)
+    assert np.isnan(out[:, 1]).all() and np.isnan(out[:, 0, 2]).all()
+    j, k = np.flatnonzero(src_lat == 50)[0], np.flatnonzero(src_lon == 0)[0]
+    np.testing.assert_array_equal(out[:, 0, 0], expected['tec'][:, j, k])
+    np.testing.assert_array_equal(out[:, 0, 1], expected['tec'][:, j, k])
+
+
+def test_weights_cached_and_dask(ionex_file):
+    ds = read_ionex(ionex_file[0])
+    lats, lons = np.arange(-80, 81, 20.0), np.arange(0, 360, 30.0)
+    first = regrid(ds, lats, lons, method='conservative')
+    hits = _cached_weights.cache_info().hits
+    ds['tec'][0, 0, 0] = np.nan                          # NaN is left out of the mean
+    again = regrid(ds, lats.tolist(), lons + 1e-9, method='conservative')
+    assert _cached_weights.cache_info().hits == hits + 1
+    assert np.isfinite(again['tec']).all()
+    np.testing.assert_allclose(again['rms'], first['rms'])
+
+    with pytest.raises(ValueError, match='method'):
+        regrid(ds, lats, lons, method='cubic')
+
+    pytest.importorskip('dask')
+    lazy = regrid(ds.chunk({'time': 5}), lats, lons, method='conservative')
+    assert lazy['tec'].chunks[0] == (5, 5, 3)
+    np.testing.assert_allclose(lazy['tec'].values, again['tec'].values)
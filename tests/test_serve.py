@@ -0,0 +1,131 @@
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import make_ionex
+from ionex_reader.serve import QueryError, TecService, make_server
+
+pytest.importorskip('xarray')
+
+
+@pytest.fixture
+def root(tmp_path):
+    expected = []
+    for d in range(2):
+        text, exp = make_ionex(start=datetime(2024, 1, 1 + d), seed=d)
+        (tmp_path / f'jplg{d + 1:03d}0.24i').write_text(text)
+        expected.append(exp)
+    return tmp_path, expected
+
+
+def test_point_series_bbox(root):
+    path, (day1, day2) = root
+    svc = TecService(path)
+    assert len(svc.files()) == 2
+
+    # On a grid node at an epoch → exact value; half-way in time → mean.
+    lat, lon = np.array([20.0]), np.array([75.0])
+    i, j = 27, 51
+    at = svc.point(lat, lon, np.datetime64('2024-01-01T02:00'))
+    assert at['tec'][0] == pytest.approx(day1['tec'][1, i, j])
+    mid = svc.point(lat, lon, np.datetime64('2024-01-01T03:00'))
+    assert mid['tec'][0] == pytest.approx(day1['tec'][1:3, i, j].mean())
+
+    # Longitude wrap: -180 and 180 are the same meridian.
+    wrap = svc.point(np.array([0.0, 0.0]), np.array([-180.0, 180.0]),
+                     np.datetime64('2024-01-01T00:00'))
+    assert wrap['tec'][0] == pytest.approx(wrap['tec'][1])
+
+    series = svc.series(lat, lon, np.datetime64('2024-01-01T20:00'),
+                        np.datetime64('2024-01-02T04:00'))
+    assert series['time'].size == 5                      # midnight not doubled
+    np.testing.assert_allclose(series['tec'][3:, 0], day2['tec'][1:3, i, j])
+
+    box = svc.bbox(0, 10, 0, 20, np.datetime64('2024-01-02T02:00'),
+                   np.datetime64('2024-01-02T02:00'))
+    assert box['tec'].shape == (1, 5, 5)
+
+    with pytest.raises(QueryError):
+        svc.point(lat, lon, np.datetime64('2030-01-01'))
+
+    # Beyond the last latitude row → NaN, not the edge value
+    polar = svc.point(np.array([89.9, -88.0]), np.array([0.0, 0.0]),
+                      np.datetime64('2024-01-01T02:00'))
+    assert np.isnan(polar['tec']).all()
+
+
+def test_mixed_products_need_agency(root):
+    path, (day1, _) = root
+    text, other = make_ionex(start=datetime(2024, 1, 1), agency='CODE', seed=7)
+    (path / 'codg0010.24i').write_text(text)
+    svc = TecService(path)
+    assert sorted(f['agency'] for f in svc.files()) == ['COD', 'JPL', 'JPL']
+
+    when, lat, lon = np.datetime64('2024-01-01T02:00'), np.array([20.0]), np.array([75.0])
+    with pytest.raises(QueryError, match='agency'):
+        svc.point(lat, lon, when)
+    assert svc.point(lat, lon, when, agency='cod')['tec'][0] == \
+        pytest.approx(other['tec'][1, 27, 51])
+    assert svc.point(lat, lon, when, agency='JPL')['tec'][0] == \
+        pytest.approx(day1['tec'][1, 27, 51])
+
+
+def test_solution_types_kept_apart(tmp_path):
+    expected = {}
+    for seed, sol in enumerate(('FIN', 'RAP')):
+        text, expected[sol] = make_ionex(start=datetime(2024, 1, 1), agency='CODE',
+                                         seed=seed)
+        (tmp_path / f'COD0OPS{sol}_20240010000_01D_02H_GIM.INX').write_text(text)
+    svc = TecService(tmp_path)
+    assert sorted(f['solution'] for f in svc.files()) == ['FIN', 'RAP']
+
+    when, lat, lon = np.datetime64('2024-01-01T02:00'), np.array([20.0]), np.array([75.0])
+    with pytest.raises(QueryError, match='solution'):
+        svc.point(lat, lon, when, agency='COD')
+    for sol in ('FIN', 'rap'):
+        got = svc.series(lat, lon, when, when, agency='COD', solution=sol)['tec'][0, 0]
+        assert got == pytest.approx(expected[sol.upper()]['tec'][1, 27, 51])
+
+
+def test_http_json_npz_and_metrics(root):
+    path, (day1, _) = root
+    server = make_server(path, port=0, max_concurrency=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    try:
+        with urllib.request.urlopen(
+                f'{base}/point?lat=20,25&lon=75,75&time=2024-01-01T02:00') as r:
+            body = json.load(r)
+        assert body['tec'][0] == pytest.approx(day1['tec'][1, 27, 51])
+
+        with urllib.request.urlopen(
+                f'{base}/series?lat=20&lon=75&start=2024-01-01&end=2024-01-01T23:00'
+                '&format=npz') as r:
+            npz = np.load(io.BytesIO(r.read()))
+        assert npz['tec'].shape == (12, 1)
+
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(f'{base}/point?lat=20')
+        assert err.value.code == 400
+
+        for junk in ('/a', '/b/c'):
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(base + junk)
+
+        with urllib.request.urlopen(f'{base}/metrics') as r:
+            metrics = json.load(r)
+        assert metrics['endpoints']['/point']['requests'] == 2
+        assert metrics['endpoints']['/point']['errors'] == 1
+        assert set(metrics['endpoints']) == {'/point', '/series', 'other'}
+        assert metrics['endpoints']['other']['requests'] == 2
+        assert metrics['cache']['hits'] >= 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,53 @@
+import json
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from ionex_reader.ionex import read_ionex
+from ionex_reader.shared import attach_shared, publish_shared
+
+
+def _worker(descriptor, queue):
+    with attach_shared(descriptor) as handle:
+        queue.put((float(np.nansum(handle.maps.tec)), handle.maps.tec.flags.writeable))
+
+
+@pytest.mark.parametrize('backend', ['shm', 'memmap'])
+def test_publish_attach_and_cleanup(ionex_file, tmp_path, backend):
+    path, expected = ionex_file
+    maps = read_ionex(path, as_='numpy', read_metadata=True)
+    pub  = publish_shared(maps, backend=backend, directory=tmp_path)
+    descriptor = json.loads(json.dumps(pub.descriptor))        # travels as JSON
+
+    ctx   = mp.get_context('spawn')
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(descriptor, queue)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+    assert [queue.get(timeout=5) for _ in procs] == [(float(maps.tec.sum()), False)] * 2
+    assert pub.refcount == 1
+
+    view = attach_shared(descriptor)
+    assert pub.refcount == 2 and view.maps.metadata['run_by'] == 'JPL'
+    np.testing.assert_array_equal(view.maps.epochs, maps.epochs)
+    np.testing.assert_allclose(view.maps.tec, expected['tec'])
+    with pytest.raises(ValueError):
+        view.maps.tec[0, 0, 0] = 0.0
+    view.close()
+    pub.close()
+    with pytest.raises(FileNotFoundError):
+        attach_shared(descriptor)
+
+
+def test_dataset_source_round_trip(ionex_file):
+    pytest.importorskip('xarray')
+    path, _ = ionex_file
+    ds = read_ionex(path)
+    with publish_shared(ds) as pub, attach_shared(pub.descriptor) as view:
+        shared = view.to_xarray()
+        np.testing.assert_array_equal(shared['tec'].values, ds['tec'].values)
+        np.testing.assert_array_equal(shared['time'].values, ds['time'].values)
+        del shared
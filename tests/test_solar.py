@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from ionex_reader import read_ionex, solar
+from ionex_reader.solar import (
+    _subsolar_point, add_solar_geometry, subsolar_point, terminator_curve,
+    to_local_time,
+)
+
+
+def test_terminator_is_where_sun_is_on_horizon():
+    times = np.array(['2024-01-01T00:00', '2024-06-21T12:00', '2024-03-20T03:06'],
+                     dtype='datetime64[s]')
+    lon, lat, night = terminator_curve(times, n_points=73)
+    assert lon.shape == (73,) and lat.shape == (3, 73) and night.shape == (3, 75, 2)
+
+    for i, t in enumerate(times.astype(datetime)):
+        dec, lon_sun = np.radians(_subsolar_point(t))
+        phi = np.radians(lat[i])
+        cos_sza = (np.sin(phi) * np.sin(dec)
+                   + np.cos(phi) * np.cos(dec) * np.cos(np.radians(lon) - lon_sun))
+        np.testing.assert_allclose(cos_sza, 0, atol=1e-6)
+
+    # January: the dark pole is the north pole; June: the south pole
+    assert night[0, -2:, 1].tolist() == [90, 90]
+    assert night[1, -2:, 1].tolist() == [-90, -90]
+    np.testing.assert_array_equal(night[:, :73, 1], lat)
+
+
+def test_memoised_per_epoch(monkeypatch):
+    t = datetime(2024, 1, 1, 6)
+    first = terminator_curve(t)
+    monkeypatch.setattr(solar, 'subsolar_point', None)     # must not be called
+    again = terminator_curve([t, t])
+    np.testing.assert_array_equal(again[1], np.vstack([first[1], first[1]]))
+
+
+def test_vectorised_subsolar_point_matches_scalar():
+    times = np.arange('2023-12-31T22', '2024-01-02', 37, dtype='datetime64[m]')
+    lat_sun, lon_sun = subsolar_point(times)
+    assert lat_sun.shape == times.shape
+    for t, la, lo in zip(times.astype(datetime), lat_sun, lon_sun):
+        np.testing.assert_allclose(_subsolar_point(t), (la, lo), atol=1e-9)
+
+
+def test_add_solar_geometry(ionex_file):
+    ds  = read_ionex(ionex_file[0])
+    out = add_solar_geometry(ds)
+    assert out['sza'].dims == ('time', 'latitude', 'longitude')
+    assert out['local_solar_time'].dims == ('time', 'longitude')
+    assert {out[v].dtype for v in ('sza', 'local_solar_time', 'is_day')} == {np.dtype('float32')}
+
+    lat_sun, lon_sun = subsolar_point(ds.time.values)
+    i = 3
+    near = out.isel(time=i).sel(latitude=lat_sun[i], longitude=lon_sun[i], method='nearest')
+    assert float(near['sza']) < 4
+    assert abs(float(near['local_solar_time']) - 12) < 0.25
+    np.testing.assert_array_equal(out['is_day'].values, (out['sza'].values < 90))
+
+    pytest.importorskip('dask')
+    lazy = add_solar_geometry(ds.chunk({'time': 5}))
+    assert lazy['sza'].chunks[0] == (5, 5, 3)
+    np.testing.assert_allclose(lazy['sza'].values, out['sza'].values)
+
+
+def test_to_local_time_follows_the_sun(ionex_file):
+    ds = read_ionex(ionex_file[0])
+    lst = add_solar_geometry(ds)['local_solar_time'].values.astype(float)
+
+    def pattern(hours):
+        return 10 + 5 * np.cos(2 * np.pi * hours / 24)
+
+    ds['tec'] = (('time', 'latitude', 'longitude'),
+                 np.broadcast_to(pattern(lst)[:, None, :], ds['tec'].shape).copy())
+
+    out = to_local_time(ds, lt_bins=12)
+    assert out['tec'].dims == ('time', 'latitude', 'local_time')
+    np.testing.assert_allclose(out['local_time'], np.arange(1, 24, 2))
+    # sun-fixed pattern → the same at every epoch and latitude
+    np.testing.assert_allclose(out['tec'], np.broadcast_to(pattern(out['local_time'].values),
+                                                           out['tec'].shape), atol=0.02)
+
+    clim = to_local_time(ds, lt_bins=[0, 6, 12, 18], climatology=True)
+    assert clim['rms'].dims == ('latitude', 'local_time')
+
+    pytest.importorskip('dask')
+    lazy = to_local_time(ds.chunk({'time': 4}), lt_bins=12)
+    assert lazy['tec'].chunks[0] == (4, 4, 4, 1)
+    np.testing.assert_allclose(lazy['tec'].values, out['tec'].values)
@@ -0,0 +1,82 @@
+import gzip
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conftest import make_ionex
+from ionex_reader.stream import iter_maps
+
+
+@pytest.fixture
+def days(tmp_path):
+    paths, tec, rms = [], [], []
+    for d in range(2):
+        text, exp = make_ionex(start=datetime(2024, 1, 1 + d), seed=d)
+        path = tmp_path / f'jplg{d + 1:03d}0.24i.gz'
+        path.write_bytes(gzip.compress(text.encode()))
+        paths.append(path)
+        tec.append(exp['tec'][d > 0:])
+        rms.append(exp['rms'][d > 0:])
+    return paths[::-1], np.concatenate(tec), np.concatenate(rms)
+
+
+def test_chained_in_time_order_without_midnight_duplicate(days):
+    paths, tec, rms = days
+    steps = list(iter_maps(paths))
+    assert len(steps) == 25
+    epochs = np.array([e for e, _, _ in steps])
+    assert epochs[0] == np.datetime64('2024-01-01T00:00') and np.all(np.diff(epochs) > 0)
+    np.testing.assert_allclose(np.stack([t for _, t, _ in steps]), tec)
+    np.testing.assert_allclose(np.stack([r for _, _, r in steps]), rms)
+
+
+def test_reuse_and_variable_subset(days):
+    paths, _, rms = days
+    seen = [r for _, r in iter_maps(paths, variables=('rms',), reuse=True)]
+    assert all(r is seen[0] for r in seen)
+    np.testing.assert_allclose(seen[0], rms[-1])
+    with pytest.raises(ValueError, match='subset'):
+        next(iter_maps(paths, variables=('hgt',)))
+
+
+def test_memory_independent_of_file_size(tmp_path):
+    text, _ = make_ionex(n_maps=97, interval_s=900)
+    path = tmp_path / 'big.24i'
+    path.write_text(text)
+    tracemalloc.start()
+    for _ in iter_maps(path):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < len(text) / 10
+
+
+def test_prefetch_matches_streaming_and_cancels(days, monkeypatch):
+    import ionex_reader.stream as stream
+
+    paths, tec, _ = days
+    prefetched = [t for _, t, _ in iter_maps(paths, prefetch=2)]
+    np.testing.assert_allclose(np.stack(prefetched), tec)
+
+    loads = []
+    monkeypatch.setattr(stream, '_load_bytes', lambda p: loads.append(p) or b'')
+    gen = stream._prefetch(range(100), stream._load_bytes, 3)
+    assert next(gen) == b''
+    gen.close()                                  # cancels everything queued
+    assert len(loads) <= 4                       # window of 3, refilled once
+
+
+def test_prefetch_propagates_errors(tmp_path):
+    from ionex_reader.stream import _prefetch
+
+    def load(item):
+        if item == 2:
+            raise OSError('disk gone')
+        return item
+
+    gen = _prefetch(range(5), load, 2)
+    assert [next(gen), next(gen)] == [0, 1]
+    with pytest.raises(OSError, match='disk gone'):
+        next(gen)